@@ -0,0 +1,183 @@
+"""
+Micro-benchmark: block rendering on a synthetic 50k-block page
+
+Compares the dispatch-table renderer (NotionExporter.blocks_to_markdown)
+with the if/elif chain it replaced, kept below as `legacy_blocks_to_markdown`.
+No API calls are made.
+
+Usage:
+    python benchmarks/bench_block_renderer.py [--blocks 50000] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from notion_exporter import NotionExporter, CHILD_PREFIXES, PAGE_BLOCK_TYPES
+
+
+# Rough mix of an externship step page, plus block types the exporter skips
+BLOCK_MIX = [
+    ('paragraph', 40),
+    ('bulleted_list_item', 15),
+    ('numbered_list_item', 8),
+    ('heading_2', 5),
+    ('heading_3', 5),
+    ('to_do', 5),
+    ('code', 3),
+    ('quote', 2),
+    ('callout', 3),
+    ('divider', 2),
+    ('table_of_contents', 4),
+    ('breadcrumb', 4),
+    ('unsupported', 4),
+]
+
+
+def _run(text, bold=False, italic=False, code=False):
+    return {
+        'type': 'text',
+        'text': {'content': text, 'link': None},
+        'plain_text': text,
+        'href': None,
+        'annotations': {
+            'bold': bold,
+            'italic': italic,
+            'strikethrough': False,
+            'underline': False,
+            'code': code,
+            'color': 'default'
+        }
+    }
+
+
+def synthetic_page(count, seed=0):
+    """Build `count` top-level blocks following BLOCK_MIX."""
+    rng = random.Random(seed)
+    types = [block_type for block_type, _ in BLOCK_MIX]
+    weights = [weight for _, weight in BLOCK_MIX]
+    words = "the intern builds a small service and writes tests for each step".split()
+
+    blocks = []
+    for index, block_type in enumerate(rng.choices(types, weights, k=count)):
+        rich_text = [
+            _run(' '.join(rng.choices(words, k=6)) + ' ', bold=rng.random() < 0.2,
+                 italic=rng.random() < 0.1, code=rng.random() < 0.05)
+            for _ in range(rng.randint(1, 4))
+        ]
+        data = {'rich_text': rich_text}
+        if block_type == 'to_do':
+            data['checked'] = rng.random() < 0.5
+        elif block_type == 'code':
+            data['language'] = 'python'
+        elif block_type in ('divider', 'table_of_contents', 'breadcrumb', 'unsupported'):
+            data = {}
+        blocks.append({'id': f"b{index}", 'type': block_type, 'has_children': False, block_type: data})
+    return blocks
+
+
+def legacy_blocks_to_markdown(exporter, blocks):
+    """The renderer before the dispatch table, for comparison."""
+    content_parts = []
+    for block in blocks:
+        markdown = legacy_block_to_markdown(exporter, block)
+        if markdown:
+            content_parts.append(markdown)
+    return '\n'.join(content_parts)
+
+
+def legacy_block_to_markdown(exporter, block):
+    markdown = legacy_render_block(exporter, block)
+
+    children = block.get('children')
+    if not children or block.get('type') in PAGE_BLOCK_TYPES:
+        return markdown
+
+    children_markdown = legacy_blocks_to_markdown(exporter, children)
+    if not children_markdown:
+        return markdown
+
+    prefix = CHILD_PREFIXES.get(block.get('type'), '')
+    if prefix:
+        children_markdown = '\n'.join(
+            prefix + line if line else prefix.rstrip()
+            for line in children_markdown.split('\n')
+        )
+
+    if not markdown:
+        return children_markdown
+    return f"{markdown}\n{children_markdown}"
+
+
+def legacy_render_block(exporter, block):
+    block_type = block.get('type')
+    text_of = exporter._extract_rich_text
+
+    if block_type == 'paragraph':
+        return text_of(block['paragraph']['rich_text'])
+    elif block_type == 'heading_1':
+        return f"# {text_of(block['heading_1']['rich_text'])}"
+    elif block_type == 'heading_2':
+        return f"## {text_of(block['heading_2']['rich_text'])}"
+    elif block_type == 'heading_3':
+        return f"### {text_of(block['heading_3']['rich_text'])}"
+    elif block_type == 'bulleted_list_item':
+        return f"- {text_of(block['bulleted_list_item']['rich_text'])}"
+    elif block_type == 'numbered_list_item':
+        return f"1. {text_of(block['numbered_list_item']['rich_text'])}"
+    elif block_type == 'to_do':
+        checkbox = "[x]" if block['to_do']['checked'] else "[ ]"
+        return f"- {checkbox} {text_of(block['to_do']['rich_text'])}"
+    elif block_type == 'code':
+        language = block['code'].get('language', '')
+        return f"```{language}\n{text_of(block['code']['rich_text'])}\n```"
+    elif block_type == 'quote':
+        return f"> {text_of(block['quote']['rich_text'])}"
+    elif block_type == 'callout':
+        return f"> **Note:** {text_of(block['callout']['rich_text'])}"
+    elif block_type == 'toggle':
+        return f"- {text_of(block['toggle']['rich_text'])}"
+    elif block_type == 'divider':
+        return "---"
+    elif block_type == 'child_page':
+        return ""
+    else:
+        return ""
+
+
+def best_of(repeat, func, *args):
+    """Fastest of `repeat` runs, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--blocks', type=int, default=50000, help='Blocks on the synthetic page')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per renderer (best is reported)')
+    args = parser.parse_args()
+
+    exporter = NotionExporter('unused', client=object())
+    blocks = synthetic_page(args.blocks)
+
+    assert exporter.blocks_to_markdown(blocks) == legacy_blocks_to_markdown(exporter, blocks)
+
+    legacy = best_of(args.repeat, legacy_blocks_to_markdown, exporter, blocks)
+    dispatch = best_of(args.repeat, exporter.blocks_to_markdown, blocks)
+
+    print(f"{args.blocks} blocks, best of {args.repeat}")
+    print(f"  if/elif chain:  {legacy * 1000:8.1f} ms  ({args.blocks / legacy:,.0f} blocks/s)")
+    print(f"  dispatch table: {dispatch * 1000:8.1f} ms  ({args.blocks / dispatch:,.0f} blocks/s)")
+    print(f"  speedup:        {legacy / dispatch:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark: end-to-end export of synthetic externships, replayed offline
+
+Exports externships of 10, 100 and 1000 pages through a ReplayClient, so
+no API calls are made and every run sees the same responses. Reports the
+export time, the number of requests and the peak memory of one export.
+
+Needs pytest-benchmark (pip install pytest-benchmark).
+
+Usage:
+    pytest benchmarks/bench_export.py [--benchmark-only]
+"""
+
+import os
+import sys
+import tracemalloc
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+pytest.importorskip('pytest_benchmark')
+
+from main import ExternshipExporter
+from notion_exporter import NotionExporter
+from rate_limiter import TokenBucket
+from replay import Recording, ReplayClient
+from synthetic import generate_externship
+
+
+# Seconds each replayed request takes; enough for concurrency to matter
+LATENCY = 0.002
+
+
+def run_export(recording, output_dir):
+    """Export the recorded externship once; return the replay client."""
+    client = ReplayClient(recording, latency=LATENCY)
+    notion = NotionExporter(
+        "benchmark",
+        client=client,
+        rate_limiter=TokenBucket(rate=1e6, capacity=1e6)
+    )
+    exporter = ExternshipExporter("benchmark", notion=notion, max_workers=8, log=lambda message: None)
+    try:
+        exporter.export_externship(
+            "https://www.notion.so/Synthetic-Externship-root",
+            output_dir=str(output_dir)
+        )
+    finally:
+        exporter.close()
+    return client
+
+
+@pytest.mark.parametrize('pages', [10, 100, 1000])
+def test_export(benchmark, tmp_path, pages):
+    recording = Recording.from_pages(generate_externship(pages))
+
+    tracemalloc.start()
+    client = run_export(recording, tmp_path / 'memory')
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    benchmark.extra_info['pages'] = pages
+    benchmark.extra_info['requests'] = client.total_calls
+    benchmark.extra_info['peak_memory_mb'] = round(peak / 1024 / 1024, 2)
+
+    benchmark.pedantic(run_export, args=(recording, tmp_path / 'timed'), rounds=3, iterations=1)
@@ -0,0 +1,88 @@
+"""
+Profile: rendering and consolidation of large synthetic externships
+
+Generates externships of increasing size with synthetic.generate_externship
+and runs them through the export's rendering path
+(NotionExporter.blocks_to_markdown into a MarkdownConsolidator), reporting
+time and peak memory per size so their scaling can be compared. No API
+calls are made.
+
+Usage:
+    python benchmarks/profile_rendering.py [--pages 1000 5000 10000] [--profile]
+"""
+
+import argparse
+import cProfile
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from consolidator import MarkdownConsolidator
+from synthetic import consolidate, generate_externship
+
+
+def measure(data, memory):
+    """Render and consolidate once; return (seconds, peak bytes or None, statistics)."""
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    consolidator = consolidate(data, MarkdownConsolidator('Synthetic Externship'))
+    content = consolidator.get_consolidated_content()
+    elapsed = time.perf_counter() - start
+    peak = None
+    if memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    del content
+    return elapsed, peak, consolidator.get_statistics()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, nargs='+', default=[1000, 5000, 10000], help='Externship sizes to run')
+    parser.add_argument('--fan-out', type=int, default=25, help='Most child pages per page')
+    parser.add_argument('--depth', type=int, default=3, help='Deepest page level')
+    parser.add_argument('--blocks', type=int, default=30, help='Most content blocks per page')
+    parser.add_argument('--annotations', type=float, default=0.2, help='Share of annotated rich-text runs')
+    parser.add_argument('--boilerplate', type=float, default=0.3, help='Share of pages with repeated boilerplate')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    parser.add_argument('--no-memory', action='store_true', help='Skip peak memory tracing (it slows the run)')
+    parser.add_argument('--profile', action='store_true', help='Print a cProfile of the largest size')
+    args = parser.parse_args()
+
+    print(f"{'pages':>8} {'blocks':>9} {'generate':>10} {'render':>10} {'per page':>10} {'peak MB':>9} {'output MB':>10} {'dedup':>7}")
+    for pages in args.pages:
+        start = time.perf_counter()
+        data = generate_externship(
+            pages,
+            fan_out=args.fan_out,
+            max_depth=args.depth,
+            blocks_per_page=args.blocks,
+            annotation_density=args.annotations,
+            boilerplate_ratio=args.boilerplate,
+            seed=args.seed
+        )
+        generated = time.perf_counter() - start
+        blocks = sum(len(page['blocks']) for page in data.values())
+
+        elapsed, peak, stats = measure(data, memory=not args.no_memory)
+        peak_mb = f"{peak / 1024 / 1024:9.1f}" if peak is not None else f"{'-':>9}"
+        print(f"{pages:>8,} {blocks:>9,} {generated:>9.2f}s {elapsed:>9.2f}s "
+              f"{elapsed / pages * 1000:>8.2f}ms {peak_mb} {stats['estimated_size_mb']:>10.1f} "
+              f"{stats['dedup_ratio']:>7.1%}")
+
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        consolidate(data, MarkdownConsolidator('Synthetic Externship')).get_consolidated_content()
+        profiler.disable()
+        print(f"\nProfile of {args.pages[-1]:,} pages:")
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(20)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,18 +4,28 @@ Batch Export Script
 Export multiple externships at once from a list of URLs.
 
 Usage:
-    python src/batch_export.py urls.txt
+    python src/batch_export.py urls.txt [output_dir] [--incremental] [--workers N] [--resume]
 
 Where urls.txt contains one Notion URL per line.
 Lines starting with # are treated as comments.
+
+Progress is journaled to <output_dir>/.batch-journal.jsonl; if a run is
+interrupted, rerun it with --resume to skip the work already done.
 """
 
+import click
 import sys
 import os
-from typing import List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List
 
 from config import get_config
 from main import ExternshipExporter
+from http_pool import HttpPool
+from notion_exporter import NotionExporter
+from rate_limiter import TokenBucket
+from response_cache import ResponseCache
+from checkpoint import CheckpointJournal
 
 
 def read_urls_from_file(file_path: str) -> List[str]:
@@ -52,13 +62,31 @@ def read_urls_from_file(file_path: str) -> List[str]:
         sys.exit(1)
 
 
-def batch_export(urls: List[str], output_dir: str = "output"):
+def batch_export(
+    urls: List[str],
+    output_dir: str = "output",
+    incremental: bool = False,
+    workers: int = 1,
+    resume: bool = False
+):
     """
     Export multiple externships.
 
+    With more than one worker, several externships are exported at once.
+    Every export shares one Notion rate limiter and one response cache, so
+    the batch as a whole stays within Notion's request budget.
+
     Args:
         urls: List of Notion page URLs
         output_dir: Output directory for all files
+        incremental: Only re-fetch pages edited since each externship's
+            previous export to output_dir
+        workers: Number of externships exported concurrently
+        resume: Continue an interrupted batch from its checkpoint journal:
+            finished externships are skipped and finished pages reused
+
+    Returns:
+        dict: 'successful' and 'failed' export summaries, in input order
     """
     print(f"\n{'='*60}")
     print(f"BATCH EXPORT: {len(urls)} EXTERNSHIPS")
@@ -67,41 +95,88 @@ def batch_export(urls: List[str], output_dir: str = "output"):
     # Load configuration
     try:
         config = get_config()
-        exporter = ExternshipExporter(config.notion_api_key)
     except ValueError as e:
         print(f"Configuration Error: {str(e)}")
         sys.exit(1)
 
-    # Track results
-    results = {
-        'successful': [],
-        'failed': []
-    }
+    # One request budget, one cache, one connection pool and one journal
+    # for the whole batch
+    rate_limiter = TokenBucket()
+    cache = ResponseCache(config.cache_path)
+    http_pool = HttpPool(max_connections=max(10, 2 * workers), max_keepalive_connections=max(10, 2 * workers))
+    journal = CheckpointJournal(CheckpointJournal.path_for(output_dir), resume=resume)
+
+    def export_one(index: int, url: str) -> Dict[str, Any]:
+        """Export a single externship; returns its summary entry."""
+        prefix = f"[{index}/{len(urls)}]"
+        log = print if workers == 1 else (lambda message: print(f"{prefix} {message}"))
+
+        finished = journal.completed_externship(url)
+        if finished:
+            print(f"\n{prefix} Already exported, skipping: {url}")
+            return {key: finished[key] for key in ('url', 'name', 'file', 'size')}
 
-    # Export each externship
-    for i, url in enumerate(urls, 1):
-        print(f"\n[{i}/{len(urls)}] Processing: {url}")
+        print(f"\n{prefix} Processing: {url}")
         print("-" * 60)
 
+        exporter = ExternshipExporter(
+            config.notion_api_key,
+            notion=NotionExporter(
+                config.notion_api_key,
+                rate_limiter=rate_limiter,
+                cache=cache,
+                http_pool=http_pool,
+                database_sort=config.database_sort
+            ),
+            log=log
+        )
+
         try:
             result = exporter.export_externship(
                 page_url=url,
-                output_dir=output_dir
+                output_dir=output_dir,
+                incremental=incremental,
+                checkpoint=journal
             )
-
-            results['successful'].append({
+            summary = {
                 'url': url,
                 'name': result['externship_name'],
                 'file': result['output_path'],
                 'size': result['statistics']['estimated_size_mb']
-            })
+            }
+            journal.record_externship(url, summary)
+            return summary
 
         except Exception as e:
-            print(f"\n❌ Failed to export: {str(e)}\n")
-            results['failed'].append({
-                'url': url,
-                'error': str(e)
-            })
+            print(f"\n❌ {prefix} Failed to export: {str(e)}\n")
+            return {'url': url, 'error': str(e)}
+        finally:
+            exporter.close()
+
+    # Export each externship, keeping the summary in input order
+    outcomes = [None] * len(urls)
+    try:
+        if workers <= 1:
+            for i, url in enumerate(urls):
+                outcomes[i] = export_one(i + 1, url)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    pool.submit(export_one, i + 1, url): i
+                    for i, url in enumerate(urls)
+                }
+                for future in as_completed(futures):
+                    outcomes[futures[future]] = future.result()
+    finally:
+        http_pool.close()
+        cache.close()
+        journal.close()
+
+    # Track results
+    results = {
+        'successful': [outcome for outcome in outcomes if 'error' not in outcome],
+        'failed': [outcome for outcome in outcomes if 'error' in outcome]
+    }
 
     # Print summary
     print(f"\n{'='*60}")
@@ -127,20 +202,40 @@ def batch_export(urls: List[str], output_dir: str = "output"):
     print("\nNext: Upload these files to OpenAI to create your custom GPTs!")
     print()
 
+    return results
+
+
+@click.command()
+@click.argument('urls_file')
+@click.argument('output_dir', default='output')
+@click.option(
+    '--incremental',
+    is_flag=True,
+    default=False,
+    help='Only re-fetch pages edited since the last export to OUTPUT_DIR'
+)
+@click.option(
+    '--workers',
+    default=1,
+    show_default=True,
+    help='Number of externships exported at once (all share one rate limit and cache)'
+)
+@click.option(
+    '--resume',
+    is_flag=True,
+    default=False,
+    help='Continue an interrupted batch, skipping externships and pages already exported'
+)
+def main(urls_file: str, output_dir: str, incremental: bool, workers: int, resume: bool):
+    """
+    Export every externship listed in URLS_FILE (one Notion URL per line).
 
-def main():
-    """Main entry point for batch export."""
-    if len(sys.argv) < 2:
-        print("\nUsage: python src/batch_export.py <urls_file>")
-        print("\nExample:")
-        print("  python src/batch_export.py batch-export-example.txt")
-        print("\nThe file should contain one Notion URL per line.")
-        print("Lines starting with # are treated as comments.\n")
-        sys.exit(1)
+    Lines starting with # are treated as comments.
 
-    urls_file = sys.argv[1]
-    output_dir = sys.argv[2] if len(sys.argv) > 2 else "output"
+    Example:
 
+        python src/batch_export.py batch-export-example.txt
+    """
     # Read URLs
     urls = read_urls_from_file(urls_file)
 
@@ -157,7 +252,7 @@ def main():
         sys.exit(0)
 
     # Run batch export
-    batch_export(urls, output_dir)
+    batch_export(urls, output_dir, incremental=incremental, workers=workers, resume=resume)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,126 @@
+"""
+Checkpoint journal for resumable batch exports
+
+A batch run appends a line to `<output_dir>/.batch-journal.jsonl` each
+time it finishes a page (its title, rendered content and child pages) or a
+whole externship. If the run dies, `batch_export.py --resume` replays the
+journal: finished externships are skipped, and inside an unfinished one the
+crawler restores every journaled page instead of fetching it again, so only
+the remaining pages cost API calls.
+"""
+
+from typing import Any, Dict, List, Optional
+import json
+import os
+import threading
+
+
+class CheckpointJournal:
+    """
+    Append-only JSON-lines journal of completed work.
+
+    Each line is either {"event": "page", ...} or {"event": "externship", ...}.
+    A torn last line (from a crash mid-write) is ignored on load.
+    """
+
+    FILENAME = '.batch-journal.jsonl'
+
+    def __init__(self, path: str, resume: bool = False):
+        """
+        Open the journal.
+
+        Args:
+            path: Journal file path
+            resume: Load the existing journal; otherwise start a new one
+        """
+        self.path = path
+        self.pages: Dict[str, Dict[str, Any]] = {}
+        self.externships: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if resume and os.path.exists(path):
+            self._load()
+
+        self._file = open(path, 'a' if resume else 'w', encoding='utf-8')
+
+    @classmethod
+    def path_for(cls, output_dir: str) -> str:
+        """Journal location for a batch exported to `output_dir`."""
+        return os.path.join(output_dir, cls.FILENAME)
+
+    def _load(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+
+                if entry.get('event') == 'page':
+                    self.pages[entry['id']] = entry
+                elif entry.get('event') == 'externship':
+                    self.externships[entry['url']] = entry
+
+    def _append(self, entry: Dict[str, Any]):
+        line = json.dumps(entry, separators=(',', ':'))
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def completed_externship(self, url: str) -> Optional[Dict[str, Any]]:
+        """Summary of a finished externship export, or None."""
+        return self.externships.get(url)
+
+    def record_externship(self, url: str, summary: Dict[str, Any]):
+        """
+        Mark an externship as exported.
+
+        Args:
+            url: Externship URL as listed in the batch file
+            summary: Entry for the batch summary (name, file, size)
+        """
+        entry = dict(summary, event='externship', url=url)
+        self.externships[url] = entry
+        self._append(entry)
+
+    def lookup(self, page_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a page finished by an earlier (interrupted) run.
+
+        Returns:
+            dict: Entry with 'title', 'last_edited_time', 'content',
+                'children' (child page and database IDs, as listed) and
+                'databases' (which of them are inline databases), or None
+        """
+        return self.pages.get(page_id)
+
+    def record_page(self, node: Dict[str, Any], child_ids: List[str], database_ids: List[str] = ()):
+        """
+        Journal a page whose content and child list have been fetched.
+
+        Args:
+            node: Crawled hierarchy node
+            child_ids: IDs of the child pages and inline databases found on it
+            database_ids: Which of child_ids are inline databases (their
+                rows are queried again on resume)
+        """
+        entry = {
+            'event': 'page',
+            'id': node['id'],
+            'title': node['title'],
+            'last_edited_time': node.get('last_edited_time'),
+            'content': node.get('content'),
+            'children': child_ids,
+            'databases': list(database_ids)
+        }
+        self.pages[node['id']] = entry
+        self._append(entry)
+
+    def close(self):
+        """Close the journal file."""
+        with self._lock:
+            self._file.close()
@@ -0,0 +1,174 @@
+"""
+Retrieval chunk export
+
+Writes the knowledge base as JSON Lines instead of one markdown document:
+one record per chunk of at most `max_tokens` (estimated) tokens, labelled
+with where it sits in the hierarchy (Project > Step > Sub-step). This is
+the shape retrieval pipelines and vector stores ingest directly.
+
+Consecutive chunks of a section overlap by up to `overlap_tokens`, so a
+passage cut at a chunk boundary is still found whole in one of them.
+Chunks never span two sections, and are written as soon as their section
+is complete.
+"""
+
+from typing import Any, Dict, Iterator, List, TextIO, Tuple
+import json
+import re
+
+from consolidator import StreamingMarkdownConsolidator, TocEntry, split_markdown_blocks
+from tokens import estimate_tokens
+
+
+# A word and the whitespace after it
+_WORDS = re.compile(r"\S+\s*|\s+")
+
+
+class ChunkConsolidator(StreamingMarkdownConsolidator):
+    """
+    Consolidator that streams token-bounded chunks as JSON Lines.
+
+    Sections go through the same formatting and deduplication as the
+    markdown export; each finished section is then cut at block boundaries
+    (a paragraph, list item, table or code block) into chunks. A block
+    larger than a chunk is cut between words.
+
+    Each line is a JSON object:
+        {"id": 0, "document": "...", "path": ["Project 1", "Step 2"],
+         "chunk": 0, "tokens": 412, "text": "### Step 2\\n..."}
+    """
+
+    def __init__(
+        self,
+        externship_name: str,
+        stream: TextIO,
+        max_tokens: int = 500,
+        overlap_tokens: int = 50
+    ):
+        """
+        Initialize the consolidator.
+
+        Args:
+            externship_name: Name of the externship (stored in every record)
+            stream: Open text stream the JSON Lines are written to
+            max_tokens: Largest chunk, in estimated tokens
+            overlap_tokens: Most text repeated from the end of the previous
+                chunk of the same section
+
+        Raises:
+            ValueError: If the overlap doesn't leave room for new text
+        """
+        super().__init__(externship_name, stream, exact_tokens=True)
+        if not 0 <= overlap_tokens < max_tokens:
+            raise ValueError("overlap_tokens must be at least 0 and less than max_tokens")
+
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.chunk_count = 0
+        self._path: List[str] = []  # Titles from the project down to the current section
+        self._section: List[str] = []
+
+    def add_header(self):
+        """No header: every record names the externship instead."""
+
+    def _begin_section(self, entry: TocEntry):
+        super()._begin_section(entry)
+        self._flush_section()
+        title, level, _ = entry
+        del self._path[level - 1:]
+        self._path.append(title)
+
+    def _append(self, part: str):
+        self._section.append(part)
+        self.stats.add(part)
+
+    def _flush_section(self):
+        """Write the collected section as chunks."""
+        text = ''.join(self._section).strip()
+        self._section = []
+        if not text:
+            return
+
+        for index, (chunk, tokens) in enumerate(self.chunk_text(text)):
+            record = {
+                'id': self.chunk_count,
+                'document': self.externship_name,
+                'path': list(self._path),
+                'chunk': index,
+                'tokens': tokens,
+                'text': chunk
+            }
+            self.stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self.chunk_count += 1
+
+    def chunk_text(self, text: str) -> Iterator[Tuple[str, int]]:
+        """
+        Cut markdown into overlapping chunks of at most max_tokens.
+
+        Args:
+            text: Markdown of one section
+
+        Yields:
+            tuple: (chunk text, estimated tokens)
+        """
+        window: List[Tuple[str, int]] = []
+        size = 0
+
+        for piece, tokens in self._pieces(text):
+            if window and size + tokens > self.max_tokens:
+                yield '\n'.join(p for p, _ in window), size
+
+                # Carry the end of this chunk over into the next one
+                overlap: List[Tuple[str, int]] = []
+                overlap_size = 0
+                for p, t in reversed(window):
+                    if overlap_size + t > self.overlap_tokens or overlap_size + t + tokens > self.max_tokens:
+                        break
+                    overlap.insert(0, (p, t))
+                    overlap_size += t
+                window, size = overlap, overlap_size
+
+            window.append((piece, tokens))
+            size += tokens
+
+        if window:
+            yield '\n'.join(p for p, _ in window), size
+
+    def _pieces(self, text: str) -> Iterator[Tuple[str, int]]:
+        """Blocks of the text with their token counts, cutting blocks too large for a chunk."""
+        for block in split_markdown_blocks(text):
+            if not block.strip():
+                continue
+
+            tokens = estimate_tokens(block)
+            if tokens <= self.max_tokens:
+                yield block, tokens
+                continue
+
+            piece = ''
+            piece_tokens = 0
+            for word in _WORDS.findall(block):
+                word_tokens = estimate_tokens(word)
+                if piece and piece_tokens + word_tokens > self.max_tokens:
+                    yield piece.rstrip(), piece_tokens
+                    piece, piece_tokens = '', 0
+                piece += word
+                piece_tokens += word_tokens
+            if piece.strip():
+                yield piece.rstrip(), piece_tokens
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Statistics of the exported text, plus 'chunks': the number of records."""
+        statistics = super().get_statistics()
+        statistics['chunks'] = self.chunk_count
+        return statistics
+
+    def save_to_file(self, output_path: str):
+        """
+        Write the last section's chunks, then finish the file.
+
+        Args:
+            output_path: Path where the file should be saved
+        """
+        self._flush_section()
+        return super().save_to_file(output_path)
@@ -25,6 +25,15 @@ class Config:
         # Try to get API key from Streamlit secrets first, then environment variables
         self.notion_api_key = self._get_notion_api_key()
 
+        # Where the persistent Notion response cache is stored
+        self.cache_path = os.getenv(
+            'NOTION_CACHE_PATH',
+            os.path.join('.cache', 'notion-responses.sqlite3')
+        )
+
+        # Database property that orders rows of inline databases (optional)
+        self.database_sort = os.getenv('NOTION_DATABASE_SORT') or None
+
         # Validate required configuration
         if not self.notion_api_key:
             raise ValueError(
@@ -7,13 +7,165 @@ well-structured markdown file optimized for GPT training.
 Key features:
 - Preserves hierarchical structure (Externship > Projects > Steps > Sub-steps)
 - Adds clear section headers for navigation
-- Removes duplicate content
+- Removes duplicate content (repeated sections and boilerplate blocks
+  become references to their first occurrence)
 - Formats optimally for AI knowledge retrieval
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Set, TextIO, Tuple
 from slugify import slugify
 from datetime import datetime
+from functools import lru_cache
+import hashlib
+import os
+import shutil
+
+from tokens import estimate_tokens
+
+
+class DocumentStats:
+    """
+    Running statistics for a document that is built piece by piece.
+
+    Produces the same numbers as measuring the joined document, without
+    ever joining it: words split across two parts are counted once, and
+    UTF-8 size is only computed for parts that aren't plain ASCII. Tokens
+    are approximated as one per four characters, unless exact_tokens asks
+    for estimating each part (see tokens.estimate_tokens), which is several
+    times slower than the other counts together.
+    """
+
+    def __init__(self, exact_tokens: bool = False):
+        """
+        Args:
+            exact_tokens: Estimate tokens part by part rather than from the
+                character count
+        """
+        self.exact_tokens = exact_tokens
+        self.character_count = 0
+        self.word_count = 0
+        self.newline_count = 0
+        self.byte_count = 0
+        self.token_count = 0
+        self._ends_in_word = False
+
+    def add(self, part: str):
+        """Account for a part appended to the end of the document."""
+        if not part:
+            return
+
+        words = len(part.split())
+        # A word continuing from the previous part was already counted
+        if self._ends_in_word and not part[0].isspace():
+            words -= 1
+
+        self.character_count += len(part)
+        self.word_count += words
+        self.newline_count += part.count('\n')
+        self.byte_count += len(part) if part.isascii() else len(part.encode('utf-8'))
+        if self.exact_tokens:
+            self.token_count += estimate_tokens(part)
+        self._ends_in_word = not part[-1].isspace()
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Statistics in the format of MarkdownConsolidator.get_statistics."""
+        return {
+            'character_count': self.character_count,
+            'word_count': self.word_count,
+            'line_count': self.newline_count + 1,
+            'token_count': self.token_count if self.exact_tokens else (self.character_count + 3) // 4,
+            'estimated_size_kb': round(self.byte_count / 1024, 2),
+            'estimated_size_mb': round(self.byte_count / (1024 * 1024), 2)
+        }
+
+
+def split_markdown_blocks(content: str) -> List[str]:
+    """
+    Split rendered page markdown into its top-level blocks.
+
+    A block is one line, plus the lines that belong with it: indented
+    children, a callout's or quote's continuation lines, a whole table, or a
+    whole fenced code or equation block. '\n'.join(blocks) == content.
+
+    Args:
+        content: Page markdown as produced by NotionExporter.blocks_to_markdown
+
+    Returns:
+        list: Blocks in document order
+    """
+    blocks = []
+    fence = None  # Closing line of the fenced block being read
+
+    for line in content.split('\n'):
+        if fence is not None:
+            blocks[-1] += '\n' + line
+            if line.strip() == fence:
+                fence = None
+            continue
+
+        if line.startswith('```') or line == '$$':
+            fence = '```' if line.startswith('```') else '$$'
+            blocks.append(line)
+            continue
+
+        continues = blocks and line and (
+            line[0] in ' \t'
+            or (line[0] == '|' and blocks[-1].startswith('|'))
+            or (line[0] == '>' and blocks[-1].startswith('>'))
+        )
+        if continues:
+            blocks[-1] += '\n' + line
+        else:
+            blocks.append(line)
+
+    return blocks
+
+
+def _block_key(block: str) -> bytes:
+    """Hash of a block's text, ignoring whitespace differences."""
+    normalized = ' '.join(block.split())
+    return hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).digest()
+
+
+# (title, level, anchor) of a section heading, in document order
+TocEntry = Tuple[str, int, str]
+
+TOC_HEADING = "## Table of Contents\n\n"
+TOC_FOOTER = "\n---\n\n"
+
+
+@lru_cache(maxsize=4096)
+def _slug(title: str) -> str:
+    """slugify(), which is slow, run once per distinct title."""
+    return slugify(title)
+
+
+def _toc_line(entry: TocEntry) -> str:
+    title, level, anchor = entry
+    return f"{'  ' * (level - 1)}- [{title}](#{anchor})\n"
+
+
+def _append_file(target, source_path: str):
+    """
+    Append a file to an open binary file.
+
+    Uses copy_file_range where the OS has it, so the data is copied inside
+    the kernel (or just shared, on filesystems with reflinks) instead of
+    through Python.
+    """
+    target.flush()
+    with open(source_path, 'rb') as source:
+        copied = 0
+        try:
+            while True:
+                count = os.copy_file_range(source.fileno(), target.fileno(), 1 << 30)
+                if count == 0:
+                    return
+                copied += count
+        except (AttributeError, OSError):
+            if copied:
+                raise
+        shutil.copyfileobj(source, target)
 
 
 class MarkdownConsolidator:
@@ -24,36 +176,90 @@ class MarkdownConsolidator:
     optimal GPT training and knowledge retrieval.
     """
 
-    def __init__(self, externship_name: str):
+    def __init__(
+        self,
+        externship_name: str,
+        deduplicate: bool = True,
+        min_duplicate_chars: int = 200,
+        table_of_contents: bool = False,
+        exact_tokens: bool = False
+    ):
         """
         Initialize the consolidator.
 
         Args:
             externship_name: Name of the externship (for file naming and headers)
+            deduplicate: Replace content repeated from an earlier section
+                with a reference to it
+            min_duplicate_chars: Shortest repeated section, or run of
+                repeated blocks, worth replacing by a reference
+            table_of_contents: Put a table of contents of every section
+                after the header
+            exact_tokens: Estimate the token count statistic with
+                tokens.estimate_tokens instead of approximating it from
+                the character count
         """
         self.externship_name = externship_name
         self.content_parts = []
+        self.stats = DocumentStats(exact_tokens)
+        self.deduplicate = deduplicate
+        self.min_duplicate_chars = min_duplicate_chars
+        # Content hash -> (anchor, title) of the first section holding it
+        self._seen_sections: Dict[bytes, Tuple[str, str]] = {}
+        self._seen_blocks: Dict[bytes, Tuple[str, str]] = {}
+        self.content_chars = 0  # Page content offered, before deduplication
+        self.duplicate_chars = 0  # Page content replaced by references
+        self.duplicate_sections = 0
+        self.duplicate_blocks = 0
+        self.table_of_contents = table_of_contents
+        self.toc_entries: List[TocEntry] = []
+        self._toc_index = 0  # Position of the table of contents in content_parts
+        self._page_anchors: Dict[str, str] = {}  # Page ID -> anchor of its section
+        self._anchors: Dict[str, str] = {}  # Title -> anchor, for pages added without an ID
+        self._used_anchors: Set[str] = set()
+
+        # The table of contents grows with the document; count it up front
+        # so statistics always describe the finished file
+        if table_of_contents:
+            self.stats.add(TOC_HEADING + TOC_FOOTER)
 
     def add_header(self):
         """Add document header with metadata."""
-        header = f"""# {self.externship_name} - Complete Knowledge Base
+        self._append(self._header_text())
+        self._toc_index = len(self.content_parts)
+
+    def _header_text(self, part: int = None, parts: int = None) -> str:
+        """
+        Document header; for one file of a split document, names which part it is.
+
+        Args:
+            part: Number of this file (from 1), if the document is split
+            parts: Total number of files
+        """
+        title = f"{self.externship_name} - Complete Knowledge Base"
+        scope = "the complete curriculum and content"
+        if part is not None:
+            title += f" (Part {part} of {parts})"
+            scope = f"part {part} of {parts} of the curriculum and content"
+
+        return f"""# {title}
 
 **Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
-**Purpose:** This document contains the complete curriculum and content for the {self.externship_name}.
+**Purpose:** This document contains {scope} for the {self.externship_name}.
 It is structured hierarchically: Projects → Steps → Sub-steps.
 
 ---
 
 """
-        self.content_parts.append(header)
 
     def add_page_content(
         self,
         title: str,
         content: str,
         level: int,
-        metadata: Dict[str, Any] = None
+        metadata: Dict[str, Any] = None,
+        page_id: str = None
     ):
         """
         Add a page's content to the consolidated document.
@@ -63,6 +269,8 @@ It is structured hierarchically: Projects → Steps → Sub-steps.
             content: Page content in markdown format
             level: Hierarchy level (1=Project, 2=Step, 3=Sub-step)
             metadata: Optional metadata about the page
+            page_id: Notion page ID, which cross-references to the page
+                are resolved by
         """
         # Determine header level based on hierarchy
         # Level 1 (Projects) = ##
@@ -71,6 +279,12 @@ It is structured hierarchically: Projects → Steps → Sub-steps.
         header_level = level + 1
         header_prefix = "#" * header_level
 
+        anchor = self._claim_anchor(title)
+        if page_id is not None:
+            self._page_anchors.setdefault(page_id, anchor)
+        self._anchors.setdefault(title, anchor)
+        self._begin_section((title, level, anchor))
+
         # Add the section
         section = f"{header_prefix} {title}\n\n"
 
@@ -80,12 +294,137 @@ It is structured hierarchically: Projects → Steps → Sub-steps.
 
         # Add the actual content
         if content.strip():
+            if self.deduplicate:
+                content = self._deduplicate((anchor, title), content)
             section += f"{content}\n\n"
 
         # Add spacing between sections
         section += "\n"
 
-        self.content_parts.append(section)
+        self._append(section)
+
+    def add_cross_reference(self, title: str, level: int, page_id: str = None):
+        """
+        Add a short section pointing at a page exported elsewhere in the document.
+
+        Args:
+            title: Title of the referenced page
+            level: Hierarchy level of this occurrence
+            page_id: Notion page ID of the referenced page; without one the
+                link goes to the first page added with this title
+        """
+        header_prefix = "#" * (level + 1)
+        self._begin_section((title, level, self._claim_anchor(title)))
+        self._append(f"{header_prefix} {title}\n\n*See: [{title}](#{self._anchor(title, page_id)})*\n\n\n")
+
+    def _deduplicate(self, section: Tuple[str, str], content: str) -> str:
+        """
+        Replace content already exported in an earlier section.
+
+        A section identical to an earlier one becomes a single reference.
+        Otherwise each run of consecutive blocks that all first appeared in
+        the same earlier section is replaced, if it is long enough to be
+        worth it; shorter repeats (a common one-line bullet) are kept.
+
+        Args:
+            section: (anchor, title) of the section being added
+            content: Its page content
+
+        Returns:
+            str: Content with repeats replaced by references
+        """
+        self.content_chars += len(content)
+
+        section_key = _block_key(content)
+        first = self._seen_sections.get(section_key)
+        if first is not None and len(content) >= self.min_duplicate_chars:
+            self.duplicate_sections += 1
+            self.duplicate_chars += len(content)
+            return self._reference(first)
+        self._seen_sections.setdefault(section_key, section)
+
+        blocks = split_markdown_blocks(content)
+        keys = [_block_key(block) if block.strip() else None for block in blocks]
+
+        output = []
+        run: List[str] = []
+        run_source: Optional[Tuple[str, str]] = None
+
+        def flush_run():
+            run_chars = sum(len(block) for block in run)
+            if run and run_chars >= self.min_duplicate_chars:
+                output.append(self._reference(run_source))
+                self.duplicate_blocks += len(run)
+                self.duplicate_chars += run_chars
+            else:
+                output.extend(run)
+            run.clear()
+
+        for block, key in zip(blocks, keys):
+            source = self._seen_blocks.get(key) if key is not None else None
+            if source is None or source != run_source:
+                flush_run()
+            if source is None:
+                output.append(block)
+            else:
+                run.append(block)
+            run_source = source
+        flush_run()
+
+        # Blocks count as seen once their section is done, so a section
+        # never refers to itself
+        for key in keys:
+            if key is not None:
+                self._seen_blocks.setdefault(key, section)
+
+        return '\n'.join(output)
+
+    def _reference(self, section: Tuple[str, str]) -> str:
+        """Short pointer to the section, given as (anchor, title), that holds the replaced content."""
+        anchor, title = section
+        return f"*Same as in [{title}](#{anchor})*"
+
+    def _anchor(self, title: str, page_id: str = None) -> str:
+        """
+        Link target of the section holding a page's content.
+
+        The page is looked up by ID if it has one, by title otherwise. For
+        a page not added yet (a cross-reference placed before the page
+        itself), the anchor its heading will get if no other section with
+        the same title comes first.
+        """
+        if page_id is not None:
+            anchor = self._page_anchors.get(page_id)
+        else:
+            anchor = self._anchors.get(title)
+        if anchor is None:
+            anchor = self._free_anchor(_slug(title))
+        return anchor
+
+    def _claim_anchor(self, title: str) -> str:
+        """Anchor of a new section heading: its slug, numbered -1, -2, ... on repeats."""
+        anchor = self._free_anchor(_slug(title))
+        self._used_anchors.add(anchor)
+        return anchor
+
+    def _free_anchor(self, slug: str) -> str:
+        anchor = slug
+        number = 0
+        while anchor in self._used_anchors:
+            number += 1
+            anchor = f"{slug}-{number}"
+        return anchor
+
+    def _begin_section(self, entry: TocEntry):
+        """
+        Called as each section starts, before any of it is appended.
+
+        Args:
+            entry: (title, level, anchor) of the section's heading
+        """
+        self.toc_entries.append(entry)
+        if self.table_of_contents:
+            self.stats.add(_toc_line(entry))
 
     def _format_metadata(self, metadata: Dict[str, Any]) -> str:
         """
@@ -122,7 +461,21 @@ It is structured hierarchically: Projects → Steps → Sub-steps.
         else:
             separator = "\n---\n\n"
 
-        self.content_parts.append(separator)
+        self._append(separator)
+
+    def _append(self, part: str):
+        """
+        Add a finished piece of the document.
+
+        Every method that produces output goes through here, so subclasses
+        can send parts somewhere other than memory. Statistics are updated
+        as each part is added.
+
+        Args:
+            part: Markdown text to append
+        """
+        self.content_parts.append(part)
+        self.stats.add(part)
 
     def get_consolidated_content(self) -> str:
         """
@@ -131,24 +484,41 @@ It is structured hierarchically: Projects → Steps → Sub-steps.
         Returns:
             str: Full markdown document
         """
-        return ''.join(self.content_parts)
+        if not self.table_of_contents:
+            return ''.join(self.content_parts)
+
+        index = self._toc_index
+        return ''.join(self.content_parts[:index] + [self.get_table_of_contents()] + self.content_parts[index:])
+
+    def get_table_of_contents(self) -> str:
+        """
+        Table of contents of the sections added so far.
+
+        Returns:
+            str: Markdown list of links, nested by hierarchy level
+        """
+        return create_table_of_contents(self.toc_entries)
 
     def get_statistics(self) -> Dict[str, Any]:
         """
         Get statistics about the consolidated content.
 
+        Counts are kept up to date as content is added, so this costs the
+        same no matter how large the document is.
+
         Returns:
-            dict: Statistics including word count, character count, estimated file size
+            dict: Statistics including word count, character count, estimated
+                file size and token count, and how much repeated content was replaced:
+                'duplicate_sections', 'duplicate_blocks' and 'dedup_ratio'
+                (share of the page content's characters removed)
         """
-        content = self.get_consolidated_content()
-
-        return {
-            'character_count': len(content),
-            'word_count': len(content.split()),
-            'line_count': len(content.split('\n')),
-            'estimated_size_kb': round(len(content.encode('utf-8')) / 1024, 2),
-            'estimated_size_mb': round(len(content.encode('utf-8')) / (1024 * 1024), 2)
-        }
+        statistics = self.stats.as_dict()
+        statistics.update({
+            'duplicate_sections': self.duplicate_sections,
+            'duplicate_blocks': self.duplicate_blocks,
+            'dedup_ratio': round(self.duplicate_chars / self.content_chars, 3) if self.content_chars else 0.0
+        })
+        return statistics
 
     def save_to_file(self, output_path: str):
         """
@@ -176,28 +546,332 @@ It is structured hierarchically: Projects → Steps → Sub-steps.
         return f"{slug}-knowledge-base-{timestamp}.md"
 
 
-def create_table_of_contents(structure: List[Dict[str, Any]]) -> str:
+class StreamingMarkdownConsolidator(MarkdownConsolidator):
     """
-    Generate a table of contents from the page structure.
+    Consolidator that writes each part to a stream as soon as it is added.
 
-    Args:
-        structure: Hierarchical structure of pages
+    Nothing is kept in memory and statistics are tracked as parts go by,
+    so the full document never exists as one string. Use open() to stream
+    into a file that only appears at its final path once complete.
 
-    Returns:
-        str: Markdown table of contents
+    With a table of contents (only for open()), the body is streamed to a
+    spool file; save_to_file writes the header and table of contents and
+    appends the spooled body after them.
+    """
+
+    def __init__(self, externship_name: str, stream: TextIO, **options):
+        """
+        Initialize the consolidator.
+
+        Args:
+            externship_name: Name of the externship (for file naming and headers)
+            stream: Open text stream the document is written to
+            **options: Passed on to MarkdownConsolidator
+        """
+        super().__init__(externship_name, **options)
+        self.stream = stream
+        self._partial_path = None
+        self._header = ''
+
+    @classmethod
+    def open(cls, externship_name: str, output_path: str, **options) -> 'StreamingMarkdownConsolidator':
+        """
+        Stream into `<output_path>.partial`; save_to_file moves it into place.
+
+        Args:
+            externship_name: Name of the externship
+            output_path: Final path of the document
+            **options: Passed on to the constructor
+
+        Returns:
+            StreamingMarkdownConsolidator: Consolidator writing to the file
+        """
+        suffix = '.body.partial' if options.get('table_of_contents') else '.partial'
+        partial_path = f"{output_path}{suffix}"
+        consolidator = cls(externship_name, open(partial_path, 'w', encoding='utf-8'), **options)
+        consolidator._partial_path = partial_path
+        return consolidator
+
+    def add_header(self):
+        """Add document header with metadata (held back until save with a table of contents)."""
+        if not self.table_of_contents:
+            return super().add_header()
+        self._header = self._header_text()
+        self.stats.add(self._header)
+
+    def _append(self, part: str):
+        self.stream.write(part)
+        self.stats.add(part)
+
+    def get_consolidated_content(self) -> str:
+        """Not available: the content has been streamed out, not kept."""
+        raise RuntimeError(
+            "StreamingMarkdownConsolidator does not keep the document in memory; "
+            "read it from the stream it was written to"
+        )
+
+    def save_to_file(self, output_path: str):
+        """
+        Finish the document.
+
+        For a consolidator created with open(), closes the partial file and
+        moves it to `output_path`; otherwise just flushes the stream.
+
+        Args:
+            output_path: Path where the file should be saved
+        """
+        try:
+            if self._partial_path is None:
+                if self.table_of_contents:
+                    raise ValueError("a table of contents needs a consolidator created with open()")
+                self.stream.flush()
+                return True
+
+            self.stream.close()
+            if self.table_of_contents:
+                with open(f"{output_path}.partial", 'wb') as f:
+                    f.write((self._header + self.get_table_of_contents()).encode('utf-8'))
+                    _append_file(f, self._partial_path)
+                os.remove(self._partial_path)
+                self._partial_path = f"{output_path}.partial"
+
+            os.replace(self._partial_path, output_path)
+            self._partial_path = None
+            return True
+        except Exception as e:
+            raise Exception(f"Failed to save file: {str(e)}")
+
+    def discard(self):
+        """Close the stream and delete the partial file, if any."""
+        self.stream.close()
+        if self._partial_path and os.path.exists(self._partial_path):
+            os.remove(self._partial_path)
+        self._partial_path = None
+
+
+def _utf8_size(text: str) -> int:
+    return len(text) if text.isascii() else len(text.encode('utf-8'))
+
+
+class SplitMarkdownConsolidator(MarkdownConsolidator):
+    """
+    Consolidator that writes the document as several files under a size budget.
+
+    Files are only split at project or step boundaries: a step is never
+    separated from its sub-steps unless it is too large for a file on its
+    own. Only the step being added is held in memory; finished steps are
+    spooled to disk, so the full document never exists as one string. Each
+    file gets its own header and a table of contents of the sections in it,
+    written in front of its spooled body by save_to_file().
     """
-    toc_lines = ["## Table of Contents\n"]
 
-    for i, project in enumerate(structure, 1):
-        toc_lines.append(f"{i}. [{project['title']}](#{slugify(project['title'])})")
+    def __init__(
+        self,
+        externship_name: str,
+        output_path: str,
+        max_bytes: int = None,
+        max_tokens: int = None,
+        split_level: int = 2,
+        **options
+    ):
+        """
+        Initialize the consolidator.
 
-        if 'children' in project:
-            for j, step in enumerate(project['children'], 1):
-                toc_lines.append(f"   {i}.{j}. [{step['title']}](#{slugify(step['title'])})")
+        Args:
+            externship_name: Name of the externship (for file naming and headers)
+            output_path: Path of the document; parts are saved next to it
+            max_bytes: Largest file size in UTF-8 bytes
+            max_tokens: Largest file size in estimated tokens (give this or
+                max_bytes)
+            split_level: Deepest hierarchy level a file may start at
+                (1=Project, 2=Step)
+            **options: Passed on to MarkdownConsolidator
+
+        Raises:
+            ValueError: Unless exactly one budget is given
+        """
+        # Token budgets are counted exactly, so the statistics agree with them
+        if max_tokens is not None:
+            options.setdefault('exact_tokens', True)
+        super().__init__(externship_name, **options)
+        if (max_bytes is None) == (max_tokens is None):
+            raise ValueError("Give exactly one of max_bytes and max_tokens")
+
+        self.output_path = output_path
+        self.max_size = max_bytes if max_bytes is not None else max_tokens
+        self.measure = _utf8_size if max_bytes is not None else estimate_tokens
+        self.split_level = split_level
+        self.part_paths: List[str] = []  # Set by save_to_file()
+        self.oversized_parts = 0  # Files over budget because one section is
+        self._with_header = False
+        self._parts: List[Dict[str, Any]] = []  # Spool file, TOC entries and size of each file
+        self._unit: List[Dict[str, Any]] = []  # Sections of the step being added
 
-                if 'children' in step:
-                    for k, substep in enumerate(step['children'], 1):
-                        toc_lines.append(f"      {i}.{j}.{k}. [{substep['title']}](#{slugify(substep['title'])})")
+    def add_header(self):
+        """Give every file the document header (written by save_to_file)."""
+        self._with_header = True
+
+    def _begin_section(self, entry: TocEntry):
+        """Start collecting a section; a project or step ends the previous unit."""
+        super()._begin_section(entry)
+        if entry[1] <= self.split_level:
+            self._flush_unit()
+
+        self._unit.append({
+            'entry': entry,
+            'parts': [],
+            'size': self.measure(_toc_line(entry))
+        })
+
+    def _append(self, part: str):
+        self.stats.add(part)
+        if not self._unit:
+            self._unit.append({'entry': None, 'parts': [], 'size': 0})
+        section = self._unit[-1]
+        section['parts'].append(part)
+        section['size'] += self.measure(part)
+
+    def _flush_unit(self):
+        """Write the collected unit to the current file, or start a new one."""
+        sections, self._unit = self._unit, []
+        if not sections:
+            return
+
+        if not self._parts:
+            self._start_part()
+
+        size = sum(section['size'] for section in sections)
+        if not self._fits(size):
+            self._start_part()
+
+        if self._parts[-1]['size'] + size <= self.max_size:
+            for section in sections:
+                self._write_section(section)
+            return
+
+        # Larger than a whole file: split it between its sections
+        for section in sections:
+            if not self._fits(section['size']):
+                self._start_part()
+            self._write_section(section)
+
+    def _fits(self, size: int) -> bool:
+        """Whether `size` more fits in the current file (an empty one takes anything)."""
+        part = self._parts[-1]
+        return part['body_size'] == 0 or part['size'] + size <= self.max_size
+
+    def _start_part(self):
+        """Open the spool file for the next part, unless the current one is still empty."""
+        if self._parts and self._parts[-1]['body_size'] == 0:
+            return
+
+        overhead = self.measure(create_table_of_contents([]))
+        if self._with_header:
+            overhead += self.measure(self._header_text(99, 99))
+
+        spool_path = f"{self.output_path}.part{len(self._parts) + 1}.partial"
+        self._parts.append({
+            'spool_path': spool_path,
+            'spool': open(spool_path, 'w', encoding='utf-8'),
+            'entries': [],
+            'size': overhead,
+            'body_size': 0
+        })
+
+    def _write_section(self, section: Dict[str, Any]):
+        part = self._parts[-1]
+        for text in section['parts']:
+            part['spool'].write(text)
+        if section['entry'] is not None:
+            part['entries'].append(section['entry'])
+        part['size'] += section['size']
+        part['body_size'] += section['size']
+        if part['size'] > self.max_size and part['size'] - section['size'] <= self.max_size:
+            self.oversized_parts += 1
 
-    toc_lines.append("\n---\n")
-    return '\n'.join(toc_lines)
+    def get_consolidated_content(self) -> str:
+        """Not available: the content has been spooled to disk, not kept."""
+        raise RuntimeError(
+            "SplitMarkdownConsolidator does not keep the document in memory; "
+            "read the files listed in part_paths after save_to_file()"
+        )
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Statistics of the whole document, plus 'parts' (the number of files)
+        and 'oversized_parts' (files over budget because one section is).
+
+        The header and table of contents of each file are counted as
+        save_to_file() writes them; until then only the sections are.
+        """
+        statistics = super().get_statistics()
+        statistics['parts'] = len(self._parts)
+        statistics['oversized_parts'] = self.oversized_parts
+        return statistics
+
+    def save_to_file(self, output_path: str):
+        """
+        Write out every file: header, table of contents, then its spooled body.
+
+        A document that fits in one file is saved at `output_path`; otherwise
+        the files are numbered `<name>-part-1.md`, `<name>-part-2.md`, ...
+        Their paths are kept in part_paths.
+
+        Args:
+            output_path: Path of the document
+        """
+        try:
+            self._flush_unit()
+            if not self._parts:
+                self._start_part()
+
+            stem, extension = os.path.splitext(output_path)
+            count = len(self._parts)
+            self.part_paths = []
+
+            for number, part in enumerate(self._parts, 1):
+                part['spool'].close()
+                path = output_path if count == 1 else f"{stem}-part-{number}{extension}"
+
+                header = ''
+                if self._with_header:
+                    header = self._header_text() if count == 1 else self._header_text(number, count)
+
+                # The body is already in the statistics; add what only this file has
+                front = header + create_table_of_contents(part['entries'])
+                self.stats.add(front)
+
+                with open(f"{path}.partial", 'wb') as f:
+                    f.write(front.encode('utf-8'))
+                    _append_file(f, part['spool_path'])
+
+                os.replace(f"{path}.partial", path)
+                os.remove(part['spool_path'])
+                self.part_paths.append(path)
+
+            return True
+        except Exception as e:
+            raise Exception(f"Failed to save file: {str(e)}")
+
+    def discard(self):
+        """Close and delete the spool files."""
+        for part in self._parts:
+            part['spool'].close()
+            if os.path.exists(part['spool_path']):
+                os.remove(part['spool_path'])
+        self._parts = []
+
+
+def create_table_of_contents(entries: List[TocEntry]) -> str:
+    """
+    Generate a table of contents from the sections of a document.
+
+    Args:
+        entries: (title, level, anchor) of each section heading in document
+            order, as collected in MarkdownConsolidator.toc_entries; levels
+            can go to any depth
+
+    Returns:
+        str: Markdown table of contents, nested by level
+    """
+    return TOC_HEADING + ''.join(_toc_line(entry) for entry in entries) + TOC_FOOTER
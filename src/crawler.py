@@ -0,0 +1,487 @@
+"""
+Concurrent hierarchy crawler
+
+Walks an externship's page tree with a pool of worker threads. Sibling
+subtrees are fetched in parallel while every request still draws from the
+NotionExporter's shared rate limiter, so the crawl runs at the API's
+throughput limit instead of paying a fixed delay per request.
+
+Every page is fetched at most once. A page reached again (linked from
+several steps, or through a cycle of links) is exported at its shallowest
+occurrence; the others become cross-reference nodes pointing at it.
+
+Pages wait in a frontier ordered breadth-first, then by document order, so
+every project is fetched before any step. When a page or time budget runs
+out, the pages fetched so far still make a usable tree covering the top
+levels; the crawl reports that it was truncated.
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+import heapq
+import itertools
+import threading
+import time
+
+from notion_exporter import NotionExporter
+from manifest import ExportManifest
+from checkpoint import CheckpointJournal
+
+
+# Node fields that belong to the page rather than to one occurrence of it
+PAGE_FIELDS = (
+    'title', 'last_edited_time', 'properties', 'content', 'children', 'listing', 'databases',
+    'deferred', 'reused', 'resumed'
+)
+
+
+class PageCrawler:
+    """
+    Builds the page hierarchy (externship > projects > steps > sub-steps).
+
+    The main thread owns the tree and schedules work; worker threads only
+    fetch a page's title and block listing. Children are attached in block
+    order, so the resulting tree doesn't depend on which fetch finished first.
+
+    A child_page block already names its page and says when it was edited,
+    so its node is built from the parent's listing alone. Page metadata
+    (pages.retrieve) is only requested for pages the listing can't
+    describe: link_to_page targets, and children of a cached or restored
+    listing whose timestamps can't be trusted. Inline databases are
+    queried in bulk and their rows become child pages described by the
+    query results, properties included.
+
+    Each page is placed under `canonical_parent[page_id]`: of all the places
+    it is linked from, the shallowest (first in document order on a tie),
+    which is where a breadth-first crawl with a visited set would find it.
+    That occurrence keeps the page's content and children; every other one is
+    a node with 'reference' set and no content of its own.
+    """
+
+    def __init__(
+        self,
+        notion: NotionExporter,
+        max_workers: int = 4,
+        max_level: int = 3,
+        single_pass: bool = True,
+        warn: Callable[[str], None] = print,
+        manifest: ExportManifest = None,
+        checkpoint: CheckpointJournal = None,
+        on_page: Callable[[Dict[str, Any]], None] = None,
+        max_pages: int = None,
+        max_seconds: float = None
+    ):
+        """
+        Initialize the crawler.
+
+        Args:
+            notion: NotionExporter used for all API calls
+            max_workers: Number of pages fetched concurrently
+            max_level: Maximum depth to traverse
+            single_pass: Render each page's content from the same block
+                listing used to find its children
+            warn: Called with a message when a child page is skipped
+            manifest: Previous export; pages not edited since are taken
+                from it instead of listing their blocks again
+            checkpoint: Journal of pages finished by an interrupted run;
+                they are restored without any API calls, and every page
+                this crawl finishes is added to it
+            on_page: Called with each page's node once it is fetched, from
+                the thread that called crawl()
+            max_pages: Most pages to fetch, the externship page included
+            max_seconds: Time budget; no page is started after it runs out
+                (requests already in flight finish)
+        """
+        self.notion = notion
+        self.max_workers = max(1, max_workers)
+        self.max_level = max_level
+        self.single_pass = single_pass
+        self.warn = warn
+        self.manifest = manifest
+        self.checkpoint = checkpoint
+        self.on_page = on_page
+        self.max_pages = max_pages
+        self.max_seconds = max_seconds
+        self.truncated: Optional[str] = None  # Which budget ran out, if any
+        self.pages_skipped = 0  # Pages left out because a budget ran out
+        self.api_calls_saved = 0
+        self.page_requests_saved = 0  # Pages titled from their child_page block
+        self.canonical_parent: Dict[str, str] = {}  # Page ID -> ID of the page it's exported under
+        self._lock = threading.Lock()
+
+    def crawl(self, page_id: str, title: str, last_edited_time: str = None) -> Dict[str, Any]:
+        """
+        Crawl the hierarchy below a page.
+
+        Args:
+            page_id: Notion page ID of the externship
+            title: Externship title
+            last_edited_time: The externship page's last_edited_time, used to
+                validate cached responses
+
+        Returns:
+            dict: Hierarchical structure of pages. If a budget ran out, the
+                root's 'truncated' names it ('page budget' or 'time budget')
+                and pages not fetched in time are left out.
+        """
+        root = self._new_node(page_id, title, 0, last_edited_time)
+        fetched = {page_id: root}  # Visited set: the node holding each page's content
+        visited = set()  # Pages whose visit completed
+        failed = set()
+        skipped = set()  # Pages left out when a budget ran out
+        self.truncated = None
+        self._started = 0
+        self._deadline = time.monotonic() + self.max_seconds if self.max_seconds is not None else None
+
+        # Frontier of pages to visit: (level, path, sequence, node), where
+        # path holds the child positions leading to the page
+        frontier: List[Tuple[int, Tuple[int, ...], int, Dict[str, Any]]] = []
+        paths: Dict[str, Tuple[int, ...]] = {page_id: ()}
+        sequence = itertools.count()
+
+        def enqueue(node: Dict[str, Any], path: Tuple[int, ...]):
+            paths.setdefault(node['id'], path)
+            heapq.heappush(frontier, (node['level'], paths[node['id']], next(sequence), node))
+
+        enqueue(root, ())
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            pending = {}
+
+            while True:
+                while frontier and len(pending) < self.max_workers and self._within_budget():
+                    node = heapq.heappop(frontier)[3]
+                    self._started += 1
+                    pending[pool.submit(self._visit, node)] = node
+
+                if pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                    for future in done:
+                        node = pending.pop(future)
+
+                        try:
+                            child_refs = future.result()
+                        except Exception as e:
+                            if node is root:
+                                raise
+                            self.warn(f"   ⚠️  Warning: Could not fetch child page {node['id']}: {str(e)}")
+                            failed.add(node['id'])
+                            continue
+
+                        visited.add(node['id'])
+                        if self.on_page:
+                            self.on_page(node)
+
+                        self._enqueue_children(node, child_refs, fetched, paths, enqueue)
+                    continue
+
+                # Nothing in flight: whatever is left in the frontier is
+                # over budget
+                skipped.update(entry[3]['id'] for entry in frontier if entry[3]['id'] not in visited)
+                frontier = []
+
+                # Placing the pages can move one above max_level; its
+                # children are crawled before the tree is final
+                self._prune_failed(root, failed | skipped)
+                to_visit = self._place_pages(root, fetched)
+                if not to_visit:
+                    break
+                for node in to_visit:
+                    enqueue(node, paths.get(node['id'], ()))
+
+        if skipped:
+            # Pages attached while placing may point at skipped ones
+            self._prune_failed(root, skipped)
+        if self.truncated:
+            root['truncated'] = self.truncated
+        self.pages_skipped = len(skipped)
+        return root
+
+    def _within_budget(self) -> bool:
+        """Whether another page may be started; records which budget ran out."""
+        if self.max_pages is not None and self._started >= self.max_pages:
+            self.truncated = 'page budget'
+            return False
+        if self._deadline is not None and time.monotonic() >= self._deadline:
+            self.truncated = 'time budget'
+            return False
+        return True
+
+    def _enqueue_children(
+        self,
+        node: Dict[str, Any],
+        child_refs: List[Dict[str, Any]],
+        fetched: Dict[str, Dict[str, Any]],
+        paths: Dict[str, Tuple[int, ...]],
+        enqueue: Callable[[Dict[str, Any], Tuple[int, ...]], None]
+    ):
+        """Attach a visited page's children and add the new ones to the frontier."""
+        to_fetch = self._attach(node, child_refs, fetched)
+        positions: Dict[str, int] = {}
+        for index, child in enumerate(node['children']):
+            positions.setdefault(child['id'], index)
+        for child in to_fetch:
+            enqueue(child, paths.get(node['id'], ()) + (positions[child['id']],))
+
+    def _new_node(
+        self,
+        page_id: str,
+        title: str,
+        level: int,
+        last_edited_time: str = None
+    ) -> Dict[str, Any]:
+        return {
+            'id': page_id,
+            'title': title,
+            'level': level,
+            'last_edited_time': last_edited_time,
+            'children': []
+        }
+
+    def _attach(
+        self,
+        node: Dict[str, Any],
+        child_refs: List[Dict[str, Any]],
+        fetched: Dict[str, Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Add child nodes in block order; return those whose page needs fetching."""
+        to_fetch = []
+
+        for ref in child_refs:
+            # The timestamp validates cached and previously exported content,
+            # so a title without one still needs the page's metadata
+            title = ref.get('title') if ref['last_edited_time'] else None
+            child = self._new_node(
+                ref['id'],
+                title,
+                node['level'] + 1,
+                ref['last_edited_time']
+            )
+            if ref.get('properties'):
+                child['properties'] = ref['properties']
+            node['children'].append(child)
+
+            # Pages already fetched for another occurrence aren't fetched again
+            if ref['id'] not in fetched:
+                fetched[ref['id']] = child
+                to_fetch.append(child)
+                if title is not None:
+                    self.page_requests_saved += 1
+
+        return to_fetch
+
+    def _visit(self, node: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Worker: fetch a page's title (unless the parent's listing gave it), then its children.
+
+        Pages journaled by an interrupted run are restored from the
+        checkpoint; every page fetched here is journaled once done.
+        """
+        saved = self.checkpoint.lookup(node['id']) if self.checkpoint else None
+        if saved is not None:
+            if node['title'] is None:
+                node['title'] = saved['title']
+            node['last_edited_time'] = saved['last_edited_time']
+            node['resumed'] = True
+            return self._restore(node, saved)
+
+        if node['title'] is None:
+            page = self.notion.get_page(node['id'])
+            node['title'] = self.notion.get_page_title(page)
+            node['last_edited_time'] = page.get('last_edited_time')
+
+        child_refs = self._fetch_children(node)
+
+        if self.checkpoint:
+            self.checkpoint.record_page(node, node.get('listing', []), node.get('databases', []))
+        return child_refs
+
+    def _record_listing(self, node: Dict[str, Any], child_refs: List[Dict[str, Any]]):
+        """
+        Keep the page's children as listed, inline databases unresolved, for
+        the manifest and checkpoint: adding a row to a database doesn't
+        touch the page, so a reused page's databases are queried again.
+        """
+        node['listing'] = [ref['id'] for ref in child_refs]
+        node['databases'] = [ref['id'] for ref in child_refs if ref['type'] == 'child_database']
+
+    def _restore(self, node: Dict[str, Any], entry: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Fill a node from a manifest or checkpoint entry; return its child refs."""
+        node['content'] = entry['content']
+        databases = set(entry.get('databases', []))
+        child_refs = [
+            {
+                'id': child_id,
+                'type': 'child_database' if child_id in databases else None,
+                'title': None,
+                'last_edited_time': None
+            }
+            for child_id in entry['children']
+        ]
+        self._record_listing(node, child_refs)
+
+        # Don't go deeper than max_level
+        if node['level'] >= self.max_level:
+            node['deferred'] = child_refs
+            return []
+
+        # Database rows are always queried fresh
+        return self.notion.resolve_databases(child_refs, self.warn)
+
+    def _fetch_children(self, node: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        List a page's blocks and return refs to its child pages.
+
+        In single-pass mode the listing is also rendered into node['content'].
+        Pages unchanged since the manifest was written skip the listing.
+        At max_level no refs are returned; those found are kept in
+        node['deferred'] (None if not listed), inline databases not yet
+        queried, in case the page is placed higher up.
+        """
+        previous = None
+        if self.manifest:
+            previous = self.manifest.lookup(node['id'], node['last_edited_time'])
+
+        if previous is not None:
+            node['reused'] = True
+            return self._restore(node, previous)
+
+        if self.single_pass:
+            blocks, requests_made = self.notion.get_block_listing(
+                node['id'],
+                node['last_edited_time']
+            )
+            self.notion.expand_children(blocks, node['last_edited_time'])
+            node['content'] = (
+                self.notion.properties_to_markdown(node.get('properties'))
+                + self.notion.blocks_to_markdown(blocks)
+            )
+
+            child_refs = self.notion.extract_child_refs(blocks)
+
+            # A cached listing holds the child pages' timestamps from when it
+            # was fetched; editing a child doesn't touch its parent, so they
+            # can't validate the child's own cache entries
+            if requests_made == 0:
+                for ref in child_refs:
+                    ref['last_edited_time'] = None
+
+            self._record_listing(node, child_refs)
+
+            # Don't go deeper than max_level; databases are only queried
+            # once their rows can be attached
+            if node['level'] >= self.max_level:
+                node['deferred'] = child_refs
+                return []
+
+            # The two-pass crawl would have listed these blocks again
+            with self._lock:
+                self.api_calls_saved += requests_made
+
+            # Database rows are always queried fresh
+            return self.notion.resolve_databases(child_refs, self.warn)
+
+        # Don't go deeper than max_level
+        if node['level'] >= self.max_level:
+            node['deferred'] = None
+            return []
+
+        child_refs = self.notion.get_child_refs(node['id'], database_rows=False)
+        self._record_listing(node, child_refs)
+        return self.notion.resolve_databases(child_refs, self.warn)
+
+    def _prune_failed(self, node: Dict[str, Any], failed: Set[str]):
+        """Drop children whose fetch failed, keeping the order of the rest."""
+        node['children'] = [
+            child for child in node['children'] if child['id'] not in failed
+        ]
+        for child in node['children']:
+            self._prune_failed(child, failed)
+
+    def _place_pages(
+        self,
+        root: Dict[str, Any],
+        fetched: Dict[str, Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Put each page's content at its canonical occurrence.
+
+        Walks the tree breadth-first: the first occurrence of a page takes
+        over its content and children from whichever node it was fetched
+        for, and later occurrences become cross-references. Links back to
+        the root (e.g. "back to overview") are dropped.
+
+        Returns:
+            list: Nodes to visit before the tree is final: pages first seen
+                in this pass, and pages that moved above max_level without
+                their children having been listed
+        """
+        self.canonical_parent = {}
+        placed = {root['id']: root}
+        references = []
+        to_visit = []
+        queue = deque([root])
+
+        while queue:
+            node = queue.popleft()
+
+            if node['level'] >= self.max_level:
+                # Fetched higher up than it ended up: keep its children for later
+                if node['children']:
+                    node['deferred'] = [
+                        {
+                            'id': child['id'],
+                            'type': None,
+                            'title': child['title'],
+                            'last_edited_time': child['last_edited_time']
+                        }
+                        for child in node['children']
+                    ]
+                    node['children'] = []
+                continue
+
+            if 'deferred' in node:
+                deferred = node.pop('deferred')
+                if deferred is None:
+                    to_visit.append(node)
+                else:
+                    deferred = self.notion.resolve_databases(deferred, self.warn)
+                    to_visit.extend(self._attach(node, deferred, fetched))
+
+            children = []
+            for child in node['children']:
+                if child['id'] == root['id']:
+                    continue
+                child['level'] = node['level'] + 1
+                children.append(child)
+
+                if child['id'] in placed:
+                    child['reference'] = True
+                    child['children'] = []
+                    child['content'] = ''
+                    child.pop('deferred', None)
+                    references.append(child)
+                    continue
+
+                holder = fetched[child['id']]
+                if holder is not child:
+                    for key in PAGE_FIELDS:
+                        if key in holder:
+                            child[key] = holder.pop(key)
+                    holder['children'] = []
+                    fetched[child['id']] = child
+                child.pop('reference', None)
+
+                placed[child['id']] = child
+                self.canonical_parent[child['id']] = node['id']
+                queue.append(child)
+
+            node['children'] = children
+
+        # Cross-references are titled after the page they point to
+        for node in references:
+            node['title'] = placed[node['id']]['title']
+
+        return to_visit
@@ -0,0 +1,179 @@
+"""
+Pooled HTTP transport for the Notion API
+
+notion_client.Client opens its own httpx client, so every exporter built
+for a batch entry or a web export used to pay for fresh TCP and TLS
+handshakes. An HttpPool owns one connection pool that any number of Notion
+clients share: concurrent crawls reuse warm keep-alive connections, and
+HTTP/2 multiplexes requests over a single connection when the optional
+`h2` package is installed.
+
+The pool counts requests, new connections and TLS handshakes, so reuse can
+be checked in the export statistics.
+"""
+
+from typing import Any, Callable, Dict, Optional
+import importlib.util
+import threading
+
+import httpx
+from notion_client import Client
+
+
+def http2_available() -> bool:
+    """Whether httpx can speak HTTP/2 here (it needs the `h2` package)."""
+    return importlib.util.find_spec('h2') is not None
+
+
+class ConnectionStats:
+    """Thread-safe counters of requests and the connections they needed."""
+
+    def __init__(self):
+        self.requests = 0
+        self.connections_opened = 0
+        self.tls_handshakes = 0
+        self._lock = threading.Lock()
+
+    def on_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def on_trace(self, event: str, info: Dict[str, Any]):
+        """Count connection events reported by httpcore's trace extension."""
+        if event == 'connection.connect_tcp.complete':
+            with self._lock:
+                self.connections_opened += 1
+        elif event == 'connection.start_tls.complete':
+            with self._lock:
+                self.tls_handshakes += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Current counts.
+
+        Returns:
+            dict: 'requests', 'connections_opened', 'tls_handshakes',
+                'reused' (requests sent on an already open connection) and
+                'reuse_rate'
+        """
+        with self._lock:
+            requests = self.requests
+            opened = self.connections_opened
+            handshakes = self.tls_handshakes
+
+        reused = max(0, requests - opened)
+        return {
+            'requests': requests,
+            'connections_opened': opened,
+            'tls_handshakes': handshakes,
+            'reused': reused,
+            'reuse_rate': round(reused / requests, 3) if requests else 0.0
+        }
+
+
+class InstrumentedTransport(httpx.HTTPTransport):
+    """HTTPTransport that reports each request and new connection to ConnectionStats."""
+
+    def __init__(self, stats: ConnectionStats, **kwargs):
+        super().__init__(**kwargs)
+        self.stats = stats
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self.stats.on_request()
+        request.extensions['trace'] = self._tracer(request.extensions.get('trace'))
+        return super().handle_request(request)
+
+    def _tracer(self, outer: Optional[Callable[[str, Dict[str, Any]], None]]):
+        def trace(event: str, info: Dict[str, Any]):
+            self.stats.on_trace(event, info)
+            if outer is not None:
+                outer(event, info)
+        return trace
+
+
+class HttpPool:
+    """
+    One keep-alive connection pool shared by any number of Notion clients.
+
+    Each Notion client gets its own lightweight httpx.Client (they carry
+    per-client headers such as the API key) on top of the pool's shared
+    transport, which holds the connections.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 10,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 60.0,
+        timeout: float = 60.0,
+        connect_timeout: float = 10.0,
+        http2: bool = None,
+        retries: int = 0
+    ):
+        """
+        Create the pool.
+
+        Args:
+            max_connections: Most connections open at once; size it to the
+                number of concurrent crawl workers
+            max_keepalive_connections: Idle connections kept open for reuse
+            keepalive_expiry: Seconds an idle connection is kept
+            timeout: Read, write and pool timeout per request, in seconds
+            connect_timeout: Timeout for opening a connection, in seconds
+            http2: Use HTTP/2; None uses it if the `h2` package is installed
+            retries: Connection attempts retried by the transport itself
+                (request failures are retried by NotionExporter)
+
+        Raises:
+            ImportError: If http2=True but `h2` is not installed
+        """
+        if http2 is None:
+            http2 = http2_available()
+        elif http2 and not http2_available():
+            raise ImportError("HTTP/2 needs the 'h2' package: pip install 'httpx[http2]'")
+
+        self.http2 = http2
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.stats = ConnectionStats()
+        self.transport = InstrumentedTransport(
+            self.stats,
+            http2=http2,
+            retries=retries,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry
+            )
+        )
+
+    def http_client(self) -> httpx.Client:
+        """
+        A new httpx.Client sending its requests through the shared pool.
+
+        Closing it closes the pool's connections too; close the pool instead.
+        """
+        return httpx.Client(transport=self.transport, timeout=self.timeout)
+
+    def notion_client(self, api_key: str) -> Client:
+        """
+        A notion_client.Client using the shared pool.
+
+        Args:
+            api_key: Notion integration API token
+
+        Returns:
+            Client: Notion client
+        """
+        client = Client(
+            auth=api_key,
+            client=self.http_client(),
+            timeout_ms=int(self.timeout.read * 1000)
+        )
+        # Client replaces the httpx timeout with a single value; keep the
+        # separate connect timeout
+        client.client.timeout = self.timeout
+        return client
+
+    def close(self):
+        """Close every pooled connection."""
+        self.transport.close()
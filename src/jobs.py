@@ -0,0 +1,227 @@
+"""
+Background export jobs
+
+Runs exports on a pool of worker threads so a web front end doesn't block
+while an externship is crawled. Each export is a job with an ID: the UI
+submits it, polls its progress, and picks up the finished files, which are
+kept on disk after the page that started the job is gone.
+
+Jobs are threads rather than processes because an export spends its time
+waiting on the network, and because every job must draw from the same
+in-process rate limiter to keep the deployment within Notion's budget.
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+import os
+import shutil
+import threading
+import time
+import uuid
+
+from main import ExternshipExporter
+
+
+ProgressCallback = Callable[[str, Dict[str, Any]], None]
+
+
+class ExportJob:
+    """
+    State of one export, written by its worker thread and read by the UI.
+
+    The job's progress() method is the export engine's progress callback.
+    """
+
+    def __init__(self, job_id: str, url: str, custom_name: Optional[str], output_dir: str):
+        self.id = job_id
+        self.url = url
+        self.custom_name = custom_name
+        self.output_dir = output_dir
+        self.status = 'queued'  # queued -> running -> done | failed
+        self.step = None  # Label of the current (or last finished) step
+        self.pages = 0  # Pages fetched so far
+        self.warnings: List[str] = []
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ('done', 'failed')
+
+    def progress(self, event: str, details: Dict[str, Any]):
+        """Record a progress event from ExternshipExporter."""
+        with self._lock:
+            if event in ('step', 'step_done'):
+                self.step = details['label']
+            elif event == 'page':
+                self.pages = details['pages']
+            elif event == 'warning':
+                self.warnings.append(details['message'])
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        A consistent copy of the job's state, safe to read while it runs.
+
+        Returns:
+            dict: Every public field, plus 'elapsed' seconds
+        """
+        with self._lock:
+            end = self.finished_at or time.time()
+            return {
+                'id': self.id,
+                'url': self.url,
+                'custom_name': self.custom_name,
+                'status': self.status,
+                'step': self.step,
+                'pages': self.pages,
+                'warnings': list(self.warnings),
+                'result': self.result,
+                'error': self.error,
+                'submitted_at': self.submitted_at,
+                'elapsed': round(end - (self.started_at or end), 1)
+            }
+
+
+class JobManager:
+    """
+    Runs export jobs in the background and keeps their output files.
+
+    Jobs beyond `max_workers` wait in a queue. Each job writes into its own
+    directory under `output_dir`; finished jobs and their files are pruned
+    `keep_seconds` after they finish.
+    """
+
+    def __init__(
+        self,
+        make_exporter: Callable[[ProgressCallback], ExternshipExporter],
+        output_dir: str,
+        max_workers: int = 2,
+        keep_seconds: float = 24 * 3600
+    ):
+        """
+        Initialize the manager.
+
+        Args:
+            make_exporter: Builds the ExternshipExporter for one job, given
+                the job's progress callback; share one rate limiter and
+                response cache between the exporters it builds
+            output_dir: Directory holding one subdirectory per job
+            max_workers: Exports run at the same time
+            keep_seconds: How long finished jobs and their files are kept
+        """
+        self.make_exporter = make_exporter
+        self.output_dir = output_dir
+        self.keep_seconds = keep_seconds
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='export-job')
+        self._jobs: Dict[str, ExportJob] = {}
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, url: str, custom_name: str = None) -> str:
+        """
+        Queue an export.
+
+        Args:
+            url: Notion page URL of the externship
+            custom_name: Optional custom name for the externship
+
+        Returns:
+            str: ID of the new job
+        """
+        self.prune()
+
+        job_id = uuid.uuid4().hex[:12]
+        job = ExportJob(job_id, url, custom_name, os.path.join(self.output_dir, job_id))
+
+        with self._lock:
+            self._jobs[job_id] = job
+            self._futures[job_id] = self._pool.submit(self._run, job)
+        return job_id
+
+    def get(self, job_id: str) -> Optional[ExportJob]:
+        """The job with this ID, or None if unknown or already pruned."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> List[ExportJob]:
+        """All known jobs, newest first."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return sorted(jobs, key=lambda job: job.submitted_at, reverse=True)
+
+    def wait(self, job_id: str, timeout: float = None) -> ExportJob:
+        """
+        Block until a job has finished.
+
+        Args:
+            job_id: ID returned by submit()
+            timeout: Seconds to wait at most
+
+        Returns:
+            ExportJob: The finished job
+
+        Raises:
+            KeyError: If the job is unknown
+            concurrent.futures.TimeoutError: If it is still running
+        """
+        with self._lock:
+            future = self._futures[job_id]
+            job = self._jobs[job_id]
+        future.result(timeout)
+        return job
+
+    def prune(self) -> int:
+        """
+        Forget jobs that finished more than keep_seconds ago and delete their files.
+
+        Returns:
+            int: Number of jobs removed
+        """
+        cutoff = time.time() - self.keep_seconds
+        with self._lock:
+            expired = [
+                job for job in self._jobs.values()
+                if job.finished and job.finished_at < cutoff
+            ]
+            for job in expired:
+                del self._jobs[job.id]
+                del self._futures[job.id]
+
+        for job in expired:
+            shutil.rmtree(job.output_dir, ignore_errors=True)
+        return len(expired)
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting jobs; with `wait`, let running and queued ones finish."""
+        self._pool.shutdown(wait=wait)
+
+    def _run(self, job: ExportJob):
+        """Worker: run one export and record its outcome."""
+        with job._lock:
+            job.status = 'running'
+            job.started_at = time.time()
+
+        result = None
+        error = None
+        try:
+            exporter = self.make_exporter(job.progress)
+            try:
+                result = exporter.export_externship(
+                    page_url=job.url,
+                    output_dir=job.output_dir,
+                    custom_name=job.custom_name
+                )
+            finally:
+                exporter.close()
+        except Exception as e:
+            error = str(e) or type(e).__name__
+
+        with job._lock:
+            job.result = result
+            job.error = error
+            job.status = 'failed' if error is not None else 'done'
+            job.finished_at = time.time()
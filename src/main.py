@@ -15,11 +15,21 @@ import click
 import os
 import sys
 from tqdm import tqdm
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable
 
 from config import get_config
 from notion_exporter import NotionExporter
-from consolidator import MarkdownConsolidator
+from consolidator import MarkdownConsolidator, StreamingMarkdownConsolidator, SplitMarkdownConsolidator
+from chunker import ChunkConsolidator
+from crawler import PageCrawler
+from http_pool import HttpPool
+from response_cache import ResponseCache
+from manifest import ExportManifest
+from checkpoint import CheckpointJournal
+
+
+class ExportError(Exception):
+    """An export step failed; the failure has already been logged."""
 
 
 class ExternshipExporter:
@@ -31,18 +41,90 @@ class ExternshipExporter:
     2. Fetches all pages recursively
     3. Consolidates into one markdown file
     4. Saves and reports statistics
+
+    It is the one export engine behind every front end: the CLI, batch
+    exports and the Streamlit app. Front ends follow an export through the
+    `log` lines or, for a UI, structured `progress` events:
+
+        ('step', {'step': 3, 'label': 'Building content hierarchy'})
+        ('page', {'title': 'Step 1', 'level': 2, 'pages': 7})
+        ('warning', {'message': 'Could not fetch child page ...'})
+        ('step_done', {'step': 3, 'label': 'Found 42 pages'})
     """
 
-    def __init__(self, api_key: str):
-        """Initialize the exporter with Notion API credentials."""
-        self.notion = NotionExporter(api_key)
-        self.page_cache = {}  # Cache to avoid re-fetching pages
+    def __init__(
+        self,
+        api_key: str,
+        single_pass: bool = True,
+        max_workers: int = 4,
+        notion: NotionExporter = None,
+        cache: ResponseCache = None,
+        http_pool: HttpPool = None,
+        log: Callable[[str], None] = print,
+        progress: Callable[[str, Dict[str, Any]], None] = None,
+        database_sort: str = None,
+        max_level: int = 3,
+        max_pages: int = None,
+        max_seconds: float = None
+    ):
+        """
+        Initialize the exporter with Notion API credentials.
+
+        Args:
+            api_key: Notion integration API token
+            single_pass: Fetch each page's blocks once and reuse the listing
+                for both hierarchy discovery and content rendering
+            max_workers: Number of pages crawled concurrently
+            notion: Optional pre-configured NotionExporter (e.g. one sharing
+                a rate limiter, or wrapping a fake client in tests)
+            cache: Optional persistent response cache so unchanged pages
+                aren't downloaded again (ignored if `notion` is given)
+            http_pool: Optional connection pool shared with other exporters
+                (ignored if `notion` is given)
+            log: Receives each progress line (default: print to stdout)
+            progress: Receives (event, details) as the export advances; see
+                the class docstring
+            database_sort: Property that orders the rows of databases used as
+                steps (ignored if `notion` is given)
+            max_level: Deepest level crawled (1 = projects, 2 = steps, ...)
+            max_pages: Stop crawling after this many pages and export the
+                top of the hierarchy fetched so far
+            max_seconds: Same, once the crawl has run this long
+        """
+        self.notion = notion or NotionExporter(
+            api_key,
+            cache=cache,
+            http_pool=http_pool,
+            database_sort=database_sort
+        )
+        self.single_pass = single_pass
+        self.max_workers = max_workers
+        self.log = log
+        self.progress = progress
+        self.max_level = max_level
+        self.max_pages = max_pages
+        self.max_seconds = max_seconds
+        self.api_calls_saved = 0
+        self.page_requests_saved = 0
+        self.pages_skipped = 0
+        self._pages_fetched = 0
+
+    def close(self):
+        """Release the Notion exporter's threads (and connections, if it owns them)."""
+        self.notion.close()
 
     def export_externship(
         self,
         page_url: str,
         output_dir: str = "output",
-        custom_name: str = None
+        custom_name: str = None,
+        incremental: bool = False,
+        checkpoint: CheckpointJournal = None,
+        max_file_bytes: int = None,
+        max_file_tokens: int = None,
+        output_format: str = 'markdown',
+        chunk_tokens: int = 500,
+        chunk_overlap: int = 50
     ) -> Dict[str, Any]:
         """
         Export an entire externship from Notion.
@@ -51,151 +133,324 @@ class ExternshipExporter:
             page_url: URL of the main externship page
             output_dir: Directory to save the output file
             custom_name: Optional custom name for the externship
+            incremental: Reuse the previous export's sections for pages that
+                haven't been edited since (tracked in a manifest in output_dir)
+            checkpoint: Journal of finished pages; pages finished by an
+                interrupted run are restored from it instead of refetched
+            max_file_bytes: Split the document at project/step boundaries
+                into files of at most this many bytes
+            max_file_tokens: Same, with a budget in estimated tokens
+            output_format: 'markdown' for the knowledge base document, or
+                'jsonl' for overlapping retrieval chunks (see chunker.py)
+            chunk_tokens: Largest chunk of the 'jsonl' format, in tokens
+            chunk_overlap: Tokens shared by consecutive chunks of a section
 
         Returns:
-            dict: Export results including file path and statistics
+            dict: Export results including file path(s) and statistics
+
+        Raises:
+            ExportError: If a step fails (after logging the error)
         """
-        print(f"\n{'='*60}")
-        print("NOTION EXTERNSHIP EXPORTER")
-        print(f"{'='*60}\n")
+        self.log(f"\n{'='*60}")
+        self.log("NOTION EXTERNSHIP EXPORTER")
+        self.log(f"{'='*60}\n")
+
+        requests_at_start = self.notion.request_count
+        retries_at_start = self.notion.retry_count
+        cache_at_start = self._cache_counts()
+        connections_at_start = self._connection_counts()
+        self.api_calls_saved = 0
+        self.page_requests_saved = 0
 
         # Step 1: Extract page ID from URL
-        print("📋 Step 1: Extracting page information...")
+        self.log("📋 Step 1: Extracting page information...")
+        self._notify('step', step=1, label="Extracting page information")
         try:
             page_id = self.notion.extract_page_id(page_url)
-            print(f"   ✓ Page ID: {page_id}")
+            self.log(f"   ✓ Page ID: {page_id}")
+            self._notify('step_done', step=1, label=f"Page ID: {page_id}")
         except Exception as e:
-            print(f"   ✗ Error: {str(e)}")
-            sys.exit(1)
+            self.log(f"   ✗ Error: {str(e)}")
+            raise ExportError(str(e)) from e
 
         # Step 2: Fetch main page
-        print("\n📥 Step 2: Fetching externship page from Notion...")
+        self.log("\n📥 Step 2: Fetching externship page from Notion...")
+        self._notify('step', step=2, label="Fetching externship page from Notion")
         try:
             main_page = self.notion.get_page(page_id)
             externship_title = custom_name or self.notion.get_page_title(main_page)
-            print(f"   ✓ Externship: {externship_title}")
+            self.log(f"   ✓ Externship: {externship_title}")
+            self._notify('step_done', step=2, label=f"Fetched: {externship_title}")
         except Exception as e:
-            print(f"   ✗ Error: {str(e)}")
-            sys.exit(1)
+            self.log(f"   ✗ Error: {str(e)}")
+            raise ExportError(str(e)) from e
 
         # Step 3: Build hierarchical structure
-        print("\n🌳 Step 3: Building content hierarchy...")
+        self.log("\n🌳 Step 3: Building content hierarchy...")
+        self._notify('step', step=3, label="Building content hierarchy")
+        manifest = None
+        if incremental:
+            manifest = ExportManifest(ExportManifest.path_for(output_dir, page_id), warn=self._warn)
+            self.log(f"   • Incremental: {len(manifest.pages)} pages in previous export")
         try:
-            structure = self._build_hierarchy(page_id, externship_title)
+            structure = self._build_hierarchy(
+                page_id,
+                externship_title,
+                last_edited_time=main_page.get('last_edited_time'),
+                manifest=manifest,
+                checkpoint=checkpoint
+            )
             total_pages = self._count_pages(structure)
-            print(f"   ✓ Found {total_pages} pages total")
+            if structure.get('truncated'):
+                self._warn(f"   ⚠️  Warning: Crawl stopped by the {structure['truncated']} "
+                           f"({self.pages_skipped:,} pages left out); exporting the pages fetched so far")
+            self.log(f"   ✓ Found {total_pages} pages total")
+            self._notify('step_done', step=3, label=f"Found {total_pages} pages")
         except Exception as e:
-            print(f"   ✗ Error: {str(e)}")
-            sys.exit(1)
+            self.log(f"   ✗ Error: {str(e)}")
+            raise ExportError(str(e)) from e
 
         # Step 4: Export all content
-        print(f"\n📝 Step 4: Exporting content from {total_pages} pages...")
+        self.log(f"\n📝 Step 4: Exporting content from {total_pages} pages...")
+        self._notify('step', step=4, label=f"Exporting content from {total_pages} pages")
         try:
-            consolidator = MarkdownConsolidator(externship_title)
-            consolidator.add_header()
-
-            # Process with progress bar
-            self._process_hierarchy(structure, consolidator)
+            # Create output directory if it doesn't exist
+            os.makedirs(output_dir, exist_ok=True)
+            filename = MarkdownConsolidator(externship_title).generate_filename()
+            if output_format == 'jsonl':
+                filename = os.path.splitext(filename)[0] + '-chunks.jsonl'
+            output_path = os.path.join(output_dir, filename)
 
-            print(f"   ✓ All content exported successfully")
+            # Sections are written to disk as they are produced
+            if output_format == 'jsonl':
+                consolidator = ChunkConsolidator.open(
+                    externship_title,
+                    output_path,
+                    max_tokens=chunk_tokens,
+                    overlap_tokens=chunk_overlap
+                )
+            elif max_file_bytes or max_file_tokens:
+                consolidator = SplitMarkdownConsolidator(
+                    externship_title,
+                    output_path,
+                    max_bytes=max_file_bytes,
+                    max_tokens=max_file_tokens
+                )
+            else:
+                consolidator = StreamingMarkdownConsolidator.open(
+                    externship_title,
+                    output_path,
+                    table_of_contents=True
+                )
+            try:
+                consolidator.add_header()
+                self._process_hierarchy(structure, consolidator)
+            except Exception:
+                consolidator.discard()
+                raise
+
+            duplicates = self._duplicate_savings(structure)
+            self.log(f"   ✓ All content exported successfully")
+            self._notify('step_done', step=4, label="Content export complete")
         except Exception as e:
-            print(f"   ✗ Error: {str(e)}")
-            sys.exit(1)
+            self.log(f"   ✗ Error: {str(e)}")
+            raise ExportError(str(e)) from e
 
         # Step 5: Save to file
-        print("\n💾 Step 5: Saving consolidated file...")
+        self.log("\n💾 Step 5: Saving consolidated file...")
+        self._notify('step', step=5, label="Saving consolidated file")
         try:
-            # Create output directory if it doesn't exist
-            os.makedirs(output_dir, exist_ok=True)
-
-            # Generate filename and save
-            filename = consolidator.generate_filename()
-            output_path = os.path.join(output_dir, filename)
             consolidator.save_to_file(output_path)
-
-            print(f"   ✓ Saved to: {output_path}")
+            output_paths = getattr(consolidator, 'part_paths', [output_path])
+            output_path = output_paths[0]
+
+            if len(output_paths) == 1:
+                self.log(f"   ✓ Saved to: {output_path}")
+            else:
+                self.log(f"   ✓ Saved {len(output_paths)} files:")
+                for path in output_paths:
+                    self.log(f"     - {path} ({os.path.getsize(path) / 1024:,.1f} KB)")
+            self._notify('step_done', step=5, label=f"Saved {len(output_paths)} file(s)")
+
+            incremental_stats = None
+            if manifest is not None:
+                incremental_stats = manifest.compare(structure)
+                manifest.update(structure)
+                manifest.save()
         except Exception as e:
-            print(f"   ✗ Error: {str(e)}")
-            sys.exit(1)
+            self.log(f"   ✗ Error: {str(e)}")
+            raise ExportError(str(e)) from e
 
         # Step 6: Show statistics
-        print("\n📊 Export Statistics:")
+        self.log("\n📊 Export Statistics:")
         stats = consolidator.get_statistics()
-        print(f"   • Characters: {stats['character_count']:,}")
-        print(f"   • Words: {stats['word_count']:,}")
-        print(f"   • Lines: {stats['line_count']:,}")
-        print(f"   • File size: {stats['estimated_size_kb']} KB ({stats['estimated_size_mb']} MB)")
+        self.log(f"   • Characters: {stats['character_count']:,}")
+        self.log(f"   • Words: {stats['word_count']:,}")
+        self.log(f"   • Lines: {stats['line_count']:,}")
+        self.log(f"   • Tokens (estimated): {stats['token_count']:,}")
+        if 'chunks' in stats:
+            self.log(f"   • Chunks: {stats['chunks']:,} of at most {chunk_tokens:,} tokens")
+        self.log(f"   • File size: {stats['estimated_size_kb']} KB ({stats['estimated_size_mb']} MB)")
+        if stats['duplicate_sections'] or stats['duplicate_blocks']:
+            self.log(f"   • Repeated content: {stats['duplicate_sections']:,} sections and "
+                     f"{stats['duplicate_blocks']:,} blocks replaced by references "
+                     f"({stats['dedup_ratio']:.1%} of page content)")
+        api_calls = self.notion.request_count - requests_at_start
+        retries = self.notion.retry_count - retries_at_start
+        self.log(f"   • API calls: {api_calls:,} ({retries:,} retried after rate limits or transient errors)")
+        if self.single_pass:
+            self.log(f"   • API calls saved by single-pass crawl: {self.api_calls_saved:,}")
+        self.log(f"   • Page lookups skipped (titled from child_page blocks): {self.page_requests_saved:,}")
+
+        if duplicates['references']:
+            self.log(f"   • Repeated pages: {duplicates['references']:,} cross-referenced, "
+                     f"{duplicates['fetches_avoided']:,} page fetches and "
+                     f"{duplicates['bytes_avoided'] / 1024:,.1f} KB of duplicate content avoided")
+
+        if incremental_stats is not None:
+            self.log(f"   • Incremental: {incremental_stats['reused']:,} pages reused, "
+                     f"{incremental_stats['refetched']:,} re-fetched "
+                     f"({incremental_stats['changed']:,} changed, {incremental_stats['added']:,} new), "
+                     f"{incremental_stats['removed']:,} removed")
+
+        cache_stats = None
+        if self.notion.cache:
+            self.notion.cache.flush()
+            hits, misses = self._cache_counts()
+            hits -= cache_at_start[0]
+            misses -= cache_at_start[1]
+            cache_stats = self.notion.cache.get_statistics()
+            cache_stats.update({
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': round(hits / (hits + misses), 3) if hits + misses else 0.0
+            })
+            self.log(f"   • Cache: {hits:,} hits, {misses:,} misses "
+                     f"({cache_stats['hit_rate']:.0%} hit rate, "
+                     f"{cache_stats['entries']:,} entries, {cache_stats['size_mb']} MB)")
+
+        connection_stats = None
+        if self.notion.http_pool:
+            now = self._connection_counts()
+            connection_stats = {
+                key: now[key] - connections_at_start[key]
+                for key in ('requests', 'connections_opened', 'tls_handshakes', 'reused')
+            }
+            requests = connection_stats['requests']
+            connection_stats['reuse_rate'] = round(connection_stats['reused'] / requests, 3) if requests else 0.0
+            self.log(f"   • Connections: {connection_stats['connections_opened']:,} opened "
+                     f"({connection_stats['tls_handshakes']:,} TLS handshakes) for {requests:,} requests, "
+                     f"{connection_stats['reuse_rate']:.0%} reused"
+                     f"{' over HTTP/2' if self.notion.http_pool.http2 else ''}")
 
         # Check if size is reasonable for GPT
-        if stats['estimated_size_mb'] > 10:
-            print(f"\n   ⚠️  Warning: File is quite large ({stats['estimated_size_mb']} MB)")
-            print(f"   Consider splitting into multiple files if GPT upload fails")
+        if stats.get('oversized_parts'):
+            self.log(f"\n   ⚠️  Warning: {stats['oversized_parts']} file(s) exceed the size limit "
+                     f"because a single section is larger than it")
+        elif len(output_paths) == 1 and stats['estimated_size_mb'] > 10:
+            self.log(f"\n   ⚠️  Warning: File is quite large ({stats['estimated_size_mb']} MB)")
+            self.log(f"   Consider splitting it with --max-file-mb or --max-file-tokens if GPT upload fails")
         else:
-            print(f"\n   ✓ File size is good for GPT training!")
+            self.log(f"\n   ✓ File size is good for GPT training!")
 
-        print(f"\n{'='*60}")
-        print("EXPORT COMPLETE! 🎉")
-        print(f"{'='*60}\n")
+        self.log(f"\n{'='*60}")
+        self.log("EXPORT COMPLETE! 🎉")
+        self.log(f"{'='*60}\n")
 
         return {
             'success': True,
             'output_path': output_path,
+            'output_paths': output_paths,
             'statistics': stats,
-            'externship_name': externship_title
+            'externship_name': externship_title,
+            'total_pages': total_pages,
+            'api_calls': api_calls,
+            'api_retries': retries,
+            'api_calls_saved': self.api_calls_saved,
+            'page_requests_saved': self.page_requests_saved,
+            'truncated': structure.get('truncated'),
+            'pages_skipped': self.pages_skipped,
+            'cache': cache_stats,
+            'connections': connection_stats,
+            'incremental': incremental_stats,
+            'duplicates': duplicates
         }
 
+    def _connection_counts(self) -> Dict[str, int]:
+        """Current counts of the connection pool, or zeros without one."""
+        if not self.notion.http_pool:
+            return {'requests': 0, 'connections_opened': 0, 'tls_handshakes': 0, 'reused': 0}
+        return self.notion.http_pool.stats.as_dict()
+
+    def _notify(self, event: str, **details):
+        """Send a progress event, if anyone is listening."""
+        if self.progress:
+            self.progress(event, details)
+
+    def _warn(self, message: str):
+        """Log a warning and report it as a progress event."""
+        self.log(message)
+        self._notify('warning', message=message.strip().lstrip('⚠️').strip())
+
+    def _cache_counts(self):
+        """Current (hits, misses) of the response cache, or (0, 0) without one."""
+        if not self.notion.cache:
+            return 0, 0
+        return self.notion.cache.hits, self.notion.cache.misses
+
     def _build_hierarchy(
         self,
         page_id: str,
         title: str,
-        level: int = 0,
-        max_level: int = 3
+        max_level: int = None,
+        last_edited_time: str = None,
+        manifest: ExportManifest = None,
+        checkpoint: CheckpointJournal = None
     ) -> Dict[str, Any]:
         """
-        Recursively build the page hierarchy.
+        Build the page hierarchy with a concurrent crawler.
+
+        Sibling subtrees are fetched in parallel by a PageCrawler; all
+        requests share the NotionExporter's rate limiter. In single-pass mode
+        each page's blocks are fetched once here: the listing is used to find
+        child pages and is rendered to markdown straight away, so
+        _process_hierarchy does not fetch it again.
 
         Args:
             page_id: Notion page ID
             title: Page title
-            level: Current hierarchy level (0=externship, 1=project, 2=step, 3=substep)
-            max_level: Maximum depth to traverse
+            max_level: Maximum depth to traverse (default: the exporter's)
+            last_edited_time: The page's last_edited_time, used to validate
+                cached responses
+            manifest: Previous export for incremental mode; unchanged pages
+                are taken from it instead of being fetched again
+            checkpoint: Journal of finished pages for resumable exports
 
         Returns:
             dict: Hierarchical structure of pages
         """
-        node = {
-            'id': page_id,
-            'title': title,
-            'level': level,
-            'children': []
-        }
-
-        # Don't go deeper than max_level
-        if level >= max_level:
-            return node
-
-        # Get child pages
-        child_page_ids = self.notion.get_child_pages(page_id)
-
-        # Recursively process children
-        for child_id in child_page_ids:
-            try:
-                child_page = self.notion.get_page(child_id)
-                child_title = self.notion.get_page_title(child_page)
-
-                child_node = self._build_hierarchy(
-                    child_id,
-                    child_title,
-                    level + 1,
-                    max_level
-                )
-
-                node['children'].append(child_node)
-            except Exception as e:
-                print(f"   ⚠️  Warning: Could not fetch child page {child_id}: {str(e)}")
-                continue
+        crawler = PageCrawler(
+            self.notion,
+            max_workers=self.max_workers,
+            max_level=self.max_level if max_level is None else max_level,
+            single_pass=self.single_pass,
+            warn=self._warn,
+            manifest=manifest,
+            checkpoint=checkpoint,
+            on_page=self._page_fetched if self.progress else None,
+            max_pages=self.max_pages,
+            max_seconds=self.max_seconds
+        )
+        self._pages_fetched = 0
+        structure = crawler.crawl(page_id, title, last_edited_time)
+        self.api_calls_saved += crawler.api_calls_saved
+        self.page_requests_saved += crawler.page_requests_saved
+        self.pages_skipped = crawler.pages_skipped
+        return structure
 
-        return node
+    def _page_fetched(self, node: Dict[str, Any]):
+        self._pages_fetched += 1
+        self._notify('page', title=node['title'], level=node['level'], pages=self._pages_fetched)
 
     def _count_pages(self, structure: Dict[str, Any]) -> int:
         """
@@ -207,6 +462,9 @@ class ExternshipExporter:
         Returns:
             int: Total page count
         """
+        if structure.get('reference'):
+            return 0  # Exported once, at its first occurrence
+
         count = 1  # Count this page
 
         if 'children' in structure:
@@ -215,6 +473,42 @@ class ExternshipExporter:
 
         return count
 
+    def _duplicate_savings(self, structure: Dict[str, Any]) -> Dict[str, int]:
+        """
+        Measure what exporting repeated pages once saved.
+
+        Args:
+            structure: Processed hierarchy (every page's content rendered)
+
+        Returns:
+            dict: 'references' (repeated occurrences), 'fetches_avoided'
+                (pages that would have been fetched again under them) and
+                'bytes_avoided' (markdown that would have been duplicated)
+        """
+        pages = {}
+        references = []
+        stack = [structure]
+        while stack:
+            node = stack.pop()
+            if node.get('reference'):
+                references.append(node)
+            else:
+                pages[node['id']] = node
+            stack.extend(node['children'])
+
+        savings = {'references': len(references), 'fetches_avoided': 0, 'bytes_avoided': 0}
+        for reference in references:
+            stack = [pages[reference['id']]]
+            while stack:
+                node = stack.pop()
+                if node.get('reference'):
+                    continue
+                savings['fetches_avoided'] += 1
+                savings['bytes_avoided'] += len((node.get('content') or '').encode('utf-8'))
+                stack.extend(node['children'])
+
+        return savings
+
     def _process_hierarchy(
         self,
         structure: Dict[str, Any],
@@ -232,23 +526,30 @@ class ExternshipExporter:
         title = structure['title']
         level = structure['level']
 
-        # Fetch and convert blocks to markdown
-        blocks = self.notion.get_blocks(page_id)
-        content_parts = []
-
-        for block in blocks:
-            markdown = self.notion.block_to_markdown(block)
-            if markdown:
-                content_parts.append(markdown)
-
-        content = '\n'.join(content_parts)
+        # Pages reached again point at their first occurrence
+        if structure.get('reference'):
+            consolidator.add_cross_reference(title, level, page_id=page_id)
+            return
+
+        # Reuse the content rendered during a single-pass crawl, otherwise
+        # fetch and convert blocks to markdown
+        content = structure.get('content')
+        if content is None:
+            blocks = self.notion.get_blocks(page_id, structure.get('last_edited_time'))
+            self.notion.expand_children(blocks, structure.get('last_edited_time'))
+            content = (
+                self.notion.properties_to_markdown(structure.get('properties'))
+                + self.notion.blocks_to_markdown(blocks)
+            )
+            structure['content'] = content
 
         # Add to consolidator (skip the root externship page itself)
         if level > 0:
             consolidator.add_page_content(
                 title=title,
                 content=content,
-                level=level
+                level=level,
+                page_id=page_id
             )
 
         # Process children
@@ -273,7 +574,115 @@ class ExternshipExporter:
     default=None,
     help='Custom externship name (optional, will use Notion page title if not provided)'
 )
-def main(url: str, output: str, name: str):
+@click.option(
+    '--single-pass/--two-pass',
+    default=True,
+    help='Fetch each page\'s blocks once for both hierarchy and content (default: single-pass)'
+)
+@click.option(
+    '--workers',
+    default=4,
+    show_default=True,
+    help='Number of pages fetched concurrently (all share one rate limit)'
+)
+@click.option(
+    '--cache/--no-cache',
+    default=True,
+    help='Reuse responses for unchanged pages from the local cache (default: on)'
+)
+@click.option(
+    '--incremental',
+    is_flag=True,
+    default=False,
+    help='Only re-fetch pages edited since the last export to the same output directory'
+)
+@click.option(
+    '--max-file-mb',
+    type=float,
+    default=None,
+    help='Split the output at project/step boundaries into files of at most this many MB'
+)
+@click.option(
+    '--max-file-tokens',
+    type=int,
+    default=None,
+    help='Split the output at project/step boundaries into files of at most this many (estimated) tokens'
+)
+@click.option(
+    '--pool-size',
+    default=10,
+    show_default=True,
+    help='HTTP connections kept open to Notion and reused between requests'
+)
+@click.option(
+    '--timeout',
+    default=60.0,
+    show_default=True,
+    help='Seconds to wait for a Notion response before retrying'
+)
+@click.option(
+    '--format',
+    'output_format',
+    type=click.Choice(['markdown', 'jsonl']),
+    default='markdown',
+    show_default=True,
+    help='markdown: one knowledge base document; jsonl: overlapping token-bounded chunks for retrieval'
+)
+@click.option(
+    '--chunk-tokens',
+    default=500,
+    show_default=True,
+    help='Largest chunk in the jsonl format, in estimated tokens'
+)
+@click.option(
+    '--chunk-overlap',
+    default=50,
+    show_default=True,
+    help='Tokens repeated between consecutive chunks of a section'
+)
+@click.option(
+    '--sort-by',
+    default=None,
+    help='Database property that orders steps kept as database rows (default: NOTION_DATABASE_SORT, else creation order)'
+)
+@click.option(
+    '--max-depth',
+    default=3,
+    show_default=True,
+    help='Deepest level crawled (1 = projects, 2 = steps, 3 = sub-steps)'
+)
+@click.option(
+    '--max-pages',
+    type=int,
+    default=None,
+    help='Stop crawling after this many pages and export the top levels fetched so far'
+)
+@click.option(
+    '--time-budget',
+    type=float,
+    default=None,
+    help='Stop crawling after this many seconds and export the top levels fetched so far'
+)
+def main(
+    url: str,
+    output: str,
+    name: str,
+    single_pass: bool,
+    workers: int,
+    cache: bool,
+    incremental: bool,
+    max_file_mb: float,
+    max_file_tokens: int,
+    output_format: str,
+    chunk_tokens: int,
+    chunk_overlap: int,
+    pool_size: int,
+    timeout: float,
+    sort_by: str,
+    max_depth: int,
+    max_pages: int,
+    time_budget: float
+):
     """
     Export a Notion externship to a GPT-ready markdown file.
 
@@ -297,24 +706,57 @@ def main(url: str, output: str, name: str):
         config = get_config()
 
         # Create exporter
-        exporter = ExternshipExporter(config.notion_api_key)
+        response_cache = ResponseCache(config.cache_path) if cache else None
+        http_pool = HttpPool(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+            timeout=timeout
+        )
+        exporter = ExternshipExporter(
+            config.notion_api_key,
+            single_pass=single_pass,
+            max_workers=workers,
+            cache=response_cache,
+            http_pool=http_pool,
+            database_sort=sort_by or config.database_sort,
+            max_level=max_depth,
+            max_pages=max_pages,
+            max_seconds=time_budget
+        )
 
         # Run export
-        result = exporter.export_externship(
-            page_url=url,
-            output_dir=output,
-            custom_name=name
-        )
+        try:
+            result = exporter.export_externship(
+                page_url=url,
+                output_dir=output,
+                custom_name=name,
+                incremental=incremental,
+                max_file_bytes=int(max_file_mb * 1024 * 1024) if max_file_mb else None,
+                max_file_tokens=max_file_tokens,
+                output_format=output_format,
+                chunk_tokens=chunk_tokens,
+                chunk_overlap=chunk_overlap
+            )
+        finally:
+            exporter.close()
+            http_pool.close()
+            if response_cache:
+                response_cache.close()
 
         # Success message
         print(f"\n✅ Ready to upload to OpenAI!")
-        print(f"   File: {result['output_path']}")
+        for path in result['output_paths']:
+            print(f"   File: {path}")
         print(f"\nNext steps:")
         print(f"   1. Go to https://platform.openai.com/playground")
         print(f"   2. Create or edit a custom GPT")
-        print(f"   3. Upload this file to the 'Knowledge' section")
+        print(f"   3. Upload {'these files' if len(result['output_paths']) > 1 else 'this file'} to the 'Knowledge' section")
         print(f"   4. Your GPT will now have access to the {result['externship_name']} content!\n")
 
+    except ExportError:
+        # The failing step has already been reported
+        sys.exit(1)
+
     except ValueError as e:
         print(f"\n❌ Configuration Error: {str(e)}")
         print(f"\nPlease make sure you have:")
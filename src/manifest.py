@@ -0,0 +1,155 @@
+"""
+Export manifest for incremental re-exports
+
+After each export, the manifest records every page's last_edited_time, its
+rendered markdown, a hash of that markdown and its child pages and inline
+databases. The next incremental export only lists and renders the blocks of
+pages whose last_edited_time changed; every other page's section is taken
+from the manifest and spliced into the new document unchanged. Databases
+are queried again every time: adding a row doesn't change the page that
+holds the database.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+import hashlib
+import json
+import os
+
+
+MANIFEST_VERSION = 2
+
+
+def content_hash(content: str) -> str:
+    """Hash rendered markdown so changed sections can be reported."""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class ExportManifest:
+    """
+    Per-externship record of the previous export.
+
+    Stored as JSON at `<output_dir>/.manifests/<page_id>.json`.
+    """
+
+    def __init__(self, path: str, warn: Callable[[str], None] = print):
+        """
+        Load the manifest at `path` if it exists.
+
+        Args:
+            path: Manifest file path
+            warn: Called with a message if the manifest can't be read (it is
+                then ignored)
+        """
+        self.path = path
+        self.pages: Dict[str, Dict[str, Any]] = {}
+
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == MANIFEST_VERSION:
+                    self.pages = data.get('pages', {})
+            except (OSError, ValueError) as e:
+                # A corrupt manifest only costs a full export
+                warn(f"   ⚠️  Warning: Ignoring unreadable manifest {path}: {str(e)}")
+
+    @staticmethod
+    def path_for(output_dir: str, page_id: str) -> str:
+        """Manifest location for an externship exported to `output_dir`."""
+        return os.path.join(output_dir, '.manifests', f"{page_id}.json")
+
+    def lookup(self, page_id: str, last_edited_time: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the previous export of a page if it hasn't been edited since.
+
+        Args:
+            page_id: Notion page ID
+            last_edited_time: The page's current last_edited_time
+
+        Returns:
+            dict: Previous entry with 'content', 'children' (child page and
+                database IDs, as listed) and 'databases', or None
+        """
+        entry = self.pages.get(page_id)
+        if not entry or not last_edited_time:
+            return None
+        if entry.get('last_edited_time') != last_edited_time:
+            return None
+        return entry
+
+    def compare(self, structure: Dict[str, Any]) -> Dict[str, int]:
+        """
+        Count how the crawled tree differs from the previous export.
+
+        Args:
+            structure: Hierarchy with rendered 'content' on every node
+
+        Returns:
+            dict: Counts of pages 'reused' from the manifest, 'refetched'
+                because they were edited, 'changed' (refetched with different
+                markdown), 'added' and 'removed'
+        """
+        counts = {'reused': 0, 'refetched': 0, 'changed': 0, 'added': 0, 'removed': 0}
+        seen = set()
+
+        for node in self._walk(structure):
+            seen.add(node['id'])
+            previous = self.pages.get(node['id'])
+
+            if node.get('reused'):
+                counts['reused'] += 1
+                continue
+
+            counts['refetched'] += 1
+            if previous is None:
+                counts['added'] += 1
+            elif previous.get('content_hash') != content_hash(node.get('content') or ''):
+                counts['changed'] += 1
+
+        counts['removed'] = len(set(self.pages) - seen)
+        return counts
+
+    def update(self, structure: Dict[str, Any]):
+        """
+        Replace the recorded pages with those of a freshly crawled tree.
+
+        Args:
+            structure: Hierarchy with rendered 'content' on every node
+        """
+        pages = {}
+
+        for node in self._walk(structure):
+            content = node.get('content') or ''
+            pages[node['id']] = {
+                'title': node['title'],
+                'last_edited_time': node.get('last_edited_time'),
+                'content_hash': content_hash(content),
+                'content': content,
+                'children': node.get('listing', [child['id'] for child in node['children']]),
+                'databases': node.get('databases', [])
+            }
+
+        self.pages = pages
+
+    def save(self):
+        """Write the manifest atomically next to the exported files."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'pages': self.pages}, f)
+        os.replace(temp_path, self.path)
+
+    def _walk(self, node: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """All pages of the tree, parents before children (cross-references skipped)."""
+        nodes = []
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if current.get('reference'):
+                continue
+            nodes.append(current)
+            stack.extend(reversed(current['children']))
+        return nodes
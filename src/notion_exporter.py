@@ -5,13 +5,243 @@ This module handles all interactions with the Notion API, including:
 - Authenticating with API key
 - Fetching pages and their content
 - Recursively retrieving all child pages (projects, steps, sub-steps)
+- Querying inline databases, whose rows are child pages too
+- Expanding nested blocks (toggles, nested lists, columns, synced blocks)
 - Converting Notion blocks to markdown format
+- Retrying rate-limited (429) and transient 5xx/network failures
+- Reusing cached block listings for pages that haven't been edited
 """
 
 from notion_client import Client
-from typing import List, Dict, Any
+from notion_client.errors import HTTPResponseError, RequestTimeoutError
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple, Callable
+import httpx
+import random
+import threading
 import time
 
+from http_pool import HttpPool
+from rate_limiter import TokenBucket
+from response_cache import ResponseCache
+
+
+# Blocks whose children are separate pages, crawled as part of the hierarchy
+# rather than expanded into the parent page's content
+PAGE_BLOCK_TYPES = ('child_page', 'child_database')
+
+# How nested children are indented under their parent block. Containers
+# such as columns and synced blocks render their children in place.
+CHILD_PREFIXES = {
+    'bulleted_list_item': '  ',
+    'numbered_list_item': '   ',
+    'to_do': '  ',
+    'toggle': '  ',
+    'paragraph': '  ',
+    'quote': '> ',
+    'callout': '> ',
+}
+
+# Blocks whose children are not rendered below them: page blocks, and
+# tables, which render their own rows
+SELF_CONTAINED_TYPES = frozenset(PAGE_BLOCK_TYPES + ('table',))
+
+# Markdown markers for rich-text annotations, outermost first; each
+# annotation's bit in a run's mask is 1 << its position here
+ANNOTATION_MARKERS = (
+    ('underline', '<u>', '</u>'),
+    ('strikethrough', '~~', '~~'),
+    ('italic', '*', '*'),
+    ('bold', '**', '**'),
+    ('code', '`', '`'),
+)
+
+
+def _build_rich_text_markers() -> List[Tuple[str, str]]:
+    """(opening, closing) marker strings for every annotation mask."""
+    markers = []
+    for mask in range(1 << len(ANNOTATION_MARKERS)):
+        active = [
+            (opening, closing)
+            for bit, (_, opening, closing) in enumerate(ANNOTATION_MARKERS)
+            if mask & (1 << bit)
+        ]
+        markers.append((
+            ''.join(opening for opening, _ in active),
+            ''.join(closing for _, closing in reversed(active))
+        ))
+    return markers
+
+
+# Indexed by annotation mask; built once so rendering a run never formats markers
+RICH_TEXT_MARKERS = _build_rich_text_markers()
+
+
+def _parse_partial_run(text_obj: Dict[str, Any]) -> Tuple[str, Dict[str, Any], int]:
+    """(text, link, annotation mask) of a rich-text run missing some keys."""
+    run_type = text_obj.get('type')
+    link = None
+    if run_type == 'text':
+        text = text_obj['text'].get('content', '')
+        link = text_obj['text'].get('link')
+    elif run_type == 'equation':
+        text = f"${text_obj['equation'].get('expression', '')}$"
+    else:
+        text = text_obj.get('plain_text') or ''
+
+    annotations = text_obj.get('annotations') or {}
+    mask = 0
+    for bit, (name, _, _) in enumerate(ANNOTATION_MARKERS):
+        if annotations.get(name):
+            mask |= 1 << bit
+    return text, link, mask
+
+
+# Renderer signature: (exporter, block) -> markdown
+BlockRenderer = Callable[['NotionExporter', Dict[str, Any]], str]
+
+
+def _text_renderer(block_type: str, prefix: str = '') -> BlockRenderer:
+    """Renderer for a rich-text block shown as `prefix` + its text."""
+    def render(exporter: 'NotionExporter', block: Dict[str, Any]) -> str:
+        return prefix + exporter._extract_rich_text(block[block_type]['rich_text'])
+    return render
+
+
+def _render_to_do(exporter: 'NotionExporter', block: Dict[str, Any]) -> str:
+    to_do = block['to_do']
+    checkbox = "[x]" if to_do.get('checked') else "[ ]"
+    return f"- {checkbox} {exporter._extract_rich_text(to_do['rich_text'])}"
+
+
+def _render_code(exporter: 'NotionExporter', block: Dict[str, Any]) -> str:
+    code = block['code']
+    text = exporter._extract_rich_text(code['rich_text'])
+    return f"```{code.get('language', '')}\n{text}\n```"
+
+
+def _render_divider(exporter: 'NotionExporter', block: Dict[str, Any]) -> str:
+    return "---"
+
+
+def _render_equation(exporter: 'NotionExporter', block: Dict[str, Any]) -> str:
+    return f"$$\n{block['equation']['expression']}\n$$"
+
+
+def _render_table(exporter: 'NotionExporter', block: Dict[str, Any]) -> str:
+    """Render a table from its table_row children (see expand_children)."""
+    rows = [
+        [
+            exporter._extract_rich_text(cell).replace('|', '\\|').replace('\n', ' ')
+            for cell in row['table_row']['cells']
+        ]
+        for row in block.get('children', [])
+        if row.get('type') == 'table_row'
+    ]
+    if not rows:
+        return ""
+
+    # Markdown tables need a header row; Notion tables without one use the first row
+    width = max(len(row) for row in rows)
+    lines = []
+    for index, row in enumerate(rows):
+        cells = row + [''] * (width - len(row))
+        lines.append('| ' + ' | '.join(cells) + ' |')
+        if index == 0:
+            lines.append('|' + ' --- |' * width)
+    return '\n'.join(lines)
+
+
+def _file_url(data: Dict[str, Any]) -> str:
+    """URL of an external file; Notion-hosted file URLs expire, so they're dropped."""
+    if data.get('type') == 'external':
+        return data['external'].get('url', '')
+    return ''
+
+
+def _media_renderer(label: str) -> BlockRenderer:
+    """Renderer for images, videos and files: kept only as their caption."""
+    def render(exporter: 'NotionExporter', block: Dict[str, Any]) -> str:
+        data = block[block['type']]
+        caption = exporter._extract_rich_text(data.get('caption', []))
+        if not caption:
+            return ""
+        url = _file_url(data)
+        return f"[{label}: {caption}]({url})" if url else f"[{label}: {caption}]"
+    return render
+
+
+def _render_link(exporter: 'NotionExporter', block: Dict[str, Any]) -> str:
+    """Bookmarks, embeds and link previews: a link titled by its caption."""
+    data = block[block['type']]
+    url = data.get('url', '')
+    if not url:
+        return ""
+    caption = exporter._extract_rich_text(data.get('caption', []))
+    return f"[{caption or url}]({url})"
+
+
+# Rows requested per databases.query call (the API's maximum)
+DATABASE_PAGE_SIZE = 100
+
+
+def _property_text(exporter: 'NotionExporter', prop: Dict[str, Any]) -> str:
+    """Plain-text value of a database property; empty if unset or unsupported."""
+    prop_type = prop.get('type')
+    value = prop.get(prop_type)
+    if value is None or value == []:
+        return ''
+
+    if prop_type in ('title', 'rich_text'):
+        return exporter._extract_rich_text(value)
+    if prop_type in ('select', 'status'):
+        return value.get('name', '')
+    if prop_type == 'multi_select':
+        return ', '.join(option.get('name', '') for option in value)
+    if prop_type == 'date':
+        end = value.get('end')
+        return f"{value['start']} → {end}" if end else value.get('start') or ''
+    if prop_type == 'checkbox':
+        return 'Yes' if value else 'No'
+    if prop_type == 'people':
+        return ', '.join(person.get('name') or person.get('id', '') for person in value)
+    if prop_type == 'files':
+        return ', '.join(f.get('name', '') for f in value)
+    if prop_type == 'formula':
+        return str(value.get(value.get('type'), '') or '')
+    if prop_type in ('number', 'url', 'email', 'phone_number', 'created_time', 'last_edited_time'):
+        return str(value)
+    return ''
+
+
+# Default renderers by block type. Types missing here (child pages, columns,
+# synced blocks, ...) render nothing themselves; see
+# NotionExporter.register_renderer to add or override one.
+BLOCK_RENDERERS: Dict[str, BlockRenderer] = {
+    'paragraph': _text_renderer('paragraph'),
+    'heading_1': _text_renderer('heading_1', '# '),
+    'heading_2': _text_renderer('heading_2', '## '),
+    'heading_3': _text_renderer('heading_3', '### '),
+    'bulleted_list_item': _text_renderer('bulleted_list_item', '- '),
+    'numbered_list_item': _text_renderer('numbered_list_item', '1. '),
+    'toggle': _text_renderer('toggle', '- '),
+    'quote': _text_renderer('quote', '> '),
+    'callout': _text_renderer('callout', '> **Note:** '),
+    'to_do': _render_to_do,
+    'code': _render_code,
+    'divider': _render_divider,
+    'equation': _render_equation,
+    'table': _render_table,
+    'image': _media_renderer('Image'),
+    'video': _media_renderer('Video'),
+    'audio': _media_renderer('Audio'),
+    'file': _media_renderer('File'),
+    'pdf': _media_renderer('PDF'),
+    'bookmark': _render_link,
+    'embed': _render_link,
+    'link_preview': _render_link,
+}
+
 
 class NotionExporter:
     """
@@ -21,15 +251,132 @@ class NotionExporter:
     simple methods to extract content hierarchically.
     """
 
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        client: Client = None,
+        rate_limiter: TokenBucket = None,
+        max_retries: int = 5,
+        cache: ResponseCache = None,
+        nested_workers: int = 4,
+        http_pool: HttpPool = None,
+        database_sort: str = None
+    ):
         """
         Initialize the Notion client.
 
         Args:
             api_key: Notion integration API token
+            client: Optional pre-built Notion client (e.g. a fake for tests)
+            rate_limiter: Optional limiter shared with other exporters;
+                defaults to Notion's limit of ~3 requests/second
+            max_retries: Retries per request for rate limits and transient errors
+            cache: Optional persistent response cache
+            nested_workers: Nested block listings fetched concurrently
+                (shared by every caller of this exporter)
+            http_pool: Connection pool to send requests through, e.g. one
+                shared with other exporters; a private one is created if
+                neither this nor `client` is given
+            database_sort: Database property that orders the rows of inline
+                databases (ascending); by default rows keep their creation order
+        """
+        self._owns_http_pool = client is None and http_pool is None
+        if client is None:
+            http_pool = http_pool or HttpPool()
+            client = http_pool.notion_client(api_key)
+        self.client = client
+        self.http_pool = http_pool
+        self.rate_limiter = rate_limiter or TokenBucket(rate=3.0, capacity=3.0)
+        self.max_retries = max_retries
+        self.cache = cache
+        self.database_sort = database_sort
+        self.expand_nested = True  # Fetch children of blocks with has_children
+        self.nested_workers = nested_workers
+        self._nested_pool = None
+        self._pool_lock = threading.Lock()
+        self.backoff_base = 0.5  # Seconds; doubled on each retry
+        self.backoff_cap = 30.0  # Longest single backoff in seconds
+        self.sleep = time.sleep
+        self.request_count = 0  # Total API requests made by this client
+        self.retry_count = 0  # Requests that were retried after a failure
+        self._count_lock = threading.Lock()
+        self.renderers = dict(BLOCK_RENDERERS)  # Block type -> renderer
+
+    def _before_request(self):
+        """Wait for the shared rate budget and count the request."""
+        self.rate_limiter.acquire()
+        with self._count_lock:
+            self.request_count += 1
+
+    def _call_api(self, request: Callable[..., Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        """
+        Make one API request, retrying rate limits and transient failures.
+
+        Args:
+            request: Notion client endpoint method, e.g. client.pages.retrieve
+            **kwargs: Arguments for the endpoint
+
+        Returns:
+            dict: API response
         """
-        self.client = Client(auth=api_key)
-        self.rate_limit_delay = 0.35  # Notion API limit: ~3 requests/second
+        attempt = 0
+
+        while True:
+            self._before_request()
+            try:
+                response = request(**kwargs)
+            except Exception as e:
+                if attempt >= self.max_retries or not self._wait_before_retry(e, attempt):
+                    raise
+                attempt += 1
+                with self._count_lock:
+                    self.retry_count += 1
+                continue
+
+            self.rate_limiter.on_success()
+            return response
+
+    def _wait_before_retry(self, error: Exception, attempt: int) -> bool:
+        """
+        Decide whether a failed request is worth retrying, and wait if so.
+
+        Rate-limit responses pause the shared limiter (honouring Retry-After)
+        so every worker backs off together. Server errors and network
+        failures back off only the failing request, with full jitter.
+
+        Args:
+            error: Exception raised by the Notion client
+            attempt: Number of retries already made for this request
+
+        Returns:
+            bool: True if the request should be retried
+        """
+        backoff = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+        if isinstance(error, HTTPResponseError):
+            if error.status == 429 or getattr(error, 'code', None) == 'rate_limited':
+                retry_after = self._parse_retry_after(error.headers.get('retry-after'))
+                self.rate_limiter.throttle(retry_after if retry_after is not None else backoff)
+                return True
+
+            if error.status in (500, 502, 503, 504):
+                self.sleep(backoff)
+                return True
+
+            return False
+
+        if isinstance(error, (RequestTimeoutError, httpx.TimeoutException, httpx.NetworkError)):
+            self.sleep(backoff)
+            return True
+
+        return False
+
+    def _parse_retry_after(self, value: str) -> float:
+        """Parse a Retry-After header given in seconds; None if absent or invalid."""
+        try:
+            return max(0.0, float(value))
+        except (TypeError, ValueError):
+            return None
 
     def extract_page_id(self, page_url: str) -> str:
         """
@@ -63,6 +410,9 @@ class NotionExporter:
         """
         Fetch a single page's metadata from Notion.
 
+        Never cached: pages are only fetched to learn their title and
+        last_edited_time, so there is no timestamp to validate an entry by.
+
         Args:
             page_id: Notion page ID
 
@@ -70,12 +420,11 @@ class NotionExporter:
             dict: Page metadata including title, properties, etc.
         """
         try:
-            time.sleep(self.rate_limit_delay)  # Rate limiting
-            return self.client.pages.retrieve(page_id=page_id)
+            return self._call_api(self.client.pages.retrieve, page_id=page_id)
         except Exception as e:
             raise Exception(f"Failed to fetch page {page_id}: {str(e)}")
 
-    def get_blocks(self, page_id: str) -> List[Dict[str, Any]]:
+    def get_blocks(self, page_id: str, last_edited_time: str = None) -> List[Dict[str, Any]]:
         """
         Fetch all content blocks from a page.
 
@@ -84,21 +433,52 @@ class NotionExporter:
 
         Args:
             page_id: Notion page ID
+            last_edited_time: The page's last_edited_time, used to validate
+                a cached listing
 
         Returns:
             list: All blocks from the page
         """
+        blocks, _ = self.get_block_listing(page_id, last_edited_time)
+        return blocks
+
+    def get_block_listing(
+        self,
+        page_id: str,
+        last_edited_time: str = None
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Fetch all content blocks from a page and report the request cost.
+
+        Same as get_blocks, but also returns how many paginated API requests
+        the listing took, so callers that reuse a listing can report the
+        requests they saved. A listing served from the cache costs 0.
+
+        Args:
+            page_id: Notion page ID
+            last_edited_time: The page's last_edited_time, used to validate
+                a cached listing
+
+        Returns:
+            tuple: (all blocks from the page, number of API requests made)
+        """
+        if self.cache:
+            cached = self.cache.get_blocks(page_id, last_edited_time)
+            if cached is not None:
+                return cached, 0
+
         blocks = []
         start_cursor = None
+        requests_made = 0
 
         try:
             while True:
-                time.sleep(self.rate_limit_delay)  # Rate limiting
-
-                response = self.client.blocks.children.list(
+                response = self._call_api(
+                    self.client.blocks.children.list,
                     block_id=page_id,
                     start_cursor=start_cursor
                 )
+                requests_made += 1
 
                 blocks.extend(response['results'])
 
@@ -108,11 +488,89 @@ class NotionExporter:
 
                 start_cursor = response['next_cursor']
 
-            return blocks
-
         except Exception as e:
             raise Exception(f"Failed to fetch blocks for page {page_id}: {str(e)}")
 
+        if self.cache:
+            self.cache.put_blocks(page_id, last_edited_time, blocks)
+        return blocks, requests_made
+
+    def expand_children(self, blocks: List[Dict[str, Any]], last_edited_time: str = None) -> int:
+        """
+        Fetch the nested children of blocks that have them, at every depth.
+
+        Toggles, nested list items, columns and synced blocks keep their
+        content in child blocks that a page listing doesn't include. They are
+        fetched one depth at a time: all blocks at a depth are listed
+        concurrently (bounded by nested_workers and the shared rate limit),
+        so a deeply nested page costs one round of requests per depth
+        rather than one serial request per block. Each expanded block gets
+        a 'children' list.
+
+        Args:
+            blocks: Top-level blocks of a page; modified in place
+            last_edited_time: The page's last_edited_time, used to validate
+                cached listings (any edit inside a page updates it)
+
+        Returns:
+            int: Number of nested listings fetched or read from the cache
+        """
+        if not self.expand_nested:
+            return 0
+
+        expanded = 0
+        frontier = self._blocks_to_expand(blocks)
+
+        while frontier:
+            pool = self._get_nested_pool()
+            futures = [
+                pool.submit(self.get_blocks, block['id'], last_edited_time)
+                for block in frontier
+            ]
+
+            next_frontier = []
+            for block, future in zip(frontier, futures):
+                block['children'] = future.result()
+                next_frontier.extend(self._blocks_to_expand(block['children']))
+
+            expanded += len(frontier)
+            frontier = next_frontier
+
+        return expanded
+
+    def _blocks_to_expand(self, blocks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Blocks with unfetched children that belong to this page's content."""
+        return [
+            block for block in blocks
+            if block.get('has_children')
+            and block.get('type') not in PAGE_BLOCK_TYPES
+            and 'children' not in block
+        ]
+
+    def _get_nested_pool(self) -> ThreadPoolExecutor:
+        """Thread pool for nested listings, created on first use."""
+        with self._pool_lock:
+            if self._nested_pool is None:
+                self._nested_pool = ThreadPoolExecutor(
+                    max_workers=max(1, self.nested_workers),
+                    thread_name_prefix='notion-nested'
+                )
+            return self._nested_pool
+
+    def close(self):
+        """
+        Stop the nested-listing threads, and close the connection pool if
+        this exporter created it. Pools and caches passed in are left open
+        for their other users.
+        """
+        with self._pool_lock:
+            pool, self._nested_pool = self._nested_pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+        if self._owns_http_pool:
+            self.http_pool.close()
+            self._owns_http_pool = False
+
     def get_child_pages(self, page_id: str) -> List[str]:
         """
         Get all child page IDs under a parent page.
@@ -123,128 +581,337 @@ class NotionExporter:
         Returns:
             list: List of child page IDs
         """
-        child_page_ids = []
+        return [ref['id'] for ref in self.get_child_refs(page_id)]
+
+    def get_child_refs(self, page_id: str, database_rows: bool = True) -> List[Dict[str, Any]]:
+        """
+        List a page's blocks and return its child pages, database rows included.
+
+        Nested blocks are expanded first, so pages inside toggles and
+        columns are found too.
 
+        Args:
+            page_id: Parent page ID
+            database_rows: Replace inline databases by their rows; if False,
+                databases are returned as refs for resolve_databases
+
+        Returns:
+            list: Child page refs as returned by resolve_databases (or
+                extract_child_refs)
+        """
         try:
             blocks = self.get_blocks(page_id)
+            self.expand_children(blocks)
+            child_refs = self.extract_child_refs(blocks)
+            return self.resolve_databases(child_refs) if database_rows else child_refs
+
+        except Exception as e:
+            print(f"Warning: Could not fetch child pages for {page_id}: {str(e)}")
+            return []
+
+    def query_database(self, database_id: str) -> List[Dict[str, Any]]:
+        """
+        Fetch every row of a database, DATABASE_PAGE_SIZE rows per request.
 
-            for block in blocks:
-                block_type = block.get('type')
+        Each row is a full page object with its properties, so the rows
+        don't need to be retrieved one by one.
 
-                # Child pages appear as 'child_page' blocks
-                if block_type == 'child_page':
-                    child_page_ids.append(block['id'])
+        Args:
+            database_id: Notion database ID
 
-                # Some pages might be embedded as links
-                elif block_type == 'link_to_page':
-                    link_type = block['link_to_page']['type']
-                    if link_type == 'page_id':
-                        child_page_ids.append(block['link_to_page']['page_id'])
+        Returns:
+            list: Page objects, ordered by `database_sort` (or creation time)
+        """
+        if self.database_sort:
+            sorts = [{'property': self.database_sort, 'direction': 'ascending'}]
+        else:
+            sorts = [{'timestamp': 'created_time', 'direction': 'ascending'}]
 
-            return child_page_ids
+        rows = []
+        start_cursor = None
+
+        try:
+            while True:
+                kwargs = {'database_id': database_id, 'page_size': DATABASE_PAGE_SIZE, 'sorts': sorts}
+                if start_cursor:
+                    kwargs['start_cursor'] = start_cursor
+                response = self._call_api(self.client.databases.query, **kwargs)
+
+                rows.extend(response['results'])
+
+                if not response['has_more']:
+                    break
+
+                start_cursor = response['next_cursor']
 
         except Exception as e:
-            print(f"Warning: Could not fetch child pages for {page_id}: {str(e)}")
-            return []
+            raise Exception(f"Failed to query database {database_id}: {str(e)}")
 
-    def block_to_markdown(self, block: Dict[str, Any]) -> str:
+        return rows
+
+    def resolve_databases(
+        self,
+        child_refs: List[Dict[str, Any]],
+        warn: Callable[[str], None] = print
+    ) -> List[Dict[str, Any]]:
         """
-        Convert a Notion block to markdown format.
+        Replace refs to inline databases with refs to their rows.
+
+        Rows take the database's place among the page's children. Their
+        title, last_edited_time and properties come from the query results.
 
         Args:
-            block: Notion block object
+            child_refs: Refs returned by extract_child_refs
+            warn: Called with a message when a database can't be queried;
+                its rows are left out
 
         Returns:
-            str: Markdown representation of the block
+            list: Child page refs; rows have type 'database_row' and a
+                'properties' dict of property name -> plain-text value
+        """
+        resolved = []
+        for ref in child_refs:
+            if ref['type'] != 'child_database':
+                resolved.append(ref)
+                continue
+
+            try:
+                rows = self.query_database(ref['id'])
+            except Exception as e:
+                warn(f"   ⚠️  Warning: Could not query database {ref['title'] or ref['id']}: {str(e)}")
+                continue
+
+            for row in rows:
+                resolved.append({
+                    'id': row['id'],
+                    'type': 'database_row',
+                    'title': self.get_page_title(row),
+                    'last_edited_time': row.get('last_edited_time'),
+                    'properties': self.get_page_properties(row)
+                })
+
+        return resolved
+
+    def extract_child_page_ids(self, blocks: List[Dict[str, Any]]) -> List[str]:
         """
-        block_type = block.get('type')
+        Find child page IDs in an already-fetched block listing.
 
-        # Handle different block types
-        if block_type == 'paragraph':
-            return self._extract_rich_text(block['paragraph']['rich_text'])
+        Args:
+            blocks: Blocks returned by get_blocks
 
-        elif block_type == 'heading_1':
-            text = self._extract_rich_text(block['heading_1']['rich_text'])
-            return f"# {text}"
+        Returns:
+            list: List of child page IDs, in block order
+        """
+        return [ref['id'] for ref in self.extract_child_refs(blocks)]
 
-        elif block_type == 'heading_2':
-            text = self._extract_rich_text(block['heading_2']['rich_text'])
-            return f"## {text}"
+    def extract_child_refs(self, blocks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Find child pages in a block listing, with what the listing says about them.
 
-        elif block_type == 'heading_3':
-            text = self._extract_rich_text(block['heading_3']['rich_text'])
-            return f"### {text}"
+        Expanded nested blocks are searched too, in document order.
 
-        elif block_type == 'bulleted_list_item':
-            text = self._extract_rich_text(block['bulleted_list_item']['rich_text'])
-            return f"- {text}"
+        Args:
+            blocks: Blocks returned by get_blocks
 
-        elif block_type == 'numbered_list_item':
-            text = self._extract_rich_text(block['numbered_list_item']['rich_text'])
-            return f"1. {text}"
+        Returns:
+            list: One dict per child page or inline database, in block
+                order, with keys 'id', 'type' ('child_page', 'link_to_page'
+                or 'child_database'), 'title' and 'last_edited_time' (both
+                None for links: the block names neither the target's title
+                nor when it was edited). See resolve_databases for the
+                databases' rows.
+        """
+        child_refs = []
+
+        # Child pages can also sit inside toggles and columns
+        stack = list(reversed(blocks))
+        while stack:
+            block = stack.pop()
+            block_type = block.get('type')
+            stack.extend(reversed(block.get('children', [])))
+
+            # Child pages appear as 'child_page' blocks
+            if block_type == 'child_page':
+                child_refs.append({
+                    'id': block['id'],
+                    'type': block_type,
+                    'title': block['child_page'].get('title') or 'Untitled',
+                    'last_edited_time': block.get('last_edited_time')
+                })
+
+            elif block_type == 'child_database':
+                child_refs.append({
+                    'id': block['id'],
+                    'type': block_type,
+                    'title': block['child_database'].get('title'),
+                    'last_edited_time': block.get('last_edited_time')
+                })
+
+            # Some pages might be embedded as links
+            elif block_type == 'link_to_page':
+                link_type = block['link_to_page']['type']
+                if link_type == 'page_id':
+                    child_refs.append({
+                        'id': block['link_to_page']['page_id'],
+                        'type': block_type,
+                        'title': None,
+                        'last_edited_time': None
+                    })
+
+        return child_refs
+
+    def register_renderer(self, block_type: str, renderer: BlockRenderer):
+        """
+        Render a block type with a custom handler (or replace a built-in one).
 
-        elif block_type == 'to_do':
-            text = self._extract_rich_text(block['to_do']['rich_text'])
-            checked = block['to_do']['checked']
-            checkbox = "[x]" if checked else "[ ]"
-            return f"- {checkbox} {text}"
+        Args:
+            block_type: Notion block type, e.g. 'synced_block'
+            renderer: Called as renderer(exporter, block); returns markdown,
+                or an empty string to skip the block
+        """
+        self.renderers[block_type] = renderer
 
-        elif block_type == 'code':
-            text = self._extract_rich_text(block['code']['rich_text'])
-            language = block['code'].get('language', '')
-            return f"```{language}\n{text}\n```"
+    def blocks_to_markdown(self, blocks: List[Dict[str, Any]]) -> str:
+        """
+        Convert a page's block listing to markdown.
 
-        elif block_type == 'quote':
-            text = self._extract_rich_text(block['quote']['rich_text'])
-            return f"> {text}"
+        Each block is dispatched to its renderer by type; block types without
+        a renderer are skipped. Nested children (see expand_children) are
+        rendered below their block, indented to match it.
 
-        elif block_type == 'callout':
-            text = self._extract_rich_text(block['callout']['rich_text'])
-            return f"> **Note:** {text}"
+        Args:
+            blocks: Blocks returned by get_blocks
 
-        elif block_type == 'divider':
-            return "---"
+        Returns:
+            str: Markdown content of the page, one block per line
+        """
+        renderers = self.renderers
+        content_parts = []
+        append = content_parts.append
 
-        # Skip child_page blocks (handled separately)
-        elif block_type == 'child_page':
-            return ""
+        for block in blocks:
+            block_type = block.get('type')
+            renderer = renderers.get(block_type)
+            markdown = renderer(self, block) if renderer is not None else ''
 
-        # For unsupported blocks, return empty string
-        else:
-            return ""
+            children = block.get('children')
+            if children and block_type not in SELF_CONTAINED_TYPES:
+                markdown = self._with_children(block_type, markdown, children)
+
+            if markdown:
+                append(markdown)
+
+        return '\n'.join(content_parts)
+
+    def block_to_markdown(self, block: Dict[str, Any]) -> str:
+        """
+        Convert a Notion block (and its nested children) to markdown format.
+
+        Args:
+            block: Notion block object
+
+        Returns:
+            str: Markdown representation of the block
+        """
+        return self.blocks_to_markdown([block])
+
+    def _with_children(self, block_type: str, markdown: str, children: List[Dict[str, Any]]) -> str:
+        """Append a block's rendered children, indented under it."""
+        children_markdown = self.blocks_to_markdown(children)
+        if not children_markdown:
+            return markdown
+
+        prefix = CHILD_PREFIXES.get(block_type, '')
+        if prefix:
+            children_markdown = '\n'.join(
+                prefix + line if line else prefix.rstrip()
+                for line in children_markdown.split('\n')
+            )
+
+        if not markdown:
+            return children_markdown
+        return f"{markdown}\n{children_markdown}"
 
     def _extract_rich_text(self, rich_text_array: List[Dict]) -> str:
         """
-        Extract plain text from Notion's rich text format.
+        Render Notion's rich text format as markdown.
 
-        Notion stores text with formatting annotations. This extracts just the text.
+        Each run is emitted in one pass as its opening markers, its text and
+        its closing markers, looked up by annotation mask in RICH_TEXT_MARKERS.
+        Links, inline equations and mentions are kept. Whitespace at the
+        edges of an annotated run goes outside the markers (`**bold** `, not
+        `**bold **`), as markdown requires.
 
         Args:
             rich_text_array: Array of rich text objects from Notion
 
         Returns:
-            str: Plain text content
+            str: Markdown text
         """
         if not rich_text_array:
             return ""
 
-        text_parts = []
-        for text_obj in rich_text_array:
-            if text_obj.get('type') == 'text':
-                plain_text = text_obj['text']['content']
+        parts = []
+        append = parts.append
+        markers = RICH_TEXT_MARKERS
 
-                # Apply markdown formatting based on annotations
-                annotations = text_obj.get('annotations', {})
-                if annotations.get('bold'):
-                    plain_text = f"**{plain_text}**"
-                if annotations.get('italic'):
-                    plain_text = f"*{plain_text}*"
-                if annotations.get('code'):
-                    plain_text = f"`{plain_text}`"
-
-                text_parts.append(plain_text)
-
-        return ''.join(text_parts)
+        for text_obj in rich_text_array:
+            # API responses carry every key, so plain subscripts (the fast
+            # path) only miss on hand-built runs
+            try:
+                run_type = text_obj['type']
+                if run_type == 'text':
+                    text_data = text_obj['text']
+                    text = text_data['content']
+                    link = text_data['link']
+                elif run_type == 'equation':
+                    text = f"${text_obj['equation']['expression']}$"
+                    link = None
+                else:
+                    # Mentions (pages, users, dates) render as their display text
+                    text = text_obj['plain_text']
+                    link = None
+
+                # Bits follow ANNOTATION_MARKERS
+                annotations = text_obj['annotations']
+                mask = 0
+                if annotations['underline']:
+                    mask |= 1
+                if annotations['strikethrough']:
+                    mask |= 2
+                if annotations['italic']:
+                    mask |= 4
+                if annotations['bold']:
+                    mask |= 8
+                if annotations['code']:
+                    mask |= 16
+            except KeyError:
+                text, link, mask = _parse_partial_run(text_obj)
+
+            if not mask and not link:
+                append(text)
+                continue
+
+            opening, closing = markers[mask]
+
+            # Markers must hug the text, so edge whitespace goes outside them
+            stripped = text.strip()
+            if len(stripped) != len(text):
+                if not stripped:
+                    append(text)
+                    continue
+                start = text.index(stripped[0])
+                end = start + len(stripped)
+                if link:
+                    append(f"{text[:start]}[{opening}{stripped}{closing}]({link['url']}){text[end:]}")
+                else:
+                    append(f"{text[:start]}{opening}{stripped}{closing}{text[end:]}")
+            elif link:
+                append(f"[{opening}{text}{closing}]({link['url']})")
+            else:
+                append(opening + text + closing)
+
+        return ''.join(parts)
 
     def get_page_title(self, page_data: Dict[str, Any]) -> str:
         """
@@ -273,3 +940,38 @@ class NotionExporter:
 
         except Exception:
             return "Untitled"
+
+    def get_page_properties(self, page_data: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Extract a database row's properties as plain text.
+
+        Args:
+            page_data: Page object from Notion API (e.g. a databases.query row)
+
+        Returns:
+            dict: Property name -> value, in the page's order; the title and
+                empty properties are left out
+        """
+        properties = {}
+        for name, prop in page_data.get('properties', {}).items():
+            if prop.get('type') == 'title':
+                continue
+            value = _property_text(self, prop)
+            if value:
+                properties[name] = value
+        return properties
+
+    def properties_to_markdown(self, properties: Optional[Dict[str, str]]) -> str:
+        """
+        Render a row's properties as a list above its content.
+
+        Args:
+            properties: Values returned by get_page_properties
+
+        Returns:
+            str: Markdown list ending in a blank line, or '' if there are none
+        """
+        if not properties:
+            return ''
+        lines = [f"- **{name}:** {value}" for name, value in properties.items()]
+        return '\n'.join(lines) + '\n\n'
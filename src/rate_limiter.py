@@ -0,0 +1,113 @@
+"""
+Shared request pacing for the Notion API
+
+Notion allows an average of ~3 requests per second per integration, with
+short bursts tolerated. Instead of sleeping a fixed delay before every
+request, all workers draw from one token bucket: requests go out immediately
+while tokens are available and only wait when the shared budget is spent.
+
+The bucket also adapts to what the API reports: a rate-limit response
+pauses every worker for the Retry-After period and halves the rate, and
+each successful request nudges the rate back up towards the configured
+target (additive increase, multiplicative decrease).
+"""
+
+import threading
+import time
+from typing import Callable
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+
+    The bucket holds up to `capacity` tokens and refills at `rate` tokens per
+    second. Each request takes one token; when the bucket is empty the caller
+    reserves the next token and sleeps until it is due, so waiting callers
+    are served in order without busy-looping.
+    """
+
+    def __init__(
+        self,
+        rate: float = 3.0,
+        capacity: float = 3.0,
+        min_rate: float = None,
+        recovery_step: float = 0.05,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Initialize the bucket, starting full.
+
+        Args:
+            rate: Target average requests per second
+            capacity: Maximum burst size in requests
+            min_rate: Lowest rate throttling may drop to (default: rate / 10)
+            recovery_step: Requests/second regained per successful request
+            clock: Monotonic time source (injectable for tests)
+            sleep: Sleep function (injectable for tests)
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+
+        self.rate = rate
+        self.target_rate = rate
+        self.min_rate = min_rate if min_rate is not None else rate / 10
+        self.recovery_step = recovery_step
+        self.capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = capacity
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+        self.total_wait = 0.0  # Seconds callers spent waiting for tokens
+
+    def _refill(self, now: float):
+        """Add the tokens earned since the last update (lock must be held)."""
+        elapsed = now - self._updated_at
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated_at = now
+
+    def acquire(self) -> float:
+        """
+        Take one token, waiting if the shared budget is exhausted.
+
+        Returns:
+            float: Seconds this call waited
+        """
+        with self._lock:
+            self._refill(self._clock())
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self.total_wait += wait
+
+        if wait > 0:
+            self._sleep(wait)
+
+        return wait
+
+    def throttle(self, pause: float):
+        """
+        React to a rate-limit response from the API.
+
+        Empties the bucket so that no worker sends another request for
+        `pause` seconds, and halves the refill rate.
+
+        Args:
+            pause: Seconds to hold all requests (e.g. the Retry-After value)
+        """
+        with self._lock:
+            self._refill(self._clock())
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = min(self._tokens, -pause * self.rate)
+
+    def on_success(self):
+        """Let the rate creep back towards the target after a good response."""
+        if self.rate >= self.target_rate:
+            return
+
+        with self._lock:
+            self.rate = min(self.target_rate, self.rate + self.recovery_step)
@@ -0,0 +1,318 @@
+"""
+Record and replay Notion API responses
+
+Exports can't be measured or reproduced against the live API: latency
+varies, rate limits hit at random, and workspaces change. A
+RecordingClient wraps a real notion_client.Client and keeps every response
+the exporter receives; the recording is saved as one JSON fixture file. A
+ReplayClient stands in for the client and serves the fixture back, with
+configurable latency and injected 429 responses, so crawls and exports run
+offline and repeatably.
+
+Usage:
+    python src/replay.py --url "https://www.notion.so/Your-Externship-abc123" --output fixture.json
+"""
+
+from collections import Counter
+from typing import Any, Dict, Optional
+import json
+import random
+import tempfile
+import threading
+import time
+
+import click
+import httpx
+from notion_client.errors import APIResponseError
+
+from config import get_config
+from http_pool import HttpPool
+from main import ExternshipExporter
+from notion_exporter import NotionExporter
+
+
+# Endpoints the exporter uses
+ENDPOINTS = ('pages.retrieve', 'blocks.children.list', 'databases.query')
+
+RECORDING_VERSION = 1
+
+
+def _key(object_id: str, start_cursor: Optional[str] = None) -> str:
+    """Fixture key of a request: the object ID, plus the cursor of a paginated list."""
+    return f"{object_id}:{start_cursor}" if start_cursor else object_id
+
+
+def api_error(status: int, code: str, retry_after: float = None) -> APIResponseError:
+    """Build the error notion_client raises for an error response."""
+    headers = {'retry-after': str(retry_after)} if retry_after is not None else {}
+    response = httpx.Response(
+        status,
+        headers=headers,
+        request=httpx.Request('GET', 'https://api.notion.com/v1/')
+    )
+    return APIResponseError(response, f"{code} ({status})", code)
+
+
+class Recording:
+    """Responses by endpoint and request key, as saved in a fixture file."""
+
+    def __init__(self, responses: Dict[str, Dict[str, Any]] = None):
+        self.responses = responses or {endpoint: {} for endpoint in ENDPOINTS}
+        self._lock = threading.Lock()
+
+    def put(self, endpoint: str, key: str, response: Dict[str, Any]):
+        with self._lock:
+            self.responses.setdefault(endpoint, {})[key] = response
+
+    def get(self, endpoint: str, key: str) -> Optional[Dict[str, Any]]:
+        return self.responses.get(endpoint, {}).get(key)
+
+    def __len__(self) -> int:
+        return sum(len(responses) for responses in self.responses.values())
+
+    def save(self, path: str):
+        """Write the recording as a JSON fixture file."""
+        with self._lock:
+            data = {'version': RECORDING_VERSION, 'responses': self.responses}
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+
+    @classmethod
+    def from_pages(
+        cls,
+        pages: Dict[str, Dict[str, Any]],
+        page_size: int = 100,
+        last_edited_time: str = '2025-01-01T00:00:00.000Z'
+    ) -> 'Recording':
+        """
+        Build the responses a workspace would give, e.g. for a synthetic externship.
+
+        Args:
+            pages: Page (or block) ID -> {'title': str, 'blocks': [block, ...]};
+                blocks with has_children list their children under their own ID
+            page_size: Blocks per blocks.children.list response
+            last_edited_time: Timestamp of every page and child_page block
+
+        Returns:
+            Recording: Responses for pages.retrieve and blocks.children.list
+        """
+        recording = cls()
+        for page_id, page in pages.items():
+            recording.put('pages.retrieve', page_id, {
+                'object': 'page',
+                'id': page_id,
+                'last_edited_time': last_edited_time,
+                'properties': {
+                    'title': {'type': 'title', 'title': [{'type': 'text', 'plain_text': page['title']}]}
+                }
+            })
+
+            blocks = [
+                dict(block, last_edited_time=last_edited_time) if block['type'] == 'child_page' else block
+                for block in page['blocks']
+            ]
+            for start in range(0, max(len(blocks), 1), page_size):
+                end = start + page_size
+                has_more = end < len(blocks)
+                recording.put('blocks.children.list', _key(page_id, str(start) if start else None), {
+                    'object': 'list',
+                    'results': blocks[start:end],
+                    'has_more': has_more,
+                    'next_cursor': str(end) if has_more else None
+                })
+        return recording
+
+    @classmethod
+    def load(cls, path: str) -> 'Recording':
+        """
+        Read a fixture file written by save().
+
+        Raises:
+            ValueError: If the file was written by an incompatible version
+        """
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != RECORDING_VERSION:
+            raise ValueError(f"Unsupported recording version in {path}: {data.get('version')}")
+        return cls(data['responses'])
+
+
+class _Endpoint:
+    """One client endpoint (e.g. pages.retrieve) routed through a handler."""
+
+    def __init__(self, handler, name: str, id_argument: str):
+        self._handler = handler
+        self._name = name
+        self._id_argument = id_argument
+
+    def __call__(self, **kwargs) -> Dict[str, Any]:
+        return self._handler(self._name, kwargs[self._id_argument], kwargs)
+
+
+class _Namespace:
+    pass
+
+
+def _mount_endpoints(client, handler):
+    """Give `client` the pages/blocks/databases attributes of notion_client.Client."""
+    client.pages = _Namespace()
+    client.pages.retrieve = _Endpoint(handler, 'pages.retrieve', 'page_id')
+    client.blocks = _Namespace()
+    client.blocks.children = _Namespace()
+    client.blocks.children.list = _Endpoint(handler, 'blocks.children.list', 'block_id')
+    client.databases = _Namespace()
+    client.databases.query = _Endpoint(handler, 'databases.query', 'database_id')
+
+
+class RecordingClient:
+    """
+    Wraps a notion_client.Client and records every successful response.
+
+    Pass it to NotionExporter as `client`; errors are not recorded, so a
+    request retried after a rate limit is stored once.
+    """
+
+    def __init__(self, client, recording: Recording = None):
+        """
+        Args:
+            client: Real Notion client the requests are sent to
+            recording: Recording to add to (a new one by default)
+        """
+        self.client = client
+        self.recording = recording or Recording()
+        _mount_endpoints(self, self._forward)
+
+    def _forward(self, endpoint: str, object_id: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        namespace, _, method = endpoint.rpartition('.')
+        target = self.client
+        for name in namespace.split('.'):
+            target = getattr(target, name)
+
+        response = getattr(target, method)(**kwargs)
+        self.recording.put(endpoint, _key(object_id, kwargs.get('start_cursor')), response)
+        return response
+
+
+class ReplayClient:
+    """
+    Stand-in for notion_client.Client that serves a Recording.
+
+    Requests missing from the recording fail like a page the integration
+    can't see (404). Every call is counted, and can be slowed down or
+    answered with a 429 to exercise the exporter's concurrency and retries.
+    """
+
+    def __init__(
+        self,
+        recording: Recording,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        rate_limit_every: int = 0,
+        rate_limit_probability: float = 0.0,
+        retry_after: float = 0.0,
+        seed: int = 0
+    ):
+        """
+        Args:
+            recording: Responses to serve
+            latency: Seconds each request takes
+            jitter: Up to this many seconds added to each request, at random
+            rate_limit_every: Answer every Nth request with a 429 (0: never)
+            rate_limit_probability: Chance of answering any request with a 429
+            retry_after: Retry-After seconds sent with injected 429s
+            seed: Seed for jitter and random rate limits, for repeatable runs
+        """
+        self.recording = recording
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_every = rate_limit_every
+        self.rate_limit_probability = rate_limit_probability
+        self.retry_after = retry_after
+        self.calls = Counter()
+        self.rate_limited = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        _mount_endpoints(self, self._replay)
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+    def _replay(self, endpoint: str, object_id: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            self.calls[endpoint] += 1
+            self._requests += 1
+            throttle = (
+                (self.rate_limit_every and self._requests % self.rate_limit_every == 0)
+                or self._random.random() < self.rate_limit_probability
+            )
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            if throttle:
+                self.rate_limited += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+        try:
+            if delay:
+                time.sleep(delay)
+            if throttle:
+                raise api_error(429, 'rate_limited', retry_after=self.retry_after)
+
+            response = self.recording.get(endpoint, _key(object_id, kwargs.get('start_cursor')))
+            if response is None:
+                raise api_error(404, 'object_not_found')
+            return response
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def record_externship(page_url: str, output_path: str) -> Recording:
+    """
+    Export an externship once from the live API and save every response.
+
+    The export runs in two-pass mode so the recording also serves
+    two-pass replays; its files are written to a temporary directory and
+    discarded.
+
+    Args:
+        page_url: Notion page URL of the externship
+        output_path: Fixture file to write
+
+    Returns:
+        Recording: The saved responses
+    """
+    config = get_config()
+    http_pool = HttpPool()
+    client = RecordingClient(http_pool.notion_client(config.notion_api_key))
+    exporter = ExternshipExporter(
+        config.notion_api_key,
+        single_pass=False,
+        notion=NotionExporter(config.notion_api_key, client=client)
+    )
+
+    try:
+        with tempfile.TemporaryDirectory() as output_dir:
+            exporter.export_externship(page_url, output_dir=output_dir)
+    finally:
+        exporter.close()
+        http_pool.close()
+
+    client.recording.save(output_path)
+    return client.recording
+
+
+@click.command()
+@click.option('--url', prompt='Notion Page URL', help='The URL of the Notion externship page')
+@click.option('--output', required=True, help='Fixture file to write')
+def main(url: str, output: str):
+    """Record an externship's API responses for offline replay."""
+    recording = record_externship(url, output)
+    print(f"\nRecorded {len(recording):,} responses to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+"""
+Persistent Notion response cache
+
+Stores blocks.children.list responses in a local SQLite database so repeat
+exports don't download unchanged content again. Entries are validated by
+the page's last_edited_time: a cached listing is only reused when the
+caller knows the page hasn't been edited since it was fetched.
+
+Every write is committed right away, so other processes sharing the cache
+file (a CLI run next to the web app) are never locked out. Only the access
+times that LRU eviction reads are batched: they are kept in memory and
+written with the next entry stored after ACCESS_FLUSH_INTERVAL, by flush(),
+or before evicting.
+
+Eviction:
+- Entries not fetched again within `max_age_days` are dropped
+- When the database grows past `max_size_mb`, least recently used entries
+  are dropped until it fits
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class ResponseCache:
+    """
+    Thread-safe SQLite cache for Notion API responses.
+
+    Keys are (kind, id); block listings are stored as kind 'blocks'. Each
+    entry keeps the last_edited_time it was fetched at; lookups with a
+    different last_edited_time are misses.
+    """
+
+    # Notion reports last_edited_time rounded to the minute, so an edit made
+    # shortly after a fetch can carry the same timestamp. Responses for pages
+    # edited this recently are not cached.
+    UNSTABLE_EDIT_WINDOW = 120  # seconds
+
+    # Longest time access times wait in memory while entries are being stored
+    ACCESS_FLUSH_INTERVAL = 5.0  # seconds
+
+    def __init__(
+        self,
+        path: str,
+        max_age_days: float = 30,
+        max_size_mb: float = 200
+    ):
+        """
+        Open (or create) the cache database and evict stale entries.
+
+        Args:
+            path: SQLite file path; parent directories are created
+            max_age_days: Drop entries fetched longer ago than this
+            max_size_mb: Keep the stored responses under this size
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.max_age_seconds = max_age_days * 24 * 3600
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._accessed: Dict[Tuple[str, str], float] = {}  # (kind, id) -> access time not yet written
+        self._accessed_flushed_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                kind TEXT NOT NULL,
+                id TEXT NOT NULL,
+                last_edited_time TEXT,
+                body TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (kind, id)
+            )
+            """
+        )
+        self._conn.commit()
+        self.evict()
+
+    def get_blocks(self, block_id: str, last_edited_time: str = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Look up a complete block listing.
+
+        Args:
+            block_id: Page or block ID whose children were listed
+            last_edited_time: The page's current last_edited_time
+
+        Returns:
+            list: Cached blocks, or None if missing or possibly stale
+        """
+        return self._get('blocks', block_id, last_edited_time)
+
+    def put_blocks(self, block_id: str, last_edited_time: str, blocks: List[Dict[str, Any]]):
+        """Store a complete block listing fetched at `last_edited_time`."""
+        self._put('blocks', block_id, last_edited_time, blocks)
+
+    def _get(self, kind: str, key: str, last_edited_time: Optional[str]) -> Any:
+        # Without a timestamp to compare against, a cached entry can't be trusted
+        if not last_edited_time:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body FROM responses WHERE kind = ? AND id = ? AND last_edited_time = ?",
+                (kind, key, last_edited_time)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._accessed[(kind, key)] = time.time()
+
+        return json.loads(row[0])
+
+    def _put(self, kind: str, key: str, last_edited_time: Optional[str], value: Any):
+        if not last_edited_time or self._recently_edited(last_edited_time):
+            return
+
+        body = json.dumps(value, separators=(',', ':'))
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (kind, key, last_edited_time, body, len(body), now, now)
+            )
+            if time.monotonic() - self._accessed_flushed_at >= self.ACCESS_FLUSH_INTERVAL:
+                self._write_access_times()
+            self._conn.commit()
+
+    def flush(self):
+        """Write the access times of recent hits (e.g. at the end of an export)."""
+        with self._lock:
+            self._write_access_times()
+            self._conn.commit()
+
+    def _write_access_times(self):
+        """Add pending access times to the current transaction (lock held)."""
+        if self._accessed:
+            self._conn.executemany(
+                "UPDATE responses SET accessed_at = ? WHERE kind = ? AND id = ?",
+                [(accessed_at, kind, key) for (kind, key), accessed_at in self._accessed.items()]
+            )
+            self._accessed = {}
+        self._accessed_flushed_at = time.monotonic()
+
+    def _recently_edited(self, last_edited_time: str) -> bool:
+        """True if the timestamp is too recent to reliably detect later edits."""
+        try:
+            edited = datetime.fromisoformat(last_edited_time.replace('Z', '+00:00'))
+        except ValueError:
+            return True
+        age = (datetime.now(timezone.utc) - edited).total_seconds()
+        return age < self.UNSTABLE_EDIT_WINDOW
+
+    def evict(self) -> int:
+        """
+        Drop expired entries, then least recently used ones over the size limit.
+
+        Returns:
+            int: Number of entries removed
+        """
+        with self._lock:
+            self._write_access_times()
+            cursor = self._conn.execute(
+                "DELETE FROM responses WHERE fetched_at < ?",
+                (time.time() - self.max_age_seconds,)
+            )
+            removed = cursor.rowcount
+
+            total = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()[0]
+
+            if total > self.max_size_bytes:
+                rows = self._conn.execute(
+                    "SELECT kind, id, size FROM responses ORDER BY accessed_at"
+                ).fetchall()
+                for kind, key, size in rows:
+                    if total <= self.max_size_bytes:
+                        break
+                    self._conn.execute(
+                        "DELETE FROM responses WHERE kind = ? AND id = ?",
+                        (kind, key)
+                    )
+                    total -= size
+                    removed += 1
+
+            self._conn.commit()
+            self.evictions += removed
+
+        return removed
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get cache usage statistics.
+
+        Returns:
+            dict: Hits, misses, hit rate, evictions, entry count and size
+        """
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': entries,
+            'size_mb': round(size / (1024 * 1024), 2)
+        }
+
+    def close(self):
+        """Evict over-limit entries and close the database."""
+        self.evict()
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,320 @@
+"""
+Synthetic externship generator
+
+Builds Notion-shaped page and block trees of any size for scale testing:
+an externship of projects, steps and sub-steps whose pages hold a
+configurable mix of block types, rich-text annotations, nested blocks and
+boilerplate repeated across pages (which the consolidator deduplicates).
+The same arguments and seed always give the same externship.
+
+The result uses the page data format of the test fakes and
+replay.Recording.from_pages:
+
+    {page_id: {'title': str, 'blocks': [block, ...]}, ...}
+
+Nested blocks (toggle contents, table rows) are included under their
+parent's 'children', as NotionExporter.expand_children leaves them, so the
+blocks can be rendered directly with NotionExporter.blocks_to_markdown.
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import random
+
+from consolidator import MarkdownConsolidator
+from notion_exporter import NotionExporter
+
+
+# Relative frequency of each block type on a page
+DEFAULT_BLOCK_MIX: Dict[str, float] = {
+    'paragraph': 40,
+    'bulleted_list_item': 15,
+    'numbered_list_item': 8,
+    'heading_2': 4,
+    'heading_3': 5,
+    'to_do': 5,
+    'toggle': 4,
+    'code': 3,
+    'quote': 2,
+    'callout': 3,
+    'divider': 2,
+    'table': 2,
+    'image': 2,
+    'bookmark': 2,
+    'unsupported': 3,
+}
+
+_WORDS = (
+    "the intern builds a small service writes tests for each step reviews "
+    "the pull request deploys to staging measures latency documents the api "
+    "and presents results to the team using python sql dashboards metrics"
+).split()
+
+_ANNOTATIONS = ('bold', 'italic', 'code', 'strikethrough', 'underline')
+
+_LANGUAGES = ('python', 'sql', 'bash', 'javascript')
+
+# Blocks repeated on many pages, each long enough to be deduplicated
+BOILERPLATE = (
+    "Before you submit, check that your work runs from a clean checkout, that every "
+    "output file is named as described above, and that your write-up explains the "
+    "choices you made. Incomplete submissions are returned without a review.",
+    "If you are stuck for more than thirty minutes, post your question in the "
+    "externship channel with what you tried, the exact error message and a link to "
+    "your branch. Mentors answer questions within one working day.",
+    "Grading: correctness counts for half of the score, code quality and tests for a "
+    "quarter, and the clarity of your write-up for the remaining quarter. Late "
+    "submissions lose ten percent per day.",
+)
+
+
+def text_run(text: str, link: str = None, **annotations: bool) -> Dict[str, Any]:
+    """Build a text run shaped like the API's, with every annotation key set."""
+    return {
+        'type': 'text',
+        'text': {'content': text, 'link': {'url': link} if link else None},
+        'plain_text': text,
+        'href': link,
+        'annotations': {
+            'bold': annotations.get('bold', False),
+            'italic': annotations.get('italic', False),
+            'strikethrough': annotations.get('strikethrough', False),
+            'underline': annotations.get('underline', False),
+            'code': annotations.get('code', False),
+            'color': 'default'
+        }
+    }
+
+
+class _PageWriter:
+    """Generates the blocks of one externship, drawing from one seeded RNG."""
+
+    def __init__(
+        self,
+        rng: random.Random,
+        block_mix: Dict[str, float],
+        annotation_density: float
+    ):
+        self.rng = rng
+        self.types = list(block_mix)
+        self.weights = [block_mix[block_type] for block_type in self.types]
+        self.annotation_density = annotation_density
+        self.block_count = 0
+        self._phrases: Dict[int, List[str]] = {}
+
+    def _id(self) -> str:
+        self.block_count += 1
+        return f"block-{self.block_count:08d}"
+
+    def sentence(self, words: int) -> str:
+        """A phrase of `words` words, from a pool of 256 per length (joining each anew is slow)."""
+        phrases = self._phrases.get(words)
+        if phrases is None:
+            phrases = self._phrases[words] = [
+                ' '.join(self.rng.choices(_WORDS, k=words)) for _ in range(256)
+            ]
+        return phrases[int(self.rng.random() * 256)]
+
+    def rich_text(self, words: int = 12) -> List[Dict[str, Any]]:
+        """Runs of text; each run is annotated or linked with annotation_density."""
+        rng = self.rng
+        runs = []
+        for _ in range(rng.randint(1, 4)):
+            text = self.sentence(max(1, words // 3)) + ' '
+            if rng.random() >= self.annotation_density:
+                runs.append(text_run(text))
+            elif rng.random() < 0.2:
+                runs.append(text_run(text, link=f"https://example.com/{rng.choice(_WORDS)}"))
+            else:
+                annotations = rng.sample(_ANNOTATIONS, rng.randint(1, 2))
+                runs.append(text_run(text, **{name: True for name in annotations}))
+        return runs
+
+    def block(self, block_type: str, nested: bool = True) -> Dict[str, Any]:
+        """One block of `block_type`, with children where the type has them."""
+        rng = self.rng
+        children = None
+
+        if block_type in ('divider', 'unsupported'):
+            data: Dict[str, Any] = {}
+        elif block_type == 'to_do':
+            data = {'rich_text': self.rich_text(), 'checked': rng.random() < 0.5}
+        elif block_type == 'code':
+            lines = [self.sentence(6) for _ in range(rng.randint(2, 8))]
+            data = {'rich_text': [text_run('\n'.join(lines))], 'language': rng.choice(_LANGUAGES)}
+        elif block_type == 'table':
+            width = rng.randint(2, 4)
+            data = {'table_width': width, 'has_column_header': True, 'has_row_header': False}
+            children = [
+                {
+                    'id': self._id(),
+                    'type': 'table_row',
+                    'has_children': False,
+                    'table_row': {'cells': [[text_run(self.sentence(2))] for _ in range(width)]}
+                }
+                for _ in range(rng.randint(2, 6))
+            ]
+        elif block_type == 'image':
+            data = {
+                'type': 'external',
+                'external': {'url': f"https://example.com/images/{self.block_count}.png"},
+                'caption': self.rich_text(4)
+            }
+        elif block_type == 'bookmark':
+            data = {'url': f"https://example.com/docs/{rng.choice(_WORDS)}", 'caption': []}
+        else:
+            data = {'rich_text': self.rich_text()}
+            if block_type == 'toggle' and nested:
+                children = [
+                    self.block(rng.choice(('paragraph', 'bulleted_list_item', 'code')), nested=False)
+                    for _ in range(rng.randint(1, 4))
+                ]
+
+        block = {
+            'id': self._id(),
+            'type': block_type,
+            'has_children': children is not None,
+            block_type: data
+        }
+        if children is not None:
+            block['children'] = children
+        return block
+
+    def blocks(self, count: int) -> List[Dict[str, Any]]:
+        return [self.block(block_type) for block_type in self.rng.choices(self.types, self.weights, k=count)]
+
+
+def generate_externship(
+    pages: int = 100,
+    fan_out: int = 10,
+    max_depth: int = 3,
+    blocks_per_page: int = 30,
+    block_mix: Optional[Dict[str, float]] = None,
+    annotation_density: float = 0.2,
+    boilerplate_ratio: float = 0.3,
+    seed: int = 0,
+    title: str = "Synthetic Externship"
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Generate an externship of `pages` pages.
+
+    Pages are added breadth-first: the externship page gets up to `fan_out`
+    projects, each project up to `fan_out` steps, and so on down to
+    `max_depth`, until there are `pages` pages.
+
+    Args:
+        pages: Total pages, the externship page included
+        fan_out: Most child pages per page
+        max_depth: Deepest level (1 = projects, 2 = steps, 3 = sub-steps)
+        blocks_per_page: Most content blocks per page (each page gets
+            between half and all of them)
+        block_mix: Block type -> relative frequency (default DEFAULT_BLOCK_MIX)
+        annotation_density: Share of rich-text runs that are annotated or linked
+        boilerplate_ratio: Share of pages that end with the BOILERPLATE blocks
+        seed: Random seed; the same arguments and seed give the same externship
+        title: Title of the externship page
+
+    Returns:
+        dict: Page ID -> {'title': str, 'blocks': [block, ...]}, the
+            externship page under 'root'
+
+    Raises:
+        ValueError: If `pages` don't fit in `fan_out` and `max_depth`
+    """
+    capacity = sum(fan_out ** level for level in range(max_depth + 1))
+    if pages < 1 or pages > capacity:
+        raise ValueError(f"pages must be between 1 and {capacity} for fan_out={fan_out}, max_depth={max_depth}")
+
+    rng = random.Random(seed)
+    writer = _PageWriter(rng, block_mix or DEFAULT_BLOCK_MIX, annotation_density)
+    labels = ('', 'Project', 'Step', 'Sub-step')
+
+    data: Dict[str, Dict[str, Any]] = {}
+    queue: List[Tuple[str, str, int, Tuple[int, ...]]] = [('root', title, 0, ())]
+    head = 0
+    created = 1
+
+    while head < len(queue):
+        page_id, page_title, level, path = queue[head]
+        head += 1
+
+        blocks = writer.blocks(rng.randint(max(1, blocks_per_page // 2), max(1, blocks_per_page)))
+        if level > 0 and rng.random() < boilerplate_ratio:
+            blocks.append(writer.block('heading_3'))
+            blocks.extend(
+                {
+                    'id': writer._id(),
+                    'type': 'paragraph',
+                    'has_children': False,
+                    'paragraph': {'rich_text': [text_run(text)]}
+                }
+                for text in BOILERPLATE
+            )
+
+        if level < max_depth:
+            for index in range(1, fan_out + 1):
+                if created >= pages:
+                    break
+                created += 1
+                child_path = path + (index,)
+                label = labels[level + 1] if level + 1 < len(labels) else 'Page'
+                child_title = f"{label} {'.'.join(str(i) for i in child_path)}"
+                child_id = f"page-{created:06d}"
+                blocks.append({
+                    'id': child_id,
+                    'type': 'child_page',
+                    'has_children': True,
+                    'child_page': {'title': child_title}
+                })
+                queue.append((child_id, child_title, level + 1, child_path))
+
+        data[page_id] = {'title': page_title, 'blocks': blocks}
+
+    return data
+
+
+def walk(data: Dict[str, Dict[str, Any]], page_id: str = 'root') -> Iterator[Tuple[str, int, Dict[str, Any]]]:
+    """
+    Pages in document order, as the export visits them.
+
+    Args:
+        data: Externship from generate_externship
+        page_id: Page to start from
+
+    Yields:
+        tuple: (page ID, level, page)
+    """
+    stack = [(page_id, 0)]
+    while stack:
+        current, level = stack.pop()
+        page = data[current]
+        yield current, level, page
+        children = [block['id'] for block in page['blocks'] if block['type'] == 'child_page']
+        stack.extend((child, level + 1) for child in reversed(children))
+
+
+def consolidate(
+    data: Dict[str, Dict[str, Any]],
+    consolidator: MarkdownConsolidator,
+    exporter: NotionExporter = None
+) -> MarkdownConsolidator:
+    """
+    Render every page and add it to a consolidator, as an export would.
+
+    Args:
+        data: Externship from generate_externship
+        consolidator: Consolidator to fill (its header is added first)
+        exporter: Renders the blocks; one without an API client by default
+
+    Returns:
+        MarkdownConsolidator: The filled consolidator
+    """
+    exporter = exporter or NotionExporter('synthetic', client=object())
+    consolidator.add_header()
+    for _, level, page in walk(data):
+        if level > 0:
+            consolidator.add_page_content(
+                title=page['title'],
+                content=exporter.blocks_to_markdown(page['blocks']),
+                level=level
+            )
+    return consolidator
@@ -0,0 +1,47 @@
+"""
+Offline token estimation
+
+Upload limits and retrieval chunking are usually stated in tokens, but the
+exporter can't rely on a tokenizer package (or the network to download its
+vocabulary). This estimates the count a BPE tokenizer such as OpenAI's
+cl100k_base would give, from the shape of the text alone.
+"""
+
+import re
+
+
+# Letters, digits and everything else are tokenized differently
+_PIECES = re.compile(r"[^\W\d_]+|\d+|[^\w\s]+|_+")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate how many tokens a BPE tokenizer would split `text` into.
+
+    Common English words are a single token and long words a few; digits go
+    in groups of three; punctuation runs cost about one token per two
+    characters; scripts without spaces (Chinese, Japanese) cost about one
+    token per character. Whitespace is folded into the following piece.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        int: Estimated token count
+    """
+    tokens = 0
+    for match in _PIECES.finditer(text):
+        piece = match.group()
+        first = piece[0]
+
+        if first.isdigit():
+            tokens += (len(piece) + 2) // 3
+        elif first.isalpha():
+            if piece.isascii():
+                tokens += 1 + len(piece) // 9
+            else:
+                tokens += len(piece) if ord(first) >= 0x2E80 else 1 + len(piece) // 4
+        else:
+            tokens += (len(piece) + 1) // 2
+
+    return tokens
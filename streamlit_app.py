@@ -9,18 +9,30 @@ Usage:
 """
 
 import streamlit as st
+import atexit
 import sys
 import os
 from pathlib import Path
-from datetime import datetime
-import io
+import tempfile
+import time
 
 # Add src to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from config import get_config
 from notion_exporter import NotionExporter
-from consolidator import MarkdownConsolidator
+from main import ExternshipExporter
+from http_pool import HttpPool
+from jobs import JobManager
+from rate_limiter import TokenBucket
+from response_cache import ResponseCache
+
+
+# Exports running at once; more wait in a queue
+EXPORT_JOB_WORKERS = 3
+
+# Seconds between progress refreshes while an export runs
+POLL_SECONDS = 1.0
 
 
 # Page configuration
@@ -111,170 +123,260 @@ def validate_notion_url(url):
     return True, None
 
 
-def export_externship(notion_url, custom_name=None):
+@st.cache_resource
+def get_shared_resources():
+    """
+    Notion client, rate limiter and response cache shared by every export.
+
+    Created once per server process, so repeat exports reuse the open HTTP
+    connections and are served from the cache for pages that haven't
+    changed, and all sessions together stay within Notion's rate limit.
+    The cache commits as it goes, so CLI runs can share its file, and is
+    closed when the server exits.
+
+    Returns:
+        dict: 'api_key', 'http_pool', 'database_sort', 'client',
+            'rate_limiter' and 'cache'
+    """
+    config = get_config()
+    http_pool = HttpPool(max_connections=4 * EXPORT_JOB_WORKERS, max_keepalive_connections=4 * EXPORT_JOB_WORKERS)
+    cache = ResponseCache(config.cache_path)
+    atexit.register(cache.close)
+    return {
+        'api_key': config.notion_api_key,
+        'http_pool': http_pool,
+        'database_sort': config.database_sort,
+        'client': http_pool.notion_client(config.notion_api_key),
+        'rate_limiter': TokenBucket(),
+        'cache': cache
+    }
+
+
+@st.cache_resource
+def get_job_manager():
+    """
+    Background runner for every export on this server.
+
+    Jobs outlive the browser session that started them: a reloaded tab finds
+    its export again from the job ID in the URL. Every job uses the shared
+    client, rate limiter and cache from get_shared_resources(), so exports
+    started by several people at once share one Notion request budget.
+
+    Returns:
+        JobManager: The server's job manager
+    """
+    shared = get_shared_resources()
+
+    def make_exporter(progress):
+        return ExternshipExporter(
+            shared['api_key'],
+            notion=NotionExporter(
+                shared['api_key'],
+                client=shared['client'],
+                rate_limiter=shared['rate_limiter'],
+                cache=shared['cache'],
+                http_pool=shared['http_pool'],
+                database_sort=shared['database_sort']
+            ),
+            log=lambda message: None,
+            progress=progress
+        )
+
+    return JobManager(
+        make_exporter,
+        os.path.join(tempfile.gettempdir(), 'notion-export-jobs'),
+        max_workers=EXPORT_JOB_WORKERS
+    )
+
+
+def friendly_error(error_msg):
     """
-    Export an externship from Notion.
+    Explain a failed export in terms a non-technical user can act on.
 
     Args:
-        notion_url: URL of the Notion page
-        custom_name: Optional custom name for the externship
+        error_msg: Error message recorded by the export job
 
     Returns:
-        tuple: (success, result_dict_or_error_message)
+        str: Message to display
     """
-    try:
-        # Get configuration
-        config = get_config()
-
-        # Create exporter
-        exporter = NotionExporter(config.notion_api_key)
-
-        # Extract page ID
-        with st.status("Extracting page information...", expanded=True) as status:
-            st.write("📋 Parsing Notion URL...")
-            page_id = exporter.extract_page_id(notion_url)
-            st.write(f"✓ Page ID extracted: `{page_id}`")
-            status.update(label="Page information extracted", state="complete")
-
-        # Fetch main page
-        with st.status("Fetching externship page from Notion...", expanded=True) as status:
-            st.write("📥 Connecting to Notion API...")
-            main_page = exporter.get_page(page_id)
-            externship_title = custom_name or exporter.get_page_title(main_page)
-            st.write(f"✓ Externship: **{externship_title}**")
-            status.update(label=f"Fetched: {externship_title}", state="complete")
-
-        # Build hierarchy
-        with st.status("Building content hierarchy...", expanded=True) as status:
-            st.write("🌳 Discovering all pages and sub-pages...")
-
-            # Build hierarchy recursively
-            def build_hierarchy_with_progress(page_id, title, level=0, max_level=3):
-                node = {
-                    'id': page_id,
-                    'title': title,
-                    'level': level,
-                    'children': []
-                }
-
-                if level >= max_level:
-                    return node
-
-                child_page_ids = exporter.get_child_pages(page_id)
-
-                for i, child_id in enumerate(child_page_ids):
-                    try:
-                        child_page = exporter.get_page(child_id)
-                        child_title = exporter.get_page_title(child_page)
-
-                        # Show progress
-                        if level == 1:  # Projects
-                            st.write(f"  📁 Found project: {child_title}")
-
-                        child_node = build_hierarchy_with_progress(
-                            child_id,
-                            child_title,
-                            level + 1,
-                            max_level
-                        )
-                        node['children'].append(child_node)
-                    except Exception as e:
-                        st.warning(f"⚠️ Skipped page {child_id}: {str(e)}")
-                        continue
-
-                return node
-
-            structure = build_hierarchy_with_progress(page_id, externship_title)
-
-            # Count total pages
-            def count_pages(node):
-                count = 1
-                if 'children' in node:
-                    for child in node['children']:
-                        count += count_pages(child)
-                return count
-
-            total_pages = count_pages(structure)
-            st.write(f"✓ Found **{total_pages}** pages total")
-            status.update(label=f"Hierarchy built: {total_pages} pages", state="complete")
-
-        # Export content
-        with st.status("Exporting content from all pages...", expanded=True) as status:
-            st.write(f"📝 Processing {total_pages} pages...")
-
-            # Create consolidator
-            consolidator = MarkdownConsolidator(externship_title)
-            consolidator.add_header()
-
-            # Process hierarchy
-            def process_hierarchy(node, consolidator):
-                page_id = node['id']
-                title = node['title']
-                level = node['level']
-
-                # Get page content
-                blocks = exporter.get_blocks(page_id)
-                content_parts = []
-
-                for block in blocks:
-                    markdown = exporter.block_to_markdown(block)
-                    if markdown:
-                        content_parts.append(markdown)
-
-                content = '\n'.join(content_parts)
-
-                # Add to consolidator (skip root)
-                if level > 0:
-                    consolidator.add_page_content(
-                        title=title,
-                        content=content,
-                        level=level
-                    )
-
-                # Process children
-                if 'children' in node:
-                    for child in node['children']:
-                        process_hierarchy(child, consolidator)
-
-            process_hierarchy(structure, consolidator)
-            st.write("✓ All content exported successfully")
-            status.update(label="Content export complete", state="complete")
-
-        # Get statistics
-        stats = consolidator.get_statistics()
-
-        # Generate filename
-        filename = consolidator.generate_filename()
-
-        # Get content as bytes for download
-        content = consolidator.get_consolidated_content()
-
-        return True, {
-            'content': content,
-            'filename': filename,
-            'stats': stats,
-            'externship_name': externship_title,
-            'total_pages': total_pages
-        }
-
-    except ValueError as e:
-        return False, f"Configuration Error: {str(e)}\n\nPlease ensure the Notion API key is configured correctly."
-
-    except Exception as e:
-        error_msg = str(e)
-
-        # Provide helpful error messages
-        if "Could not find page" in error_msg or "object_not_found" in error_msg:
-            return False, "Cannot access this Notion page. Please ensure:\n1. The URL is correct\n2. Your Notion integration has access to this page\n3. The page hasn't been deleted"
-
-        elif "unauthorized" in error_msg.lower():
-            return False, "Notion API authorization failed. Please check that your API key is valid."
-
-        elif "rate_limited" in error_msg.lower():
-            return False, "Too many requests to Notion API. Please wait a minute and try again."
+    if "Could not find page" in error_msg or "object_not_found" in error_msg:
+        return "Cannot access this Notion page. Please ensure:\n1. The URL is correct\n2. Your Notion integration has access to this page\n3. The page hasn't been deleted"
 
-        else:
-            return False, f"Unexpected error: {error_msg}\n\nIf this persists, contact your technical team."
+    elif "unauthorized" in error_msg.lower():
+        return "Notion API authorization failed. Please check that your API key is valid."
+
+    elif "rate_limited" in error_msg.lower():
+        return "Notion kept rate-limiting requests even after several retries. Please wait a minute and try again."
+
+    else:
+        return f"Unexpected error: {error_msg}\n\nIf this persists, contact your technical team."
+
+
+@st.cache_data(show_spinner=False)
+def read_output(job_id, path):
+    """
+    Read a finished job's output file once; later reruns reuse the bytes.
+
+    Args:
+        job_id: ID of the job that wrote the file
+        path: Path of the output file
+
+    Returns:
+        bytes: File content
+    """
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def job_result(snapshot):
+    """
+    Collect what the results view shows for a finished job.
+
+    Args:
+        snapshot: ExportJob.snapshot() of a job that finished successfully
+
+    Returns:
+        dict: File content and name, statistics and page count
+    """
+    result = snapshot['result']
+    content = read_output(snapshot['id'], result['output_path'])
+
+    cache = result['cache']
+    return {
+        'content': content,
+        'filename': os.path.basename(result['output_path']),
+        'stats': result['statistics'],
+        'externship_name': result['externship_name'],
+        'total_pages': result['total_pages'],
+        'cache_hit_rate': cache['hit_rate'] if cache else None
+    }
+
+
+def show_job(job):
+    """
+    Show a job's progress, its results, or why it failed.
+
+    Args:
+        job: ExportJob to display
+    """
+    snapshot = job.snapshot()
+
+    if snapshot['status'] == 'failed':
+        st.error(f"❌ Export failed\n\n{friendly_error(snapshot['error'])}")
+        return
+
+    if snapshot['status'] == 'done':
+        show_result(job_result(snapshot))
+        return
+
+    if snapshot['status'] == 'queued':
+        label = "Waiting for other exports to finish..."
+    else:
+        label = f"{snapshot['step'] or 'Starting'}..."
+
+    with st.status(label, expanded=True, state="running"):
+        st.write(f"🌳 {snapshot['pages']} pages fetched · {snapshot['elapsed']:.0f}s elapsed")
+        for warning in snapshot['warnings']:
+            st.warning(f"⚠️ {warning}")
+        st.caption("You can leave this page open or come back to this URL later; the export keeps running.")
+
+
+def show_result(result):
+    """
+    Show a finished export's statistics and download button.
+
+    Args:
+        result: Dictionary from job_result()
+    """
+    # Success! Show results
+    st.success("✅ Export completed successfully!")
+
+    # Statistics
+    st.markdown("### 📊 Export Statistics")
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.metric("Pages", result['total_pages'])
+    with col2:
+        st.metric("Words", f"{result['stats']['word_count']:,}")
+    with col3:
+        st.metric("Size", f"{result['stats']['estimated_size_kb']} KB")
+    with col4:
+        st.metric("Lines", f"{result['stats']['line_count']:,}")
+
+    if result['cache_hit_rate']:
+        st.caption(f"⚡ {result['cache_hit_rate']:.0%} of Notion requests were served from cache")
+
+    # Check file size
+    if result['stats']['estimated_size_mb'] > 10:
+        st.warning(f"⚠️ File is quite large ({result['stats']['estimated_size_mb']} MB). If GPT upload fails, consider splitting into multiple files.")
+    else:
+        st.info(f"✓ File size ({result['stats']['estimated_size_mb']} MB) is perfect for GPT training!")
+
+    # Download button
+    st.markdown("### 💾 Download File")
+    st.download_button(
+        label=f"📥 Download {result['filename']}",
+        data=result['content'],
+        file_name=result['filename'],
+        mime="text/markdown",
+        use_container_width=True
+    )
+
+    # Next steps
+    with st.expander("📝 What to do next"):
+        st.markdown(f"""
+        **Your file is ready!** Here's what to do next:
+
+        1. **Click the download button above** to save the file to your computer
+
+        2. **Go to OpenAI**: Visit https://chat.openai.com/gpts/editor
+
+        3. **Create or edit your custom GPT**
+           - **Need setup help?** Follow the complete [GPT Configuration Guide](https://github.com/rodolfo-p87/notion-externship-exporter/blob/main/gpt-configuration/configuration-guide.md)
+
+        4. **Configure your GPT instructions**:
+           - Copy the [condensed system prompt](https://github.com/rodolfo-p87/notion-externship-exporter/blob/main/gpt-configuration/system-prompt-condensed.txt)
+           - Paste it into the "Instructions" field in your GPT configurator
+           - This defines how your GPT will behave and respond to students
+
+        5. **Upload the knowledge file**:
+           - Scroll to the "Knowledge" section
+           - Click "Upload files"
+           - Select the file you just downloaded: `{result['filename']}`
+
+        6. **Your GPT now has access** to the complete {result['externship_name']} content!
+
+        **Resources:**
+        - [Complete Configuration Guide](https://github.com/rodolfo-p87/notion-externship-exporter/blob/main/gpt-configuration/configuration-guide.md) - Full setup instructions
+        - [Condensed System Prompt](https://github.com/rodolfo-p87/notion-externship-exporter/blob/main/gpt-configuration/system-prompt-condensed.txt) - Copy/paste for GPT instructions
+        """)
+
+
+def show_job_summary(job):
+    """
+    One-line status of an earlier export, with its download button once done.
+
+    Args:
+        job: ExportJob to display
+    """
+    snapshot = job.snapshot()
+    name = snapshot['custom_name'] or snapshot['url']
+
+    if snapshot['status'] == 'done':
+        result = job_result(snapshot)
+        st.download_button(
+            label=f"📥 {result['externship_name']} ({result['stats']['estimated_size_kb']} KB)",
+            data=result['content'],
+            file_name=result['filename'],
+            mime="text/markdown",
+            key=f"download-{snapshot['id']}",
+            use_container_width=True
+        )
+    elif snapshot['status'] == 'failed':
+        st.write(f"❌ {name}: failed")
+    else:
+        st.write(f"⏳ {name}: {snapshot['step'] or 'waiting'} ({snapshot['pages']} pages)")
 
 
 def main():
@@ -354,77 +456,40 @@ def main():
             st.error(f"❌ {error_msg}")
             return
 
-        # Run export
-        success, result = export_externship(
-            notion_url,
-            custom_name if custom_name else None
-        )
+        # Queue the export; it runs in the background
+        try:
+            job_id = get_job_manager().submit(notion_url, custom_name if custom_name else None)
+        except ValueError as e:
+            st.error(f"❌ Configuration Error: {str(e)}\n\nPlease ensure the Notion API key is configured correctly.")
+            return
 
-        if success:
-            # Success! Show results
-            st.success("✅ Export completed successfully!")
-
-            # Statistics
-            st.markdown("### 📊 Export Statistics")
-            col1, col2, col3, col4 = st.columns(4)
-
-            with col1:
-                st.metric("Pages", result['total_pages'])
-            with col2:
-                st.metric("Words", f"{result['stats']['word_count']:,}")
-            with col3:
-                st.metric("Size", f"{result['stats']['estimated_size_kb']} KB")
-            with col4:
-                st.metric("Lines", f"{result['stats']['line_count']:,}")
-
-            # Check file size
-            if result['stats']['estimated_size_mb'] > 10:
-                st.warning(f"⚠️ File is quite large ({result['stats']['estimated_size_mb']} MB). If GPT upload fails, consider splitting into multiple files.")
-            else:
-                st.info(f"✓ File size ({result['stats']['estimated_size_mb']} MB) is perfect for GPT training!")
-
-            # Download button
-            st.markdown("### 💾 Download File")
-            st.download_button(
-                label=f"📥 Download {result['filename']}",
-                data=result['content'],
-                file_name=result['filename'],
-                mime="text/markdown",
-                use_container_width=True
-            )
-
-            # Next steps
-            with st.expander("📝 What to do next"):
-                st.markdown(f"""
-                **Your file is ready!** Here's what to do next:
-
-                1. **Click the download button above** to save the file to your computer
-
-                2. **Go to OpenAI**: Visit https://chat.openai.com/gpts/editor
-
-                3. **Create or edit your custom GPT**
-                   - **Need setup help?** Follow the complete [GPT Configuration Guide](https://github.com/rodolfo-p87/notion-externship-exporter/blob/main/gpt-configuration/configuration-guide.md)
-
-                4. **Configure your GPT instructions**:
-                   - Copy the [condensed system prompt](https://github.com/rodolfo-p87/notion-externship-exporter/blob/main/gpt-configuration/system-prompt-condensed.txt)
-                   - Paste it into the "Instructions" field in your GPT configurator
-                   - This defines how your GPT will behave and respond to students
-
-                5. **Upload the knowledge file**:
-                   - Scroll to the "Knowledge" section
-                   - Click "Upload files"
-                   - Select the file you just downloaded: `{result['filename']}`
-
-                6. **Your GPT now has access** to the complete {result['externship_name']} content!
-
-                **Resources:**
-                - [Complete Configuration Guide](https://github.com/rodolfo-p87/notion-externship-exporter/blob/main/gpt-configuration/configuration-guide.md) - Full setup instructions
-                - [Condensed System Prompt](https://github.com/rodolfo-p87/notion-externship-exporter/blob/main/gpt-configuration/system-prompt-condensed.txt) - Copy/paste for GPT instructions
-                """)
+        st.session_state.setdefault('job_ids', []).insert(0, job_id)
+        st.experimental_set_query_params(job=job_id)
+
+    # Show the current export, taken from the URL so it survives a reload
+    running = False
+    job_id = st.experimental_get_query_params().get('job', [None])[0]
+    if job_id:
+        try:
+            job = get_job_manager().get(job_id)
+        except ValueError as e:
+            st.error(f"❌ Configuration Error: {str(e)}")
+            return
 
+        if job is None:
+            st.warning("This export is no longer available (it expired or the app was restarted). Please export again.")
         else:
-            # Error occurred
-            st.error(f"❌ Export failed\n\n{result}")
+            show_job(job)
+
+        # Earlier exports from this browser session stay downloadable
+        earlier = [get_job_manager().get(other) for other in st.session_state.get('job_ids', []) if other != job_id]
+        earlier = [other for other in earlier if other is not None]
+        if earlier:
+            st.markdown("### 🕘 Earlier Exports")
+            for other in earlier:
+                show_job_summary(other)
+
+        running = any(not j.finished for j in [job] + earlier if j is not None)
 
     # Footer
     st.markdown("---")
@@ -434,6 +499,11 @@ def main():
         </div>
     """, unsafe_allow_html=True)
 
+    # Poll until the exports shown have finished
+    if running:
+        time.sleep(POLL_SECONDS)
+        st.rerun()
+
 
 if __name__ == "__main__":
     main()
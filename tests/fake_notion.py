@@ -0,0 +1,309 @@
+"""
+In-memory stand-in for notion_client.Client used by the tests.
+
+Only the endpoints the exporter uses are implemented. Every call is counted
+so tests can assert on how many API requests an export made.
+"""
+
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+import threading
+import time
+
+from synthetic import text_run
+
+
+DEFAULT_EDITED_TIME = '2025-01-01T00:00:00.000Z'
+
+
+def paragraph(text: str, block_id: str = None) -> Dict[str, Any]:
+    """Build a paragraph block with a single plain text run."""
+    return {
+        'id': block_id or f"p-{text}",
+        'type': 'paragraph',
+        'has_children': False,
+        'paragraph': {'rich_text': [text_run(text)]}
+    }
+
+
+def rich_block(block_type: str, text: str, block_id: str, has_children: bool = False) -> Dict[str, Any]:
+    """Build a text block of any rich-text type (toggle, bulleted_list_item, ...)."""
+    return {
+        'id': block_id,
+        'type': block_type,
+        'has_children': has_children,
+        block_type: {'rich_text': [text_run(text)]}
+    }
+
+
+def container(block_type: str, block_id: str) -> Dict[str, Any]:
+    """Build a block that only holds children (column_list, column, synced_block)."""
+    return {
+        'id': block_id,
+        'type': block_type,
+        'has_children': True,
+        block_type: {}
+    }
+
+
+def child_page(page_id: str, title: str) -> Dict[str, Any]:
+    """Build a child_page block pointing at a sub-page."""
+    return {
+        'id': page_id,
+        'type': 'child_page',
+        'has_children': True,
+        'child_page': {'title': title}
+    }
+
+
+def child_database(database_id: str, title: str) -> Dict[str, Any]:
+    """Build a child_database block for an inline database."""
+    return {
+        'id': database_id,
+        'type': 'child_database',
+        'has_children': False,
+        'child_database': {'title': title}
+    }
+
+
+def link_to_page(page_id: str, block_id: str = None) -> Dict[str, Any]:
+    """Build a link_to_page block pointing at another page."""
+    return {
+        'id': block_id or f"link-{page_id}",
+        'type': 'link_to_page',
+        'has_children': False,
+        'link_to_page': {'type': 'page_id', 'page_id': page_id}
+    }
+
+
+def table(block_id: str, width: int) -> Dict[str, Any]:
+    """Build a table block; its rows are listed as its children."""
+    return {
+        'id': block_id,
+        'type': 'table',
+        'has_children': True,
+        'table': {'table_width': width, 'has_column_header': True, 'has_row_header': False}
+    }
+
+
+def table_row(block_id: str, *cells: str) -> Dict[str, Any]:
+    """Build a table_row block with one plain text run per cell."""
+    return {
+        'id': block_id,
+        'type': 'table_row',
+        'has_children': False,
+        'table_row': {'cells': [[text_run(cell)] for cell in cells]}
+    }
+
+
+def select_property(name: str) -> Dict[str, Any]:
+    """Build a select property value."""
+    return {'type': 'select', 'select': {'name': name}}
+
+
+def number_property(number: float) -> Dict[str, Any]:
+    """Build a number property value."""
+    return {'type': 'number', 'number': number}
+
+
+def _page_object(page_id: str, page: Dict[str, Any]) -> Dict[str, Any]:
+    """A page as pages.retrieve and databases.query return it."""
+    properties = {
+        'Name': {
+            'type': 'title',
+            'title': [text_run(page['title'])]
+        }
+    }
+    properties.update(page.get('properties', {}))
+    return {
+        'object': 'page',
+        'id': page_id,
+        'last_edited_time': page.get('last_edited_time', DEFAULT_EDITED_TIME),
+        'properties': properties
+    }
+
+
+def _sort_key(page: Dict[str, Any], name: str):
+    """Value a databases.query sort on property `name` compares."""
+    prop = page['properties'].get(name, {})
+    value = prop.get(prop.get('type'))
+    if prop.get('type') == 'select':
+        value = value['name'] if value else None
+    elif prop.get('type') == 'title':
+        value = value[0]['plain_text'] if value else None
+    return (value is None, value)
+
+
+class _Pages:
+    def __init__(self, fake):
+        self._fake = fake
+
+    def retrieve(self, page_id: str, **kwargs) -> Dict[str, Any]:
+        with self._fake.request('pages.retrieve', page_id):
+            page = self._fake.data[page_id]
+        return _page_object(page_id, page)
+
+
+class _Databases:
+    def __init__(self, fake):
+        self._fake = fake
+
+    def query(self, database_id: str, start_cursor: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        with self._fake.request('databases.query', database_id):
+            row_ids = self._fake.data[database_id]['rows']
+        rows = [_page_object(row_id, self._fake.data[row_id]) for row_id in row_ids]
+
+        # Rows are listed in creation order unless sorted by a property
+        for sort in reversed(kwargs.get('sorts', [])):
+            if 'property' in sort:
+                rows.sort(
+                    key=lambda row: _sort_key(row, sort['property']),
+                    reverse=sort.get('direction') == 'descending'
+                )
+
+        page_size = min(kwargs.get('page_size') or 100, 100)
+        start = int(start_cursor) if start_cursor else 0
+        end = start + page_size
+        has_more = end < len(rows)
+        return {
+            'object': 'list',
+            'results': rows[start:end],
+            'has_more': has_more,
+            'next_cursor': str(end) if has_more else None
+        }
+
+
+class _Children:
+    def __init__(self, fake):
+        self._fake = fake
+
+    def list(self, block_id: str, start_cursor: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        with self._fake.request('blocks.children.list', block_id):
+            blocks = self._fake.data[block_id]['blocks']
+        page_size = kwargs.get('page_size') or self._fake.page_size
+
+        start = int(start_cursor) if start_cursor else 0
+        end = start + page_size
+        has_more = end < len(blocks)
+
+        # A child_page block carries the sub-page's own last_edited_time
+        results = []
+        for block in blocks[start:end]:
+            if block['type'] == 'child_page' and block['id'] in self._fake.data:
+                page = self._fake.data[block['id']]
+                block = dict(block, last_edited_time=page.get('last_edited_time', DEFAULT_EDITED_TIME))
+            results.append(block)
+
+        return {
+            'object': 'list',
+            'results': results,
+            'has_more': has_more,
+            'next_cursor': str(end) if has_more else None
+        }
+
+
+class _Blocks:
+    def __init__(self, fake):
+        self.children = _Children(fake)
+
+
+class FakeNotionClient:
+    """
+    Minimal fake of notion_client.Client backed by a dict of pages.
+
+    Args:
+        data: Mapping of page ID to {'title': str, 'blocks': [block, ...]},
+            optionally with 'properties' (database rows), and of database ID
+            to {'title': str, 'rows': [page ID, ...]} in creation order
+        page_size: Number of blocks returned per blocks.children.list call
+        latency: Seconds each call takes, to make concurrency observable
+    """
+
+    def __init__(
+        self,
+        data: Dict[str, Dict[str, Any]],
+        page_size: int = 100,
+        latency: float = 0.0
+    ):
+        self.data = data
+        self.page_size = page_size
+        self.latency = latency
+        self.calls = Counter()
+        self.failures = defaultdict(deque)
+        self.failures_by_id = {}
+        self.delays = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self.pages = _Pages(self)
+        self.blocks = _Blocks(self)
+        self.databases = _Databases(self)
+
+    def fail_next(self, endpoint: str, *errors: Exception):
+        """Make the next calls to `endpoint` raise the given errors, in order."""
+        self.failures[endpoint].extend(errors)
+
+    def fail_for(self, object_id: str, error: BaseException):
+        """Make every call about `object_id` raise `error`."""
+        self.failures_by_id[object_id] = error
+
+    def slow_down(self, object_id: str, seconds: float):
+        """Make every call about `object_id` take `seconds` longer."""
+        self.delays[object_id] = seconds
+
+    @contextmanager
+    def request(self, endpoint: str, object_id: str = None):
+        """Count a call and track how many calls overlap in time."""
+        with self._lock:
+            self.calls[endpoint] += 1
+            if self.failures[endpoint]:
+                raise self.failures[endpoint].popleft()
+            if object_id in self.failures_by_id:
+                raise self.failures_by_id[object_id]
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            delay = self.latency + self.delays.get(object_id, 0.0)
+            if delay:
+                time.sleep(delay)
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+
+def sample_externship() -> Dict[str, Dict[str, Any]]:
+    """A small externship: root > 2 projects > steps, with one linked page."""
+    return {
+        'root': {
+            'title': 'Test Externship',
+            'blocks': [
+                paragraph('Welcome'),
+                child_page('p1', 'Project 1'),
+                child_page('p2', 'Project 2'),
+            ]
+        },
+        'p1': {
+            'title': 'Project 1',
+            'blocks': [
+                paragraph('Project 1 intro'),
+                child_page('s1', 'Step 1'),
+                child_page('s2', 'Step 2'),
+            ]
+        },
+        'p2': {
+            'title': 'Project 2',
+            'blocks': [
+                paragraph('Project 2 intro'),
+                link_to_page('s3'),
+            ]
+        },
+        's1': {'title': 'Step 1', 'blocks': [paragraph('Do step 1')]},
+        's2': {'title': 'Step 2', 'blocks': [paragraph('Do step 2')]},
+        's3': {'title': 'Step 3', 'blocks': [paragraph('Do step 3')]},
+    }
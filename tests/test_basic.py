@@ -4,13 +4,23 @@ Basic tests for the Notion Export Tool
 Run with: pytest tests/
 """
 
+import io
+import json
 import sys
 import os
 
 # Add src to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from consolidator import MarkdownConsolidator
+from consolidator import (
+    DocumentStats,
+    MarkdownConsolidator,
+    SplitMarkdownConsolidator,
+    StreamingMarkdownConsolidator,
+    split_markdown_blocks,
+)
+from chunker import ChunkConsolidator
+from tokens import estimate_tokens
 
 
 def test_consolidator_initialization():
@@ -110,6 +120,388 @@ def test_metadata_formatting():
     assert "4 weeks" in content
 
 
+def fill_sample_document(consolidator):
+    """Add the same header, sections and separator to any consolidator."""
+    consolidator.add_header()
+    consolidator.add_page_content("Project 1", "Intro with **bold** and émojis ✓", level=1)
+    consolidator.add_section_separator("Appendix")
+    consolidator.add_page_content("Step 1", "Line one\nLine two", level=2, metadata={"Duration": "1 week"})
+
+
+def test_streaming_consolidator_matches_in_memory():
+    """Streaming output and statistics should match the in-memory consolidator."""
+    in_memory = MarkdownConsolidator("Test Externship")
+    fill_sample_document(in_memory)
+
+    stream = io.StringIO()
+    streaming = StreamingMarkdownConsolidator("Test Externship", stream)
+    fill_sample_document(streaming)
+
+    assert stream.getvalue() == in_memory.get_consolidated_content()
+    assert streaming.get_statistics() == in_memory.get_statistics()
+
+
+def test_document_stats_counts_words_split_across_parts():
+    """A word split over two parts should only be counted once."""
+    stats = DocumentStats()
+    stats.add("Hello wor")
+    stats.add("ld again\n")
+
+    assert stats.word_count == 3
+    assert stats.as_dict()['line_count'] == 2
+
+
+def test_incremental_statistics_match_full_document():
+    """Running counts should equal measuring the joined document."""
+    consolidator = MarkdownConsolidator("Test Externship")
+    fill_sample_document(consolidator)
+    consolidator.add_page_content("Step 2", "résumé naïve café " * 50, level=2)
+
+    content = consolidator.get_consolidated_content()
+    size = len(content.encode('utf-8'))
+    stats = consolidator.get_statistics()
+    expected = {
+        'character_count': len(content),
+        'word_count': len(content.split()),
+        'line_count': len(content.split('\n')),
+        'estimated_size_kb': round(size / 1024, 2),
+        'estimated_size_mb': round(size / (1024 * 1024), 2)
+    }
+    assert {key: stats[key] for key in expected} == expected
+
+
+def test_streaming_consolidator_writes_file_on_save(tmp_path):
+    """open() should stream to a partial file that save_to_file moves into place."""
+    output_path = str(tmp_path / "kb.md")
+    consolidator = StreamingMarkdownConsolidator.open("Test Externship", output_path)
+    fill_sample_document(consolidator)
+
+    assert not os.path.exists(output_path)
+    consolidator.save_to_file(output_path)
+
+    with open(output_path, encoding='utf-8') as f:
+        assert "## Project 1" in f.read()
+    assert not os.path.exists(output_path + ".partial")
+
+
+def fill_course(consolidator, projects=3, steps=3):
+    """Projects with steps and sub-steps of a few hundred bytes each."""
+    consolidator.add_header()
+    for p in range(1, projects + 1):
+        consolidator.add_page_content(f"Project {p}", f"Overview of project {p}. " * 5, level=1)
+        for s in range(1, steps + 1):
+            consolidator.add_page_content(f"Step {p}.{s}", f"Do task {p}.{s} carefully. " * 10, level=2)
+            consolidator.add_page_content(f"Sub-step {p}.{s}.1", f"Detail {p}.{s}. " * 10, level=3)
+
+
+def test_split_consolidator_splits_at_step_boundaries(tmp_path):
+    """Each file stays under budget, has a header and TOC, and keeps sub-steps with their step."""
+    output_path = str(tmp_path / "kb.md")
+    consolidator = SplitMarkdownConsolidator("Test Externship", output_path, max_bytes=2000)
+    fill_course(consolidator)
+    consolidator.save_to_file(output_path)
+
+    paths = consolidator.part_paths
+    assert len(paths) > 1
+    assert paths[0] == str(tmp_path / "kb-part-1.md")
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(path) for path in paths)
+
+    bodies = []
+    for number, path in enumerate(paths, 1):
+        assert os.path.getsize(path) <= 2000
+        with open(path, encoding='utf-8') as f:
+            text = f.read()
+        assert text.startswith(f"# Test Externship - Complete Knowledge Base (Part {number} of {len(paths)})")
+        toc, body = text.split("\n---\n\n", 2)[1:]
+        # Every file starts at a project or step, and lists what it holds
+        assert body.startswith("## ") or body.startswith("### ")
+        for line in body.split("\n"):
+            if line.startswith("#"):
+                title = line.lstrip("# ")
+                assert f"[{title}](#" in toc
+        bodies.append(body)
+
+    # Nothing is lost or repeated, and sub-steps stay with their step
+    in_memory = MarkdownConsolidator("Test Externship")
+    fill_course(in_memory)
+    full = in_memory.get_consolidated_content()
+    assert "".join(bodies) == full[full.index("## Project 1"):]
+    for body in bodies:
+        assert not body.startswith("#### ")
+
+
+def test_split_consolidator_token_budget_and_single_file(tmp_path):
+    """A token budget is honoured; a document that fits keeps the plain file name."""
+    output_path = str(tmp_path / "kb.md")
+    consolidator = SplitMarkdownConsolidator("Test Externship", output_path, max_tokens=400)
+    fill_course(consolidator)
+    consolidator.save_to_file(output_path)
+
+    assert len(consolidator.part_paths) > 1
+    for path in consolidator.part_paths:
+        with open(path, encoding='utf-8') as f:
+            assert estimate_tokens(f.read()) <= 400
+
+    small = SplitMarkdownConsolidator("Test Externship", output_path, max_tokens=100000)
+    fill_course(small, projects=1, steps=1)
+    small.save_to_file(output_path)
+
+    assert small.part_paths == [output_path]
+    with open(output_path, encoding='utf-8') as f:
+        text = f.read()
+    assert text.startswith("# Test Externship - Complete Knowledge Base\n")
+    assert "- [Project 1](#project-1)\n  - [Step 1.1](#step-1-1)\n    - [Sub-step 1.1.1]" in text
+
+
+def test_split_consolidator_statistics_match_files_on_disk(tmp_path):
+    """Statistics count every file's header and table of contents, whether split or not."""
+    for max_bytes, parts in ((2000, 3), (100000, 1)):
+        output_path = str(tmp_path / f"kb-{max_bytes}.md")
+        consolidator = SplitMarkdownConsolidator("Test Externship", output_path, max_bytes=max_bytes)
+        fill_course(consolidator)
+        consolidator.save_to_file(output_path)
+
+        texts = []
+        for path in consolidator.part_paths:
+            with open(path, encoding='utf-8') as f:
+                texts.append(f.read())
+        content = "".join(texts)
+        size = sum(os.path.getsize(path) for path in consolidator.part_paths)
+        stats = consolidator.get_statistics()
+
+        assert stats['parts'] == len(texts) == parts
+        assert stats['character_count'] == len(content)
+        assert stats['word_count'] == len(content.split())
+        assert stats['line_count'] == len(content.split('\n'))
+        assert consolidator.stats.byte_count == size
+
+
+def test_split_consolidator_oversized_section(tmp_path):
+    """A section larger than the budget gets a file of its own."""
+    output_path = str(tmp_path / "kb.md")
+    consolidator = SplitMarkdownConsolidator("Test Externship", output_path, max_bytes=1000)
+    consolidator.add_page_content("Project 1", "Short.", level=1)
+    consolidator.add_page_content("Step 1", "Long paragraph. " * 200, level=2)
+    consolidator.add_page_content("Step 2", "Short.", level=2)
+    consolidator.save_to_file(output_path)
+
+    assert len(consolidator.part_paths) == 3
+    assert consolidator.get_statistics()['oversized_parts'] == 1
+
+
+def test_token_estimates():
+    """Token estimates follow the rough shape of a BPE tokenizer, offline."""
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("Hello world, this is a test.") == 8
+    assert estimate_tokens("2025") == 2
+    assert estimate_tokens("日本語") == 3
+
+
+def test_statistics_count_tokens_incrementally():
+    """With exact_tokens, the running token count matches estimating each section."""
+    consolidator = MarkdownConsolidator("Test Externship", exact_tokens=True)
+    fill_sample_document(consolidator)
+
+    expected = sum(estimate_tokens(part) for part in consolidator.content_parts)
+    assert consolidator.get_statistics()['token_count'] == expected > 0
+
+
+def test_statistics_approximate_tokens_by_default():
+    """Without exact_tokens, tokens are approximated as a quarter of the characters."""
+    consolidator = MarkdownConsolidator("Test Externship")
+    fill_sample_document(consolidator)
+
+    stats = consolidator.get_statistics()
+    assert stats['token_count'] == (stats['character_count'] + 3) // 4 > 0
+    assert consolidator.stats.token_count == 0
+
+
+def test_chunk_consolidator_writes_overlapping_chunks_with_paths():
+    """Chunks stay under the token limit, overlap, and carry their hierarchy path."""
+    stream = io.StringIO()
+    consolidator = ChunkConsolidator("Test Externship", stream, max_tokens=40, overlap_tokens=10)
+    consolidator.add_header()
+    consolidator.add_page_content("Project 1", "Project overview.", level=1)
+    consolidator.add_page_content(
+        "Step 1",
+        "\n".join(f"- Item {i} of the checklist for this step" for i in range(12)),
+        level=2
+    )
+    consolidator.add_page_content("Sub-step 1.1", "A detail.", level=3)
+    consolidator.add_page_content("Project 2", "word " * 100, level=1)
+    consolidator.save_to_file("unused")
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    assert [record['id'] for record in records] == list(range(len(records)))
+    assert records[0]['path'] == ["Project 1"]
+    assert records[0]['text'] == "## Project 1\nProject overview."
+
+    step = [record for record in records if record['path'] == ["Project 1", "Step 1"]]
+    assert len(step) > 1
+    assert step[0]['text'].startswith("### Step 1")
+    # The last line of one chunk starts the next
+    assert step[0]['text'].split("\n")[-1] == step[1]['text'].split("\n")[0]
+
+    assert records[-2]['path'] == ["Project 2"]
+    assert any(record['path'] == ["Project 1", "Step 1", "Sub-step 1.1"] for record in records)
+    for record in records:
+        assert record['tokens'] <= 40
+        assert record['document'] == "Test Externship"
+    assert consolidator.get_statistics()['chunks'] == len(records)
+
+
+def test_table_of_contents_any_depth_with_unique_anchors(tmp_path):
+    """The TOC is collected while sections are added, at any depth, with unique anchors."""
+    output_path = str(tmp_path / "kb.md")
+    consolidator = StreamingMarkdownConsolidator.open("Test Externship", output_path, table_of_contents=True)
+    consolidator.add_header()
+    consolidator.add_page_content("Project 1", "Intro", level=1)
+    consolidator.add_page_content("Overview", "First", level=2)
+    consolidator.add_page_content("Deep dive", "Nested", level=4)
+    consolidator.add_page_content("Project 2", "Intro", level=1)
+    consolidator.add_page_content("Overview", "Second", level=2)
+    consolidator.add_page_content("Overview", "Third", level=2)
+    consolidator.save_to_file(output_path)
+
+    with open(output_path, encoding='utf-8') as f:
+        content = f.read()
+
+    assert content.startswith("# Test Externship - Complete Knowledge Base")
+    toc = content[content.index("## Table of Contents"):content.index("## Project 1")]
+    assert toc == (
+        "## Table of Contents\n\n"
+        "- [Project 1](#project-1)\n"
+        "  - [Overview](#overview)\n"
+        "      - [Deep dive](#deep-dive)\n"
+        "- [Project 2](#project-2)\n"
+        "  - [Overview](#overview-1)\n"
+        "  - [Overview](#overview-2)\n"
+        "\n---\n\n"
+    )
+    assert os.listdir(tmp_path) == ["kb.md"]
+
+    # Statistics include the table of contents
+    assert consolidator.get_statistics()['character_count'] == len(content)
+
+
+def test_cross_reference_links_to_page_section():
+    """References point at the page's own section, not at a same-titled heading."""
+    consolidator = MarkdownConsolidator("Test Externship", table_of_contents=True)
+    consolidator.add_header()
+    consolidator.add_page_content("Project 1", "Intro", level=1)
+    consolidator.add_cross_reference("Style Guide", level=2)
+    consolidator.add_page_content("Project 2", "Intro", level=1)
+    consolidator.add_page_content("Style Guide", "Use black.", level=2)
+    consolidator.add_cross_reference("Style Guide", level=2)
+
+    content = consolidator.get_consolidated_content()
+
+    assert content.index("# Test Externship") < content.index("## Table of Contents") < content.index("## Project 1")
+    assert content.count("*See: [Style Guide](#style-guide-1)*") == 2
+    assert "  - [Style Guide](#style-guide-1)\n" in consolidator.get_table_of_contents()
+    assert consolidator.get_statistics()['character_count'] == len(content)
+
+
+def test_cross_reference_resolves_page_id_among_same_titled_pages():
+    """Of two pages with the same title, a reference links to the one with its ID."""
+    consolidator = MarkdownConsolidator("Test Externship")
+    consolidator.add_page_content("Overview", "Project 1 overview.", level=2, page_id="a")
+    consolidator.add_page_content("Overview", "Project 2 overview.", level=2, page_id="b")
+    consolidator.add_cross_reference("Overview", level=2, page_id="b")
+    consolidator.add_cross_reference("Overview", level=2)
+
+    content = consolidator.get_consolidated_content()
+
+    assert content.count("*See: [Overview](#overview-1)*") == 1
+    assert content.count("*See: [Overview](#overview)*") == 1
+
+
+BOILERPLATE ="\n".join([
+    "### Submission guidelines",
+    "- Push your work to a branch named after the step and open a pull request.",
+    "- Include screenshots of the running app and a short summary of what changed.",
+    "> **Note:** Late submissions are reviewed after on-time ones, within a week.",
+])
+
+
+def test_repeated_sections_become_references():
+    """A section identical to an earlier one is replaced by a link to it."""
+    consolidator = MarkdownConsolidator("Test Externship")
+    consolidator.add_page_content("Step 1", BOILERPLATE, level=2)
+    consolidator.add_page_content("Step 2", BOILERPLATE, level=2)
+
+    content = consolidator.get_consolidated_content()
+    stats = consolidator.get_statistics()
+
+    assert content.count("Submission guidelines") == 1
+    assert "### Step 2\n\n*Same as in [Step 1](#step-1)*" in content
+    assert stats['duplicate_sections'] == 1
+    assert stats['dedup_ratio'] == 0.5
+
+
+def test_repeated_block_runs_become_references():
+    """Boilerplate repeated inside different steps is kept once."""
+    consolidator = MarkdownConsolidator("Test Externship")
+    consolidator.add_page_content("Step 1", "Build the login form.\n" + BOILERPLATE, level=2)
+    consolidator.add_page_content(
+        "Step 2",
+        "Add password reset.\n" + BOILERPLATE + "\nGood luck!\n"
+        "- Push your work to a branch named after the step and open a pull request.",
+        level=2
+    )
+    consolidator.add_page_content("Step 3", "Short line\nShort line", level=2)
+    consolidator.add_page_content("Step 4", "Short line", level=2)
+
+    content = consolidator.get_consolidated_content()
+    stats = consolidator.get_statistics()
+
+    assert content.count("Submission guidelines") == 1
+    assert "Add password reset.\n*Same as in [Step 1](#step-1)*\nGood luck!\n- Push your work" in content
+    # Repeats shorter than min_duplicate_chars are left alone
+    assert content.count("Short line") == 3
+    assert stats['duplicate_blocks'] == 4
+    assert 0 < stats['dedup_ratio'] < 0.5
+
+
+def test_references_link_to_the_repeated_section_not_its_namesake():
+    """Content first seen in the second of two same-titled sections links there."""
+    consolidator = MarkdownConsolidator("Test Externship")
+    consolidator.add_page_content("Submission Guidelines", "Email your mentor.", level=2)
+    consolidator.add_page_content("Submission Guidelines", BOILERPLATE, level=2)
+    consolidator.add_page_content("Step 3", BOILERPLATE, level=2)
+    consolidator.add_page_content("Step 4", "Build it.\n" + BOILERPLATE, level=2)
+
+    content = consolidator.get_consolidated_content()
+
+    assert "### Step 3\n\n*Same as in [Submission Guidelines](#submission-guidelines-1)*" in content
+    assert "Build it.\n*Same as in [Submission Guidelines](#submission-guidelines-1)*" in content
+    assert "(#submission-guidelines)" not in content
+
+
+def test_markdown_blocks_keep_multiline_blocks_together():
+    """Code, tables, callout bodies and nested items split as single blocks."""
+    content = "\n".join([
+        "Intro",
+        "```python",
+        "print('hi')",
+        "",
+        "```",
+        "- Item",
+        "  - Nested",
+        "| a | b |",
+        "| --- | --- |",
+        "> **Note:** Careful",
+        "> with this",
+        "Outro",
+    ])
+
+    blocks = split_markdown_blocks(content)
+
+    assert '\n'.join(blocks) == content
+    assert len(blocks) == 6
+
+
 if __name__ == "__main__":
     # Run basic smoke tests
     print("Running basic tests...")
@@ -135,4 +527,14 @@ if __name__ == "__main__":
     test_metadata_formatting()
     print("✓ Metadata formatting")
 
+    test_streaming_consolidator_matches_in_memory()
+    print("✓ Streaming consolidation")
+
+    test_document_stats_counts_words_split_across_parts()
+    print("✓ Running statistics")
+
+    test_repeated_sections_become_references()
+    test_repeated_block_runs_become_references()
+    print("✓ Duplicate content references")
+
     print("\nAll tests passed! ✓")
@@ -0,0 +1,94 @@
+"""
+Tests for batch exports against a fake Notion client
+
+Run with: pytest tests/
+"""
+
+import sys
+import os
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import batch_export
+from notion_exporter import NotionExporter
+from rate_limiter import TokenBucket
+from fake_notion import FakeNotionClient, sample_externship
+
+
+def use_fake_notion(monkeypatch, tmp_path, fake: FakeNotionClient):
+    """Point batch_export at a fake client and a throwaway cache."""
+    monkeypatch.setenv('NOTION_API_KEY', 'test-key')
+    monkeypatch.setenv('NOTION_CACHE_PATH', str(tmp_path / 'cache.sqlite3'))
+
+    def fake_exporter(api_key, **kwargs):
+        return NotionExporter(api_key, client=fake, **kwargs)
+
+    monkeypatch.setattr(batch_export, 'NotionExporter', fake_exporter)
+    monkeypatch.setattr(batch_export, 'TokenBucket', lambda: TokenBucket(rate=1e6, capacity=1e6))
+
+
+def two_externships():
+    """Two copies of the sample externship under different root IDs."""
+    data = sample_externship()
+    data['root2'] = dict(data['root'], title='Second Externship')
+    return data
+
+
+def test_parallel_batch_collects_results_in_order(monkeypatch, tmp_path):
+    """Parallel exports should report every URL, in input order."""
+    fake = FakeNotionClient(two_externships(), latency=0.01)
+    use_fake_notion(monkeypatch, tmp_path, fake)
+    urls = [
+        "https://www.notion.so/Test-Externship-root",
+        "https://www.notion.so/Missing-Externship-nope",
+        "https://www.notion.so/Second-Externship-root2",
+    ]
+
+    results = batch_export.batch_export(urls, str(tmp_path / 'out'), workers=3)
+
+    assert [r['name'] for r in results['successful']] == ['Test Externship', 'Second Externship']
+    assert [r['url'] for r in results['failed']] == [urls[1]]
+    assert fake.max_in_flight > 1
+
+
+class Crash(BaseException):
+    """Stands in for the process dying (not caught like an export error)."""
+
+
+def test_resume_skips_finished_externships_and_pages(monkeypatch, tmp_path):
+    """A resumed batch should only fetch what the interrupted run didn't finish."""
+    output_dir = str(tmp_path / 'out')
+    urls = [
+        "https://www.notion.so/Test-Externship-root",
+        "https://www.notion.so/Second-Externship-root2",
+    ]
+
+    # First run dies while crawling the second externship's Project 2
+    data = two_externships()
+    data['root2'] = dict(data['root2'], blocks=data['root2']['blocks'][:2] + [
+        dict(data['root2']['blocks'][2], id='p2b')
+    ])
+    data['p2b'] = dict(data['p2'], title='Project 2b')
+    crashing = FakeNotionClient(data)
+    crashing.fail_for('p2b', Crash())
+    use_fake_notion(monkeypatch, tmp_path, crashing)
+    with pytest.raises(Crash):
+        batch_export.batch_export(urls, output_dir)
+
+    fake = FakeNotionClient(data)
+    use_fake_notion(monkeypatch, tmp_path, fake)
+    results = batch_export.batch_export(urls, output_dir, resume=True)
+
+    assert len(results['successful']) == 2
+    # Only the second externship's main page and the unfinished Project 2b
+    # are fetched; its linked step was journaled by the first externship
+    assert fake.calls['pages.retrieve'] == 2
+    assert fake.calls['blocks.children.list'] == 1
+    with open(results['successful'][1]['file'], encoding='utf-8') as f:
+        content = f.read()
+    assert "Project 2b" in content
+    assert "Do step 3" in content
+    assert "Do step 1" in content
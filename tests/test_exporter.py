@@ -0,0 +1,912 @@
+"""
+Tests for NotionExporter and ExternshipExporter against a fake Notion client
+
+Run with: pytest tests/
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import sys
+import os
+import threading
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from main import ExternshipExporter
+from http_pool import HttpPool
+from manifest import ExportManifest
+from notion_exporter import NotionExporter
+from consolidator import MarkdownConsolidator
+from rate_limiter import TokenBucket
+from replay import api_error
+from response_cache import ResponseCache
+from fake_notion import (
+    DEFAULT_EDITED_TIME,
+    FakeNotionClient,
+    child_database,
+    child_page,
+    container,
+    link_to_page,
+    number_property,
+    paragraph,
+    rich_block,
+    sample_externship,
+    select_property,
+    table,
+    table_row,
+    text_run,
+)
+
+
+def make_notion(fake: FakeNotionClient, cache: ResponseCache = None) -> NotionExporter:
+    """Create a NotionExporter wired to a fake client with no rate limit."""
+    return NotionExporter(
+        "test-key",
+        client=fake,
+        rate_limiter=TokenBucket(rate=1e6, capacity=1e6),
+        cache=cache
+    )
+
+
+def make_exporter(fake: FakeNotionClient, cache: ResponseCache = None, **kwargs) -> ExternshipExporter:
+    """Create an ExternshipExporter wired to a fake client with no delays."""
+    return ExternshipExporter("test-key", notion=make_notion(fake, cache), **kwargs)
+
+
+def export_to_string(exporter: ExternshipExporter) -> str:
+    """Build and render the sample hierarchy without touching the filesystem."""
+    structure = exporter._build_hierarchy(
+        'root',
+        'Test Externship',
+        last_edited_time=DEFAULT_EDITED_TIME
+    )
+    consolidator = MarkdownConsolidator('Test Externship')
+    exporter._process_hierarchy(structure, consolidator)
+    return consolidator.get_consolidated_content()
+
+
+def test_single_pass_lists_each_page_once():
+    """Single-pass crawl should list every page's blocks exactly once."""
+    fake = FakeNotionClient(sample_externship())
+    exporter = make_exporter(fake, single_pass=True)
+
+    content = export_to_string(exporter)
+
+    assert fake.calls['blocks.children.list'] == 6
+    assert "## Project 1" in content
+    assert "### Step 1" in content
+    assert "### Step 3" in content
+    assert "Do step 3" in content
+
+
+def test_single_pass_matches_two_pass_output():
+    """Both crawl modes should produce the same document."""
+    single_fake = FakeNotionClient(sample_externship())
+    two_pass_fake = FakeNotionClient(sample_externship())
+
+    single = export_to_string(make_exporter(single_fake, single_pass=True))
+    two_pass = export_to_string(make_exporter(two_pass_fake, single_pass=False))
+
+    assert single == two_pass
+    saved = two_pass_fake.total_calls - single_fake.total_calls
+    assert saved > 0
+
+
+def test_single_pass_reports_saved_calls():
+    """Saved calls should count listings the two-pass crawl would repeat."""
+    fake = FakeNotionClient(sample_externship(), page_size=1)
+    exporter = make_exporter(fake, single_pass=True)
+
+    exporter._build_hierarchy('root', 'Test Externship')
+
+    # Every page is below max_level, so the two-pass crawl would list each
+    # one twice: root and p1 take 3 requests, p2 takes 2, each step takes 1
+    assert exporter.api_calls_saved == 3 + 3 + 2 + 1 + 1 + 1
+
+
+def test_child_pages_are_titled_from_their_blocks():
+    """Only linked pages need pages.retrieve; child_page blocks carry the title."""
+    fake = FakeNotionClient(sample_externship())
+    exporter = make_exporter(fake)
+
+    structure = exporter._build_hierarchy('root', 'Test Externship', last_edited_time=DEFAULT_EDITED_TIME)
+
+    assert fake.calls['pages.retrieve'] == 1  # The linked Step 3
+    assert exporter.page_requests_saved == 4
+    assert [c['title'] for c in structure['children'][1]['children']] == ['Step 3']
+    assert structure['children'][0]['children'][1]['last_edited_time'] == DEFAULT_EDITED_TIME
+
+
+def database_externship(rows: int):
+    """An externship whose project keeps its steps as rows of an inline database."""
+    data = {
+        'root': {'title': 'Test Externship', 'blocks': [child_page('p1', 'Project 1')]},
+        'p1': {
+            'title': 'Project 1',
+            'blocks': [paragraph('Project 1 intro'), child_database('db', 'Steps')]
+        },
+        'db': {'title': 'Steps', 'rows': []},
+    }
+    # Rows are created in reverse of the order they should be read in
+    for i in reversed(range(rows)):
+        row_id = f"row{i}"
+        data['db']['rows'].append(row_id)
+        data[row_id] = {
+            'title': f"Step {i + 1}",
+            'blocks': [paragraph(f"Do step {i + 1}")],
+            'properties': {'Order': number_property(i), 'Status': select_property('Ready')}
+        }
+    return data
+
+
+def test_database_rows_are_queried_in_bulk():
+    """Rows come from a few databases.query calls, titled and ordered by the query."""
+    fake = FakeNotionClient(database_externship(250))
+    notion = make_notion(fake)
+    notion.database_sort = 'Order'
+    exporter = ExternshipExporter("test-key", notion=notion)
+
+    structure = exporter._build_hierarchy('root', 'Test Externship', last_edited_time=DEFAULT_EDITED_TIME)
+
+    steps = structure['children'][0]['children']
+    assert [step['title'] for step in steps[:3]] == ['Step 1', 'Step 2', 'Step 3']
+    assert len(steps) == 250
+    assert fake.calls['databases.query'] == 3
+    assert fake.calls['pages.retrieve'] == 0
+    assert steps[0]['content'].startswith("- **Order:** 0\n- **Status:** Ready\n\nDo step 1")
+
+
+def test_database_rows_in_two_pass_mode():
+    """The two-pass crawl renders row properties too, in creation order by default."""
+    fake = FakeNotionClient(database_externship(3))
+    content = export_to_string(make_exporter(fake, single_pass=False))
+
+    assert content.index("Step 3") < content.index("Step 1")
+    assert "- **Status:** Ready" in content
+    assert fake.calls['pages.retrieve'] == 0
+
+
+def test_databases_below_max_level_are_not_queried():
+    """A database on a page at max_level would only give rows that are dropped."""
+    fake = FakeNotionClient(database_externship(3))
+    exporter = make_exporter(fake, max_level=1)
+
+    structure = exporter._build_hierarchy('root', 'Test Externship', last_edited_time=DEFAULT_EDITED_TIME)
+
+    assert structure['children'][0]['children'] == []
+    assert fake.calls['databases.query'] == 0
+
+
+def test_crawl_is_breadth_first_in_document_order():
+    """Every project is fetched before any step, each level in document order."""
+    titles = []
+    exporter = make_exporter(
+        FakeNotionClient(sample_externship()),
+        max_workers=1,
+        progress=lambda event, details: titles.append(details['title']) if event == 'page' else None
+    )
+
+    exporter._build_hierarchy('root', 'Test Externship', last_edited_time=DEFAULT_EDITED_TIME)
+
+    assert titles == ['Test Externship', 'Project 1', 'Project 2', 'Step 1', 'Step 2', 'Step 3']
+
+
+def test_page_budget_keeps_the_top_of_the_tree():
+    """When the page budget runs out, the pages fetched so far form the tree."""
+    exporter = make_exporter(FakeNotionClient(sample_externship()), max_pages=3)
+
+    structure = exporter._build_hierarchy('root', 'Test Externship', last_edited_time=DEFAULT_EDITED_TIME)
+
+    assert outline(structure) == [
+        (0, 'Test Externship', False),
+        (1, 'Project 1', False),
+        (1, 'Project 2', False),
+    ]
+    assert structure['truncated'] == 'page budget'
+    assert exporter.pages_skipped == 3
+
+
+def test_time_budget_exports_a_partial_tree(tmp_path):
+    """Pages not started before the deadline are left out and reported."""
+    fake = FakeNotionClient(sample_externship())
+    fake.slow_down('p1', 0.3)
+    fake.slow_down('p2', 0.3)
+    events = []
+    result = make_exporter(
+        fake,
+        max_seconds=0.1,
+        log=lambda message: None,
+        progress=lambda event, details: events.append((event, details))
+    ).export_externship("https://www.notion.so/Test-Externship-root", output_dir=str(tmp_path))
+
+    assert result['truncated'] == 'time budget'
+    assert result['total_pages'] == 3
+    assert any(event == 'warning' and 'time budget' in details['message'] for event, details in events)
+    with open(result['output_path'], encoding='utf-8') as f:
+        content = f.read()
+    assert "Project 1 intro" in content
+    assert "Do step 1" not in content
+
+
+def test_max_level_is_configurable():
+    """A shallower crawl stops at the projects without being truncated."""
+    fake = FakeNotionClient(sample_externship())
+    exporter = make_exporter(fake, max_level=1)
+
+    structure = exporter._build_hierarchy('root', 'Test Externship', last_edited_time=DEFAULT_EDITED_TIME)
+
+    assert [len(project['children']) for project in structure['children']] == [0, 0]
+    assert 'truncated' not in structure
+    assert fake.calls['blocks.children.list'] == 3
+
+
+def test_crawler_fetches_siblings_concurrently():
+    """Sibling pages should be fetched in parallel, in block order."""
+    fake = FakeNotionClient(sample_externship(), latency=0.02)
+    exporter = make_exporter(fake, max_workers=4)
+
+    structure = exporter._build_hierarchy('root', 'Test Externship')
+
+    assert fake.max_in_flight > 1
+    assert [c['title'] for c in structure['children']] == ['Project 1', 'Project 2']
+    steps = [c['title'] for c in structure['children'][0]['children']]
+    assert steps == ['Step 1', 'Step 2']
+
+
+def test_crawler_skips_inaccessible_child():
+    """A child page that cannot be fetched is skipped, not fatal."""
+    data = sample_externship()
+    del data['s2']
+    exporter = make_exporter(FakeNotionClient(data), max_workers=2)
+
+    structure = exporter._build_hierarchy('root', 'Test Externship')
+
+    steps = [c['title'] for c in structure['children'][0]['children']]
+    assert steps == ['Step 1']
+
+
+def test_token_bucket_allows_burst_then_paces():
+    """The bucket should let a burst through, then wait 1/rate per request."""
+    now = [0.0]
+
+    def fake_sleep(seconds):
+        now[0] += seconds
+
+    bucket = TokenBucket(rate=3.0, capacity=3.0, clock=lambda: now[0], sleep=fake_sleep)
+
+    waits = [bucket.acquire() for _ in range(6)]
+
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert all(w > 0 for w in waits[3:])
+    assert abs(now[0] - 1.0) < 1e-9
+
+
+def test_rate_limited_request_is_retried_after_retry_after():
+    """A 429 should pause the shared limiter for Retry-After and slow it down."""
+    fake = FakeNotionClient(sample_externship())
+    fake.fail_next('pages.retrieve', api_error(429, 'rate_limited', retry_after=0.05))
+    notion = make_notion(fake)
+    rate_before = notion.rate_limiter.rate
+
+    page = notion.get_page('p1')
+
+    assert notion.get_page_title(page) == 'Project 1'
+    assert fake.calls['pages.retrieve'] == 2
+    assert notion.retry_count == 1
+    assert notion.rate_limiter.rate < rate_before
+
+
+def test_server_errors_back_off_and_keep_pagination():
+    """Transient 5xx errors mid-listing should retry without losing pages."""
+    fake = FakeNotionClient(sample_externship(), page_size=1)
+    fake.fail_next(
+        'blocks.children.list',
+        api_error(502, 'bad_gateway'),
+        api_error(503, 'service_unavailable')
+    )
+    notion = make_notion(fake)
+    sleeps = []
+    notion.sleep = sleeps.append
+
+    blocks = notion.get_blocks('root')
+
+    assert len(blocks) == 3
+    assert len(sleeps) == 2
+    assert notion.retry_count == 2
+
+
+def test_client_errors_are_not_retried():
+    """Errors like object_not_found should fail immediately."""
+    fake = FakeNotionClient(sample_externship())
+    fake.fail_next('pages.retrieve', api_error(404, 'object_not_found'))
+    notion = make_notion(fake)
+
+    with pytest.raises(Exception, match='object_not_found'):
+        notion.get_page('p1')
+
+    assert fake.calls['pages.retrieve'] == 1
+
+
+def test_cache_skips_unchanged_pages(tmp_path):
+    """A second export with a warm cache should need one request per page."""
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite3'))
+    first = export_to_string(make_exporter(FakeNotionClient(sample_externship()), cache))
+
+    fake = FakeNotionClient(sample_externship())
+    second = export_to_string(make_exporter(fake, cache))
+
+    assert second == first
+    # Each page's metadata is fetched to check last_edited_time, but no
+    # block listing is downloaded again
+    assert fake.calls['blocks.children.list'] == 0
+    assert fake.calls['pages.retrieve'] == 5
+    assert cache.get_statistics()['hits'] > 0
+
+
+def test_cache_refetches_edited_page(tmp_path):
+    """A page whose last_edited_time changed must be downloaded again."""
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite3'))
+    export_to_string(make_exporter(FakeNotionClient(sample_externship()), cache))
+
+    data = sample_externship()
+    data['s1']['last_edited_time'] = '2025-02-01T00:00:00.000Z'
+    data['s1']['blocks'][0]['paragraph']['rich_text'][0]['text']['content'] = 'Updated step 1'
+    fake = FakeNotionClient(data)
+    content = export_to_string(make_exporter(fake, cache))
+
+    assert "Updated step 1" in content
+    assert fake.calls['blocks.children.list'] == 1
+
+
+def test_cache_evicts_least_recently_used_over_size_limit(tmp_path):
+    """Entries over the size budget should be evicted oldest-access first."""
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite3'), max_size_mb=0.001)
+    for i in range(5):
+        cache.put_blocks(f"page-{i}", DEFAULT_EDITED_TIME, [{'text': 'x' * 400}])
+
+    removed = cache.evict()
+
+    assert removed > 0
+    assert cache.get_blocks('page-4', DEFAULT_EDITED_TIME) is not None
+    assert cache.get_blocks('page-0', DEFAULT_EDITED_TIME) is None
+
+
+def test_cache_shared_by_two_processes_never_locks(tmp_path):
+    """Each write is committed, so a second cache on the same file can write too."""
+    path = str(tmp_path / 'cache.sqlite3')
+    first = ResponseCache(path)
+    first.put_blocks('page-1', DEFAULT_EDITED_TIME, [])
+    assert first.get_blocks('page-1', DEFAULT_EDITED_TIME) == []
+
+    second = ResponseCache(path)
+    second._conn.execute("PRAGMA busy_timeout = 100")
+    second.put_blocks('page-2', DEFAULT_EDITED_TIME, [])
+    second.evict()
+
+    assert first.get_statistics()['entries'] == 2
+    second.close()
+    first.close()
+
+
+def test_cache_writes_access_times_on_flush(tmp_path):
+    """Hits update access times in memory until flushed."""
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite3'))
+    cache.put_blocks('page-1', DEFAULT_EDITED_TIME, [])
+    stored = cache._conn.execute("SELECT accessed_at FROM responses").fetchone()[0]
+
+    cache.get_blocks('page-1', DEFAULT_EDITED_TIME)
+    assert cache._conn.execute("SELECT accessed_at FROM responses").fetchone()[0] == stored
+
+    cache.flush()
+    assert cache._conn.execute("SELECT accessed_at FROM responses").fetchone()[0] > stored
+    assert not cache._conn.in_transaction
+    cache.close()
+
+
+def test_incremental_export_reuses_unchanged_pages(tmp_path):
+    """An unchanged re-export should need one request per page and no listings."""
+    url = "https://www.notion.so/Test-Externship-root"
+    first = make_exporter(FakeNotionClient(sample_externship())).export_externship(
+        url, output_dir=str(tmp_path), incremental=True
+    )
+
+    fake = FakeNotionClient(sample_externship())
+    second = make_exporter(fake).export_externship(
+        url, output_dir=str(tmp_path), incremental=True
+    )
+
+    assert fake.calls['blocks.children.list'] == 0
+    assert fake.calls['pages.retrieve'] == 6
+    assert second['incremental']['reused'] == 6
+    with open(first['output_path'], encoding='utf-8') as f:
+        assert "Do step 2" in f.read()
+
+
+def test_incremental_export_queries_databases_of_reused_pages(tmp_path):
+    """Rows added to or removed from a database show up though its page is unchanged."""
+    url = "https://www.notion.so/Test-Externship-root"
+    make_exporter(FakeNotionClient(database_externship(2))).export_externship(
+        url, output_dir=str(tmp_path), incremental=True
+    )
+
+    data = database_externship(3)
+    data['db']['rows'].remove('row0')
+    fake = FakeNotionClient(data)
+    result = make_exporter(fake).export_externship(
+        url, output_dir=str(tmp_path), incremental=True
+    )
+
+    assert fake.calls['databases.query'] == 1
+    assert result['incremental']['added'] == 1
+    assert result['incremental']['removed'] == 1
+    with open(result['output_path'], encoding='utf-8') as f:
+        content = f.read()
+    assert "Do step 3" in content
+    assert "Do step 2" in content
+    assert "Do step 1" not in content
+
+
+def test_unreadable_manifest_is_reported_as_a_warning(tmp_path, capsys):
+    """A corrupt manifest goes through the exporter's log and progress callbacks."""
+    path = ExportManifest.path_for(str(tmp_path), 'root')
+    os.makedirs(os.path.dirname(path))
+    with open(path, 'w') as f:
+        f.write("{not json")
+    lines, events = [], []
+
+    make_exporter(
+        FakeNotionClient(sample_externship()),
+        log=lines.append,
+        progress=lambda event, details: events.append((event, details))
+    ).export_externship("https://www.notion.so/Test-Externship-root", output_dir=str(tmp_path), incremental=True)
+
+    assert any("Ignoring unreadable manifest" in line for line in lines)
+    assert any(event == 'warning' and "unreadable manifest" in details['message'] for event, details in events)
+    assert capsys.readouterr().out == ""
+
+
+def test_incremental_export_refetches_edited_pages(tmp_path):
+    """Only the edited page's blocks should be listed and re-rendered."""
+    url = "https://www.notion.so/Test-Externship-root"
+    make_exporter(FakeNotionClient(sample_externship())).export_externship(
+        url, output_dir=str(tmp_path), incremental=True
+    )
+
+    data = sample_externship()
+    data['s2']['last_edited_time'] = '2025-03-01T00:00:00.000Z'
+    data['s2']['blocks'][0]['paragraph']['rich_text'][0]['text']['content'] = 'Revised step 2'
+    fake = FakeNotionClient(data)
+    result = make_exporter(fake).export_externship(
+        url, output_dir=str(tmp_path), incremental=True
+    )
+
+    assert fake.calls['blocks.children.list'] == 1
+    assert result['incremental']['changed'] == 1
+    with open(result['output_path'], encoding='utf-8') as f:
+        content = f.read()
+    assert "Revised step 2" in content
+    assert "Do step 1" in content
+
+
+def test_export_split_into_size_limited_files(tmp_path):
+    """With a byte budget the export is saved as several self-contained files."""
+    result = make_exporter(FakeNotionClient(sample_externship())).export_externship(
+        "https://www.notion.so/Test-Externship-root",
+        output_dir=str(tmp_path),
+        max_file_bytes=500
+    )
+
+    paths = result['output_paths']
+    assert len(paths) > 1
+    assert result['output_path'] == paths[0]
+    assert result['statistics']['parts'] == len(paths)
+
+    contents = []
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            contents.append(f.read())
+        assert os.path.getsize(path) <= 500
+    assert all("## Table of Contents" in content for content in contents)
+    assert sum("Do step 2" in content for content in contents) == 1
+
+
+def test_export_reports_progress_events(tmp_path):
+    """Front ends can follow the steps and the pages found through progress events."""
+    events = []
+    result = make_exporter(
+        FakeNotionClient(sample_externship()),
+        log=lambda message: None,
+        progress=lambda event, details: events.append((event, details))
+    ).export_externship("https://www.notion.so/Test-Externship-root", output_dir=str(tmp_path))
+
+    steps = [details['step'] for event, details in events if event == 'step']
+    done = [details['step'] for event, details in events if event == 'step_done']
+    pages = [details for event, details in events if event == 'page']
+
+    assert steps == done == [1, 2, 3, 4, 5]
+    assert [page['pages'] for page in pages] == list(range(1, 7))
+    assert {page['title'] for page in pages} >= {"Project 1", "Step 3"}
+    assert ('step_done', {'step': 3, 'label': "Found 6 pages"}) in events
+    assert result['total_pages'] == 6
+
+
+def test_export_retrieval_chunks_as_jsonl(tmp_path):
+    """The jsonl format writes one chunk per line, labelled with its hierarchy path."""
+    result = make_exporter(FakeNotionClient(sample_externship())).export_externship(
+        "https://www.notion.so/Test-Externship-root",
+        output_dir=str(tmp_path),
+        output_format='jsonl'
+    )
+
+    assert result['output_path'].endswith('-chunks.jsonl')
+    with open(result['output_path'], encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+
+    paths = [record['path'] for record in records]
+    assert ["Project 1", "Step 2"] in paths
+    assert ["Project 2", "Step 3"] in paths
+    assert result['statistics']['chunks'] == len(records)
+    assert result['statistics']['token_count'] > 0
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = b'{"object": "list", "results": []}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_http_pool_reuses_connections_across_clients():
+    """Clients built from one HttpPool share its keep-alive connections."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = "http://127.0.0.1:%d/" % server.server_address[1]
+
+    pool = HttpPool(max_connections=2, http2=False)
+    try:
+        first, second = pool.http_client(), pool.http_client()
+        for client in (first, second, first, second, first):
+            assert client.get(url).json()['object'] == 'list'
+
+        stats = pool.stats.as_dict()
+        assert stats['requests'] == 5
+        assert stats['connections_opened'] == 1
+        assert stats['reuse_rate'] == 0.8
+    finally:
+        pool.close()
+        server.shutdown()
+        server.server_close()
+
+
+def test_notion_client_from_pool_keeps_connect_timeout():
+    """A pooled Notion client uses the shared transport and the pool's timeouts."""
+    pool = HttpPool(timeout=30, connect_timeout=5, http2=False)
+    client = pool.notion_client("test-key")
+
+    assert client.client._transport is pool.transport
+    assert client.client.timeout.connect == 5
+    assert client.client.timeout.read == 30
+    assert client.client.headers['Authorization'] == "Bearer test-key"
+    pool.close()
+
+
+def nested_page_data():
+    """A page with a nested toggle, a nested list and a two-column layout."""
+    return {
+        'page': {
+            'title': 'Nested',
+            'blocks': [
+                rich_block('toggle', 'Hints', 't1', has_children=True),
+                rich_block('bulleted_list_item', 'Outer', 'b1', has_children=True),
+                container('column_list', 'cl'),
+            ]
+        },
+        't1': {'blocks': [paragraph('Hidden hint')]},
+        'b1': {'blocks': [rich_block('bulleted_list_item', 'Inner', 'b2', has_children=True)]},
+        'b2': {'blocks': [rich_block('bulleted_list_item', 'Innermost', 'b3')]},
+        'cl': {'blocks': [container('column', 'c1'), container('column', 'c2')]},
+        'c1': {'blocks': [paragraph('Left column')]},
+        'c2': {'blocks': [child_page('sub', 'Page in a column')]},
+        'sub': {'title': 'Page in a column', 'blocks': []},
+    }
+
+
+def test_nested_blocks_are_expanded_and_indented():
+    """Children of toggles, lists and columns should be fetched and rendered."""
+    fake = FakeNotionClient(nested_page_data(), latency=0.01)
+    notion = make_notion(fake)
+
+    blocks = notion.get_blocks('page')
+    expanded = notion.expand_children(blocks)
+    markdown = notion.blocks_to_markdown(blocks)
+
+    assert expanded == 6
+    assert markdown.split('\n') == [
+        "- Hints",
+        "  Hidden hint",
+        "- Outer",
+        "  - Inner",
+        "    - Innermost",
+        "Left column",
+    ]
+    # Blocks at the same depth are listed concurrently
+    assert fake.max_in_flight > 1
+    assert notion.extract_child_page_ids(blocks) == ['sub']
+
+
+def test_two_pass_finds_child_pages_inside_toggles():
+    """Both crawl modes reach a page kept inside a toggle."""
+    def data():
+        return {
+            'root': {'title': 'Test Externship', 'blocks': [child_page('p1', 'Project 1')]},
+            'p1': {'title': 'Project 1', 'blocks': [rich_block('toggle', 'Steps', 't1', has_children=True)]},
+            't1': {'blocks': [child_page('s1', 'Step 1')]},
+            's1': {'title': 'Step 1', 'blocks': [paragraph('Do step 1')]},
+        }
+
+    single = export_to_string(make_exporter(FakeNotionClient(data()), single_pass=True))
+    two_pass = export_to_string(make_exporter(FakeNotionClient(data()), single_pass=False))
+
+    assert "### Step 1\n\nDo step 1" in two_pass
+    assert two_pass == single
+
+
+def test_close_stops_nested_listing_threads(tmp_path):
+    """Closing the exporter after an export leaves no nested-listing threads behind."""
+    fake = FakeNotionClient(dict(nested_page_data(), root={
+        'title': 'Test Externship', 'blocks': [child_page('page', 'Project 1')]
+    }))
+    exporter = make_exporter(fake)
+    exporter.export_externship("https://www.notion.so/Test-Externship-root", output_dir=str(tmp_path))
+    threads = list(exporter.notion._nested_pool._threads)
+    assert threads
+
+    exporter.close()
+
+    assert exporter.notion._nested_pool is None
+    assert not any(thread.is_alive() for thread in threads)
+
+
+def test_tables_and_media_are_rendered_from_the_registry():
+    """Tables render from their rows; captioned media and links are kept."""
+    fake = FakeNotionClient({
+        'page': {
+            'blocks': [
+                table('t', 2),
+                {
+                    'id': 'img', 'type': 'image', 'has_children': False,
+                    'image': {
+                        'type': 'external',
+                        'external': {'url': 'https://example.com/arch.png'},
+                        'caption': [text_run('Architecture')]
+                    }
+                },
+                {
+                    'id': 'img2', 'type': 'image', 'has_children': False,
+                    'image': {'type': 'file', 'file': {'url': 'https://s3/x'}, 'caption': []}
+                },
+                {
+                    'id': 'bm', 'type': 'bookmark', 'has_children': False,
+                    'bookmark': {'url': 'https://docs.python.org', 'caption': []}
+                },
+                {
+                    'id': 'eq', 'type': 'equation', 'has_children': False,
+                    'equation': {'expression': 'e = mc^2'}
+                },
+                {'id': 'toc', 'type': 'table_of_contents', 'has_children': False,
+                 'table_of_contents': {}},
+            ]
+        },
+        't': {'blocks': [table_row('r1', 'Tool', 'Use'), table_row('r2', 'git', 'a|b')]},
+    })
+    notion = make_notion(fake)
+
+    blocks = notion.get_blocks('page')
+    notion.expand_children(blocks)
+
+    assert notion.blocks_to_markdown(blocks).split('\n') == [
+        "| Tool | Use |",
+        "| --- | --- |",
+        "| git | a\\|b |",
+        "[Image: Architecture](https://example.com/arch.png)",
+        "[https://docs.python.org](https://docs.python.org)",
+        "$$",
+        "e = mc^2",
+        "$$",
+    ]
+
+
+def test_custom_renderer_can_be_registered():
+    """New block types can be rendered without touching the exporter."""
+    notion = make_notion(FakeNotionClient({}))
+    notion.register_renderer(
+        'breadcrumb',
+        lambda exporter, block: "Home / Projects"
+    )
+    notion.register_renderer(
+        'divider',
+        lambda exporter, block: "* * *"
+    )
+
+    blocks = [
+        {'id': 'b', 'type': 'breadcrumb', 'has_children': False, 'breadcrumb': {}},
+        {'id': 'd', 'type': 'divider', 'has_children': False, 'divider': {}},
+    ]
+
+    assert notion.blocks_to_markdown(blocks) == "Home / Projects\n* * *"
+    # Other exporters keep the defaults
+    assert make_notion(FakeNotionClient({})).blocks_to_markdown(blocks) == "---"
+
+
+def test_rich_text_annotations_links_and_inline_content():
+    """Every annotation renders once per run; mentions and equations are kept."""
+    notion = make_notion(FakeNotionClient({}))
+
+    rich_text = [
+        text_run('Read '),
+        text_run('the guide ', link='https://example.com/guide', bold=True),
+        text_run('before ', italic=True, bold=True),
+        text_run('old', strikethrough=True),
+        text_run(' and '),
+        text_run('key', underline=True),
+        text_run(': '),
+        text_run('git push', code=True, bold=True),
+        {'type': 'mention', 'plain_text': '@Mentor', 'href': None,
+         'mention': {'type': 'user'}, 'annotations': text_run('')['annotations']},
+        {'type': 'equation', 'plain_text': 'x^2', 'href': None,
+         'equation': {'expression': 'x^2'}, 'annotations': text_run('')['annotations']},
+        # Hand-built runs without every key still render
+        {'type': 'text', 'text': {'content': ' done'}, 'annotations': {'italic': True}},
+    ]
+
+    assert notion._extract_rich_text(rich_text) == (
+        "Read [**the guide**](https://example.com/guide) ***before*** ~~old~~ and "
+        "<u>key</u>: **`git push`**@Mentor$x^2$ *done*"
+    )
+
+
+def linked_externship():
+    """Projects sharing a guide, with links back up the tree and a cycle."""
+    return {
+        'root': {
+            'title': 'Test Externship',
+            'blocks': [child_page('p1', 'Project 1'), child_page('p2', 'Project 2')]
+        },
+        'p1': {
+            'title': 'Project 1',
+            'blocks': [
+                link_to_page('guide', 'l1'),
+                link_to_page('p2', 'l2'),
+                child_page('s1', 'Step 1'),
+            ]
+        },
+        'p2': {
+            'title': 'Project 2',
+            'blocks': [
+                link_to_page('guide', 'l3'),
+                link_to_page('root', 'l4'),
+                child_page('s2', 'Step 2'),
+            ]
+        },
+        's1': {'title': 'Step 1', 'blocks': [paragraph('Do step 1'), link_to_page('p1', 'l5')]},
+        's2': {'title': 'Step 2', 'blocks': [paragraph('Do step 2')]},
+        'guide': {
+            'title': 'Style Guide',
+            'blocks': [paragraph('Use black'), link_to_page('s2', 'l6')]
+        },
+    }
+
+
+def outline(node, depth=0):
+    """(depth, title, is reference) for every node, in document order."""
+    lines = [(depth, node['title'], bool(node.get('reference')))]
+    for child in node['children']:
+        lines.extend(outline(child, depth + 1))
+    return lines
+
+
+def test_repeated_and_cyclic_links_are_fetched_once():
+    """Each page is fetched once and placed at its shallowest occurrence."""
+    fake = FakeNotionClient(linked_externship(), latency=0.01)
+    exporter = make_exporter(fake)
+
+    structure = exporter._build_hierarchy('root', 'Test Externship')
+
+    # Only the guide is reached by links alone; the others are titled from
+    # their child_page blocks
+    assert fake.calls['pages.retrieve'] == 1
+    assert fake.calls['blocks.children.list'] == 6
+    assert outline(structure) == [
+        (0, 'Test Externship', False),
+        (1, 'Project 1', False),
+        (2, 'Style Guide', False),
+        (3, 'Step 2', True),
+        (2, 'Project 2', True),
+        (2, 'Step 1', False),
+        (3, 'Project 1', True),
+        (1, 'Project 2', False),
+        (2, 'Style Guide', True),
+        (2, 'Step 2', False),
+    ]
+
+
+def test_repeated_pages_become_cross_references(tmp_path):
+    """Repeated pages are exported once and the savings are reported."""
+    result = make_exporter(FakeNotionClient(linked_externship())).export_externship(
+        "https://www.notion.so/Test-Externship-root", output_dir=str(tmp_path)
+    )
+
+    with open(result['output_path'], encoding='utf-8') as f:
+        content = f.read()
+
+    assert content.count("Use black") == 1
+    assert content.count("Do step 2") == 1
+    assert "*See: [Style Guide](#style-guide)*" in content
+    assert result['duplicates']['references'] == 4
+    # Style Guide and Step 2 would have been fetched again under each repeat
+    assert result['duplicates']['fetches_avoided'] > result['duplicates']['references']
+    assert result['duplicates']['bytes_avoided'] > 0
+
+
+def test_cross_reference_links_to_the_page_not_its_namesake(tmp_path):
+    """A link to one of two same-titled pages points at that page's section."""
+    fake = FakeNotionClient({
+        'root': {
+            'title': 'Test Externship',
+            'blocks': [child_page('p1', 'Project 1'), child_page('p2', 'Project 2'), child_page('n', 'Notes')]
+        },
+        'p1': {'title': 'Project 1', 'blocks': [child_page('o1', 'Overview')]},
+        'p2': {'title': 'Project 2', 'blocks': [child_page('o2', 'Overview')]},
+        'n': {'title': 'Notes', 'blocks': [link_to_page('o2')]},
+        'o1': {'title': 'Overview', 'blocks': [paragraph('Build a blog')]},
+        'o2': {'title': 'Overview', 'blocks': [paragraph('Build a shop')]},
+    })
+
+    result = make_exporter(fake).export_externship(
+        "https://www.notion.so/Test-Externship-root", output_dir=str(tmp_path)
+    )
+
+    with open(result['output_path'], encoding='utf-8') as f:
+        content = f.read()
+
+    assert "*See: [Overview](#overview-1)*" in content
+    assert "*See: [Overview](#overview)*" not in content
+
+
+def test_page_moved_above_max_level_gets_its_children():
+    """A page first reached at max_level is expanded once placed higher up."""
+    fake = FakeNotionClient({
+        'root': {'title': 'Test Externship', 'blocks': [child_page('a', 'A'), child_page('b', 'B')]},
+        'a': {'title': 'A', 'blocks': [link_to_page('x', 'l1')]},
+        'b': {'title': 'B', 'blocks': [child_page('c', 'C')]},
+        'c': {'title': 'C', 'blocks': [link_to_page('x', 'l2')]},
+        'x': {'title': 'X', 'blocks': [child_page('y', 'Y')]},
+        'y': {'title': 'Y', 'blocks': [paragraph('Deepest')]},
+    })
+    # B's branch reaches X (at max_level) before A's listing comes back
+    fake.slow_down('a', 0.1)
+    exporter = make_exporter(fake)
+
+    structure = exporter._build_hierarchy('root', 'Test Externship', max_level=3)
+
+    assert outline(structure) == [
+        (0, 'Test Externship', False),
+        (1, 'A', False),
+        (2, 'X', False),
+        (3, 'Y', False),
+        (1, 'B', False),
+        (2, 'C', False),
+        (3, 'X', True),
+    ]
+    assert fake.calls['blocks.children.list'] == 6
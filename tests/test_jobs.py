@@ -0,0 +1,96 @@
+"""
+Tests for background export jobs against a fake Notion client
+
+Run with: pytest tests/
+"""
+
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from jobs import JobManager
+from main import ExternshipExporter
+from notion_exporter import NotionExporter
+from rate_limiter import TokenBucket
+from fake_notion import FakeNotionClient, sample_externship
+
+
+def job_manager(tmp_path, fake: FakeNotionClient, **kwargs) -> JobManager:
+    """A JobManager whose exports share one fake client and rate limiter."""
+    rate_limiter = TokenBucket(rate=1e6, capacity=1e6)
+
+    def make_exporter(progress):
+        return ExternshipExporter(
+            "test-key",
+            notion=NotionExporter("test-key", client=fake, rate_limiter=rate_limiter),
+            log=lambda message: None,
+            progress=progress
+        )
+
+    return JobManager(make_exporter, str(tmp_path / 'jobs'), **kwargs)
+
+
+def test_jobs_run_concurrently_and_keep_their_files(tmp_path):
+    """Submitted exports run in the background; finished files stay available."""
+    data = sample_externship()
+    data['root2'] = dict(data['root'], title='Second Externship')
+    fake = FakeNotionClient(data, latency=0.01)
+    manager = job_manager(tmp_path, fake, max_workers=2)
+
+    first = manager.submit("https://www.notion.so/Test-Externship-root")
+    second = manager.submit("https://www.notion.so/Second-Externship-root2", custom_name="Renamed")
+    assert manager.get(first).status in ('queued', 'running', 'done')
+
+    for job_id in (first, second):
+        job = manager.wait(job_id, timeout=10)
+        snapshot = job.snapshot()
+        assert snapshot['status'] == 'done'
+        assert snapshot['pages'] == 6
+        assert snapshot['step'].startswith("Saved")
+        with open(snapshot['result']['output_path'], encoding='utf-8') as f:
+            assert "Do step 2" in f.read()
+
+    assert manager.get(second).result['externship_name'] == "Renamed"
+    assert [job.id for job in manager.jobs()] == [second, first]
+    assert fake.max_in_flight > 1
+    manager.shutdown()
+
+
+def test_failed_job_records_error_and_pruning_removes_files(tmp_path):
+    """A failing export marks its job failed; expired jobs are forgotten with their files."""
+    manager = job_manager(tmp_path, FakeNotionClient(sample_externship()), keep_seconds=0)
+
+    failed = manager.wait(manager.submit("https://www.notion.so/Missing-nope"), timeout=10)
+    assert failed.status == 'failed'
+    assert failed.error
+
+    # Submitting prunes expired jobs
+    done = manager.wait(manager.submit("https://www.notion.so/Test-Externship-root"), timeout=10)
+    assert manager.get(failed.id) is None
+    assert os.path.isdir(done.output_dir)
+
+    assert manager.prune() == 1
+    assert manager.get(done.id) is None
+    assert not os.path.exists(done.output_dir)
+    manager.shutdown()
+
+
+def test_snapshot_is_safe_while_job_runs(tmp_path):
+    """Polling a running job returns copies of its state."""
+    fake = FakeNotionClient(sample_externship())
+    fake.slow_down('root', 0.2)
+    manager = job_manager(tmp_path, fake)
+    job_id = manager.submit("https://www.notion.so/Test-Externship-root")
+
+    snapshot = manager.get(job_id).snapshot()
+    assert snapshot['status'] in ('queued', 'running')
+    assert snapshot['result'] is None
+    snapshot['warnings'].append("not shared")
+
+    job = manager.wait(job_id, timeout=10)
+    assert job.status == 'done'
+    assert job.warnings == []
+    assert job.snapshot()['elapsed'] >= 0.2
+    manager.shutdown()
@@ -0,0 +1,86 @@
+"""
+Tests for recording and replaying Notion API responses
+
+Run with: pytest tests/
+"""
+
+import sys
+import os
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from main import ExternshipExporter
+from notion_exporter import NotionExporter
+from rate_limiter import TokenBucket
+from replay import Recording, RecordingClient, ReplayClient
+from fake_notion import FakeNotionClient, child_page, paragraph, sample_externship
+
+
+URL = "https://www.notion.so/Test-Externship-root"
+
+
+def export(client, output_dir, **kwargs):
+    """Export the sample externship through `client`; return the result and file content."""
+    notion = NotionExporter("test-key", client=client, rate_limiter=TokenBucket(rate=1e6, capacity=1e6))
+    notion.sleep = lambda seconds: None
+    result = ExternshipExporter("test-key", notion=notion, log=lambda message: None, **kwargs).export_externship(
+        URL, output_dir=str(output_dir)
+    )
+    with open(result['output_path'], encoding='utf-8') as f:
+        return result, f.read()
+
+
+def test_recorded_export_replays_offline(tmp_path):
+    """A saved recording reproduces the export with the same requests."""
+    fake = FakeNotionClient(sample_externship())
+    recorder = RecordingClient(fake)
+    _, recorded = export(recorder, tmp_path / 'recorded')
+    recorder.recording.save(str(tmp_path / 'fixture.json'))
+
+    replay = ReplayClient(Recording.load(str(tmp_path / 'fixture.json')), latency=0.01)
+    _, replayed = export(replay, tmp_path / 'replayed')
+
+    def without_timestamp(content):
+        return [line for line in content.split('\n') if not line.startswith('**Generated:**')]
+
+    assert without_timestamp(replayed) == without_timestamp(recorded)
+    assert replay.calls == fake.calls
+    assert replay.max_in_flight > 1
+
+
+def test_injected_rate_limits_are_retried(tmp_path):
+    """Every injected 429 is retried, and the export still completes."""
+    recorder = RecordingClient(FakeNotionClient(sample_externship()))
+    export(recorder, tmp_path / 'recorded')
+
+    replay = ReplayClient(recorder.recording, rate_limit_every=3, retry_after=0.0)
+    result, content = export(replay, tmp_path / 'replayed')
+
+    assert replay.rate_limited > 0
+    assert result['api_retries'] == replay.rate_limited
+    assert "Do step 3" in content
+
+
+def test_requests_missing_from_the_recording_fail_as_not_found():
+    """A page that wasn't recorded behaves like one the integration can't see."""
+    notion = NotionExporter("test-key", client=ReplayClient(Recording()))
+
+    with pytest.raises(Exception, match="object_not_found"):
+        notion.get_page('nope')
+
+
+def test_recording_from_pages_paginates_listings(tmp_path):
+    """Pages given as data are served with paginated block listings."""
+    pages = {
+        'root': {'title': 'Test Externship', 'blocks': [child_page('p1', 'Project 1')]},
+        'p1': {'title': 'Project 1', 'blocks': [paragraph(f"Line {i}") for i in range(250)]},
+    }
+    replay = ReplayClient(Recording.from_pages(pages))
+
+    _, content = export(replay, tmp_path)
+
+    assert "Line 0" in content and "Line 249" in content
+    assert replay.calls['blocks.children.list'] == 1 + 3
@@ -0,0 +1,84 @@
+"""
+Tests for the synthetic externship generator
+
+Run with: pytest tests/
+"""
+
+import sys
+import os
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from consolidator import MarkdownConsolidator
+from main import ExternshipExporter
+from notion_exporter import NotionExporter
+from rate_limiter import TokenBucket
+from replay import Recording, ReplayClient
+from synthetic import BOILERPLATE, consolidate, generate_externship, walk
+
+
+def test_generation_is_reproducible_and_shaped_as_asked():
+    """The same seed gives the same tree, filled breadth-first within the limits."""
+    data = generate_externship(40, fan_out=4, max_depth=3, blocks_per_page=10, seed=7)
+
+    assert data == generate_externship(40, fan_out=4, max_depth=3, blocks_per_page=10, seed=7)
+    assert data != generate_externship(40, fan_out=4, max_depth=3, blocks_per_page=10, seed=8)
+
+    levels = [level for _, level, _ in walk(data)]
+    assert len(levels) == len(data) == 40
+    assert max(levels) == 3
+    assert levels.count(1) == 4 and levels.count(2) == 16
+
+    with pytest.raises(ValueError):
+        generate_externship(100, fan_out=2, max_depth=2)
+
+
+def test_block_mix_and_annotation_density_are_configurable():
+    """Only the requested block types appear; density 0 gives plain runs."""
+    data = generate_externship(
+        5,
+        fan_out=4,
+        block_mix={'paragraph': 1, 'code': 1},
+        annotation_density=0.0,
+        boilerplate_ratio=0.0
+    )
+
+    for page in data.values():
+        types = {block['type'] for block in page['blocks']}
+        assert types <= {'paragraph', 'code', 'child_page'}
+        for block in page['blocks']:
+            for run in block.get('paragraph', {}).get('rich_text', []):
+                assert not any(value for name, value in run['annotations'].items() if name != 'color')
+                assert run['href'] is None
+
+
+def test_consolidation_renders_every_page_and_deduplicates_boilerplate():
+    """The generated blocks feed the renderer and consolidator directly."""
+    data = generate_externship(40, fan_out=5, boilerplate_ratio=1.0, seed=3)
+
+    content = consolidate(data, MarkdownConsolidator('Synthetic Externship')).get_consolidated_content()
+
+    assert "## Project 1" in content
+    assert "#### Sub-step 1.1.1" in content
+    assert content.count(BOILERPLATE[0]) == 1
+    assert "| --- |" in content  # Tables render from their inline rows
+
+
+def test_generated_externship_exports_through_replay(tmp_path):
+    """Generated pages can be served to the full exporter."""
+    data = generate_externship(25, fan_out=4, seed=1)
+    notion = NotionExporter(
+        "test-key",
+        client=ReplayClient(Recording.from_pages(data)),
+        rate_limiter=TokenBucket(rate=1e6, capacity=1e6)
+    )
+
+    result = ExternshipExporter("test-key", notion=notion, log=lambda message: None).export_externship(
+        "https://www.notion.so/Synthetic-Externship-root", output_dir=str(tmp_path)
+    )
+
+    assert result['total_pages'] == 25
+    assert result['api_calls'] == 25 + 1  # One listing per page, plus the externship page